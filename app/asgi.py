@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+"""
+ASGI entry point for FeedMe app, served by the asyncio based server in utils.asgi_server, needing nothing beyond
+the standard library:
+
+    FEEDME_HOST=0.0.0.0 FEEDME_PORT=8000 python -m app.asgi
+
+The application can equally be served by any other ASGI server, such as uvicorn app.asgi:application.
+
+Requests are served by a bounded pool of worker threads, while live fetches of RSS feeds which have never
+been fetched are awaited on the event loop, so slow feed servers hold sockets rather than threads.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.feedme_app import app, prefetch_feed_content
+from utils.asgi import AsgiAdapter
+from utils.asgi_server import AsgiServer
+
+executor = ThreadPoolExecutor(max_workers=app.config["ASGI_WORKER_THREADS"], thread_name_prefix="asgi-worker")
+application = AsgiAdapter(app, executor, before_dispatch=partial(prefetch_feed_content, executor=executor))
+
+
+def main():
+    """
+    Serves the app until interrupted, on the address and port given by FEEDME_HOST and FEEDME_PORT.
+    """
+    server = AsgiServer(application, os.environ.get("FEEDME_HOST", "127.0.0.1"),
+                        int(os.environ.get("FEEDME_PORT", 8000)))
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
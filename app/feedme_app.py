@@ -2,48 +2,247 @@
 """
 REST endpoints for FeedMe app.
 """
+import asyncio
+import hmac
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from urllib.parse import parse_qs
 
-from flask import Flask, render_template, request, redirect, flash, abort, url_for
+from flask import Flask, Response, render_template, request, redirect, flash, abort, url_for, has_app_context, \
+    stream_with_context, g, jsonify
 from flask_caching import Cache
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.exc import InvalidRequestError
+from markupsafe import escape
+from sqlalchemy import DDL, bindparam, event, or_, text
+from sqlalchemy.exc import InvalidRequestError, IntegrityError
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from feed import feed
+from feed.feed_content import FeedContent
+from feed.feed_poller import FeedPoller
+from feed.refresh_interval import observed_interval, refresh_interval
+from parser.opml import parse_opml, iter_opml, OpmlError
+from parser.rss_channel import RssChannel, RssItem
+from parser.rss_parser import RssParserError, ASYNC_PARSER_BACKENDS, DEFAULT_PARSER_BACKEND
+from user.password_hasher import PasswordHasher, PasswordHasherBusy
 from user.user import User
 from user.user_login import LoginForm
 from user.user_registration import RegistrationForm
+from utils.async_http_client import AsyncHttpClient
+from utils.database import DEFAULT_SQLITE_PRAGMAS, engine_options, apply_sqlite_pragmas
 from utils.files import get_full_path
+from utils.http_client import HttpClient
+from utils.rate_limiter import RateLimiter
+from utils.metrics import REGISTRY, FEED_STAGE_SECONDS, FEED_CACHE_REQUESTS, FEED_PAYLOAD_BYTES, REQUEST_SECONDS, \
+    CACHE_BACKEND_STATS
+from utils.single_flight import SingleFlight
+from utils.ttl_cache import TtlCache
 from utils.urls import is_safe_url
 
 DATABASE_FILE = "sqlite:///{}".format(get_full_path("urldatabase.db"))
 
 app = Flask(__name__, template_folder="../templates", static_folder="../static")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["SQLALCHEMY_DATABASE_URI"] = DATABASE_FILE
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("FEEDME_DATABASE_URL", DATABASE_FILE)
+app.config["DB_POOL_SIZE"] = 5
+app.config["DB_POOL_MAX_OVERFLOW"] = 10
+app.config["DB_POOL_TIMEOUT"] = 30
+app.config["DB_POOL_RECYCLE"] = 60 * 60
+app.config["SQLITE_PRAGMAS"] = DEFAULT_SQLITE_PRAGMAS
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"],
+                                                         pool_size=app.config["DB_POOL_SIZE"],
+                                                         max_overflow=app.config["DB_POOL_MAX_OVERFLOW"],
+                                                         pool_timeout=app.config["DB_POOL_TIMEOUT"],
+                                                         pool_recycle=app.config["DB_POOL_RECYCLE"])
 app.config["SECRET_KEY"] = "7d441f27d441f27567d441f2b6176a"
+app.config["FEED_POLLER_ENABLED"] = os.environ.get("FEEDME_FEED_POLLER") == "1"
+app.config["FEED_POLL_INTERVAL"] = int(os.environ.get("FEEDME_FEED_POLL_INTERVAL", 60))
+app.config["FEED_REFRESH_DEFAULT_INTERVAL"] = 360
+app.config["FEED_REFRESH_MIN_INTERVAL"] = 120
+app.config["FEED_REFRESH_MAX_INTERVAL"] = 24 * 60 * 60
+app.config["FEED_CADENCE_ITEMS"] = 20
+app.config["FEED_FETCH_CONCURRENCY"] = 16
+app.config["FEED_FETCH_PER_HOST"] = 2
+app.config["FEED_FETCH_TIMEOUT"] = 30
+app.config["FEED_FETCH_CONNECT_TIMEOUT"] = 10
+app.config["FEED_FETCH_READ_TIMEOUT"] = 30
+app.config["FEED_FETCH_MAX_BYTES"] = 16 * 1024 * 1024
+app.config["FEED_FETCH_MAX_CONNECTIONS"] = 256
+app.config["FEED_PARSER_BACKEND"] = os.environ.get("FEEDME_FEED_PARSER", DEFAULT_PARSER_BACKEND)
+app.config["FEED_CONTENT_MAX_AGE"] = 360
+app.config["FEED_CONTENT_STALE_TTL"] = 24 * 60 * 60
+app.config["FEED_STALE_WHILE_REVALIDATE"] = True
+# Browsers and proxies may store /content responses, but must revalidate each use with the app,
+# which checks the user is logged in before answering 304.
+app.config["FEED_CONTENT_CACHE_CONTROL"] = "no-cache"
+app.config["FEED_REFRESH_WORKERS"] = 4
+app.config["FEED_CONTENT_MAX_LIMIT"] = 500
+app.config["FEED_RIVER_LIMIT"] = 50
+app.config["FEED_SEARCH_LIMIT"] = 50
+app.config["FEED_IMPORT_MAX_URLS"] = 10000
+app.config["FEED_API_MAX_OPERATIONS"] = 10000
+app.config["FEED_CACHE_SHARED"] = os.environ.get("FEEDME_SHARED_CACHE") == "1"
+app.config["FEED_REFRESH_LEASE_TIMEOUT"] = 60
+app.config["USER_CACHE_TTL"] = 10
+app.config["USER_CACHE_MAX_ENTRIES"] = 1024
+app.config["PASSWORD_HASH_ROUNDS"] = int(os.environ.get("FEEDME_PASSWORD_HASH_ROUNDS", 12))
+app.config["PASSWORD_HASH_WORKERS"] = 2
+app.config["PASSWORD_HASH_MAX_PENDING"] = 16
+app.config["PASSWORD_ATTEMPTS_PER_MINUTE"] = 10
+app.config["PASSWORD_ATTEMPT_BURST"] = 5
+app.config["ASGI_WORKER_THREADS"] = 8
+app.config["METRICS_TOKEN"] = os.environ.get("FEEDME_METRICS_TOKEN")
+# Reverse proxies in front of the app, whose X-Forwarded-* headers are trusted. 0 when the app is exposed directly,
+# as the headers could then be set by clients to dodge the per address login limits.
+app.config["PROXY_FIX_HOPS"] = int(os.environ.get("FEEDME_PROXY_FIX_HOPS", 0))
+
+
+def _trust_proxies(wsgi_app, hops):
+    """
+    Wraps the app so each request's client address, scheme and host are those the reverse proxies in front of it
+    were asked for, rather than the nearest proxy's.
+    :param hops: the number of reverse proxies trusted, or 0 to trust none.
+    :return: the wrapped WSGI app.
+    """
+    return ProxyFix(wsgi_app, x_for=hops, x_proto=hops, x_host=hops) if hops else wsgi_app
+
+
+app.wsgi_app = _trust_proxies(app.wsgi_app, app.config["PROXY_FIX_HOPS"])
 
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+# Batch mode, as SQLite can only alter tables by copying them.
+migrate = Migrate(app, db, render_as_batch=True)
 
-cache = Cache(app, config={'CACHE_TYPE': 'simple', 'CACHE_DEFAULT_TIMEOUT': 360})
+# The shared cache lives only on disk, so every worker process on the node sees the same entries.
+cache = Cache(app, config={'CACHE_TYPE': 'caching.sqlite_cache.SqliteCache' if app.config["FEED_CACHE_SHARED"]
+                           else 'caching.bounded_cache.BoundedCache',
+                           'CACHE_DEFAULT_TIMEOUT': 360,
+                           'CACHE_MEMORY_MAX_BYTES': 64 * 1024 * 1024,
+                           'CACHE_DISK_PATH': os.environ.get("FEEDME_CACHE_PATH", get_full_path("feedcache.db")),
+                           'CACHE_DISK_MAX_BYTES': 256 * 1024 * 1024})
 
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "login"
 
+STORED_ITEM_BATCH_SIZE = 500
+# Feed content shares the cache with pages cached under their own keys, so is kept apart by a prefix.
+FEED_CONTENT_KEY_PREFIX = "feed_content:"
+FEED_WINDOW_KEY_PREFIX = "feed_window:"
+REFRESH_LEASE_POLL_INTERVAL = 0.1
+PREFERRED_CONTENT_ENCODINGS = ["br", "gzip"]
+
+feed_poller = None
+feed_refreshes = SingleFlight()
+feed_refresh_executor = ThreadPoolExecutor(max_workers=app.config["FEED_REFRESH_WORKERS"],
+                                           thread_name_prefix="feed-refresh")
+# Users loaded for logged in requests, so each request need not query the DB for its user.
+loaded_users = TtlCache(app.config["USER_CACHE_TTL"], app.config["USER_CACHE_MAX_ENTRIES"])
+password_hasher = PasswordHasher(rounds=app.config["PASSWORD_HASH_ROUNDS"],
+                                 workers=app.config["PASSWORD_HASH_WORKERS"],
+                                 max_pending=app.config["PASSWORD_HASH_MAX_PENDING"])
+# Login and registration attempts per client address, checked before any password is hashed.
+# The address is the connecting peer's, or the client's as resolved by _trust_proxies behind reverse proxies.
+password_attempts = RateLimiter(rate=app.config["PASSWORD_ATTEMPTS_PER_MINUTE"] / 60,
+                                burst=app.config["PASSWORD_ATTEMPT_BURST"])
+feed_http_client = HttpClient(connect_timeout=app.config["FEED_FETCH_CONNECT_TIMEOUT"],
+                              read_timeout=app.config["FEED_FETCH_READ_TIMEOUT"],
+                              max_bytes=app.config["FEED_FETCH_MAX_BYTES"],
+                              max_idle_per_host=app.config["FEED_FETCH_PER_HOST"])
+feed_async_http_client = AsyncHttpClient(connect_timeout=app.config["FEED_FETCH_CONNECT_TIMEOUT"],
+                                         read_timeout=app.config["FEED_FETCH_READ_TIMEOUT"],
+                                         max_bytes=app.config["FEED_FETCH_MAX_BYTES"],
+                                         max_connections=app.config["FEED_FETCH_MAX_CONNECTIONS"],
+                                         max_per_host=app.config["FEED_FETCH_PER_HOST"])
+feed_prefetches = {}
+
 
 class RssFeedUrl(db.Model):
     """
     DB model for Rss Feed URL.
     """
     url = db.Column(db.String(80), unique=True, nullable=False, primary_key=True)
+    refresh_interval = db.Column(db.Integer)
+    next_refresh_at = db.Column(db.Integer, index=True)
 
     def __repr__(self):
         return "<RssFeedUrl: {}>".format(self.url)
 
 
+class RssFeedChannel(db.Model):
+    """
+    DB model for the channel details last fetched for an RSS feed URL.
+    """
+    url = db.Column(db.String, primary_key=True)
+    title = db.Column(db.String)
+    link = db.Column(db.String)
+    description = db.Column(db.String)
+    items = db.relationship("RssFeedItem", lazy="dynamic", order_by="desc(RssFeedItem.id)")
+
+    def __repr__(self):
+        return "<RssFeedChannel: {}>".format(self.url)
+
+
+class RssFeedItem(db.Model):
+    """
+    DB model for an item ingested from an RSS feed channel.
+    """
+    __table_args__ = (db.UniqueConstraint("channel_url", "guid"),
+                      # Serves a feed's items newest first, as read to learn how often the feed publishes.
+                      db.Index("ix_rss_feed_item_channel_url_published_at", "channel_url", "published_at"))
+
+    id = db.Column(db.Integer, primary_key=True)
+    channel_url = db.Column(db.String, db.ForeignKey(RssFeedChannel.url), nullable=False, index=True)
+    guid = db.Column(db.String, nullable=False)
+    title = db.Column(db.String, nullable=False)
+    link = db.Column(db.String, nullable=False)
+    summary = db.Column(db.String)
+    published = db.Column(db.String)
+    published_at = db.Column(db.Integer, index=True)
+    author = db.Column(db.String)
+
+    def to_rss_item(self):
+        return RssItem(self.title, self.link, self.summary, self.published, self.author, self.guid, self.published_at)
+
+    def __repr__(self):
+        return "<RssFeedItem: {}>".format(self.guid)
+
+
+# Full text index over stored items, kept up to date by triggers as items are ingested.
+RSS_FEED_ITEM_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE rss_feed_item_search USING fts5("
+    "title, summary, author, content='rss_feed_item', content_rowid='id')",
+    "CREATE TRIGGER rss_feed_item_search_insert AFTER INSERT ON rss_feed_item BEGIN "
+    "INSERT INTO rss_feed_item_search (rowid, title, summary, author) "
+    "VALUES (new.id, new.title, new.summary, new.author); END",
+    "CREATE TRIGGER rss_feed_item_search_delete AFTER DELETE ON rss_feed_item BEGIN "
+    "INSERT INTO rss_feed_item_search (rss_feed_item_search, rowid, title, summary, author) "
+    "VALUES ('delete', old.id, old.title, old.summary, old.author); END",
+    "CREATE TRIGGER rss_feed_item_search_update AFTER UPDATE ON rss_feed_item BEGIN "
+    "INSERT INTO rss_feed_item_search (rss_feed_item_search, rowid, title, summary, author) "
+    "VALUES ('delete', old.id, old.title, old.summary, old.author); "
+    "INSERT INTO rss_feed_item_search (rowid, title, summary, author) "
+    "VALUES (new.id, new.title, new.summary, new.author); END"
+]
+for ddl in RSS_FEED_ITEM_SEARCH_DDL:
+    event.listen(RssFeedItem.__table__, "after_create", DDL(ddl).execute_if(dialect="sqlite"))
+event.listen(RssFeedItem.__table__, "after_drop",
+             DDL("DROP TABLE IF EXISTS rss_feed_item_search").execute_if(dialect="sqlite"))
+
+
+def _configure_connection(dbapi_connection, connection_record):
+    apply_sqlite_pragmas(dbapi_connection, app.config["SQLITE_PRAGMAS"])
+
+
+# Only the app's own engine is tuned, which the user models share, never other engines in the process.
+with app.app_context():
+    event.listen(db.engine, "connect", _configure_connection)
+
+
 @app.route("/")
 @login_required
 @cache.cached(key_prefix='feed_urls')
@@ -63,18 +262,520 @@ def show_feed():
 def fetch_feed_content():
     """
     Fetches the RSS feed content for a given URL.
+    Content is rendered from the stored feed items, which the feed poller keeps up to date,
+    so only URLs which have never been fetched are fetched live. Stored feeds missing from the
+    cache are streamed item by item as they render. Only one fetch or refresh per URL runs at
+    once, with concurrent requests waiting on its result. Stale content is served immediately
+    while it is refreshed in the background, unless disabled.
+    Passing offset and/or limit returns just that window of items, newest first, read
+    straight from the store.
     :return: the RSS feed content.
     """
     print("Fetching RSS feed content for " + request.args["url"])
     url = request.args.get("url")
-    cached_content = cache.get(url)
+    if "offset" in request.args or "limit" in request.args:
+        return _fetch_feed_content_window(url)
+
+    cached_content = cache.get(_feed_content_key(url))
+
+    if cached_content is None:
+        FEED_CACHE_REQUESTS.inc(result="miss", feed=url)
+        rss_channel = _load_stored_channel(url)
+        if rss_channel is not None:
+            # Its validators are only known once rendered, so the first response carries none.
+            response = Response(stream_with_context(_stream_stored_feed(url, rss_channel)), mimetype="text/html")
+            response.headers["Cache-Control"] = app.config["FEED_CONTENT_CACHE_CONTROL"]
+            return response
+        return _feed_content_response(feed_refreshes.do(url, lambda: _load_feed_content(url)))
+
+    if cached_content.is_stale(app.config["FEED_CONTENT_MAX_AGE"]):
+        FEED_CACHE_REQUESTS.inc(result="stale", feed=url)
+        if app.config["FEED_STALE_WHILE_REVALIDATE"]:
+            _refresh_feed_content_in_background(url)
+        else:
+            try:
+                feed_content = feed_refreshes.do(url, lambda: _refresh_feed_content(url))
+                return _feed_content_response(cache.get(_feed_content_key(url)) or FeedContent(feed_content))
+            except RssParserError as error:
+                print(error.message)
+    else:
+        FEED_CACHE_REQUESTS.inc(result="hit", feed=url)
+    return _feed_content_response(cached_content)
+
 
-    if cached_content is not None:
-        return cached_content
+def _feed_content_key(url):
+    return FEED_CONTENT_KEY_PREFIX + url
+
+
+def _feed_content_response(feed_content):
+    # Serves the best encoding the client accepts as is, so no response is ever compressed per request.
+    encoding = request.accept_encodings.best_match([encoding for encoding in PREFERRED_CONTENT_ENCODINGS
+                                                    if encoding in feed_content.encodings])
+    if encoding:
+        response = Response(feed_content.encodings[encoding], mimetype="text/html")
+        response.headers["Content-Encoding"] = encoding
     else:
-        feed_content = feed.fetch_content_for_feed_url(url)
-        cache.set(url, feed_content)
-        return feed_content
+        response = Response(feed_content.content, mimetype="text/html")
+    response.headers["Cache-Control"] = app.config["FEED_CONTENT_CACHE_CONTROL"]
+    response.vary.add("Accept-Encoding")
+    if feed_content.etag is not None:
+        # Each encoding is a different representation, so needs its own strong ETag.
+        response.set_etag(feed_content.etag + ("-" + encoding if encoding else ""))
+        response.last_modified = feed_content.modified_at
+    # Answers If-None-Match and If-Modified-Since with a bodiless 304 when the client's copy is current.
+    return response.make_conditional(request)
+
+
+def _load_feed_content(url):
+    feed_content = _render_stored_feed(url)
+    if feed_content is None:
+        try:
+            feed_content = _refresh_feed_content(url)
+        except RssParserError as error:
+            print(error.message)
+            feed_content = "No RSS feed content to display"
+    return _cache_feed_content(url, feed_content)
+
+
+def _fetch_feed_content_window(url):
+    offset = request.args.get("offset", 0, type=int)
+    limit = request.args.get("limit", app.config["FEED_CONTENT_MAX_LIMIT"], type=int)
+    if offset < 0 or not 0 < limit <= app.config["FEED_CONTENT_MAX_LIMIT"]:
+        return abort(400)
+
+    cached_content = cache.get(_feed_content_key(url))
+    if cached_content is None and not _is_feed_stored(url):
+        cached_content = feed_refreshes.do(url, lambda: _load_feed_content(url))
+    elif cached_content is None or cached_content.is_stale(app.config["FEED_CONTENT_MAX_AGE"]):
+        _refresh_feed_content_in_background(url)
+    if not _is_feed_stored(url):
+        # Nothing was stored to cut a window from, such as when the feed could not be fetched.
+        return _feed_content_response(cached_content)
+    return _feed_content_response(_feed_content_window(url, cached_content, offset, limit))
+
+
+def _feed_content_window(url, cached_content, offset, limit):
+    """
+    Renders a window of a stored feed's items, cached against the rendering of the whole feed it is cut from,
+    so each window is compressed at most once per refresh and is served with its own validators.
+    :param cached_content: the cached rendering of the whole feed, if any.
+    :return: the FeedContent of the window.
+    """
+    if cached_content is None or cached_content.etag is None:
+        return FeedContent(_render_stored_feed_window(url, offset, limit))
+    key = "{}{}:{}:{}:{}".format(FEED_WINDOW_KEY_PREFIX, cached_content.etag, offset, limit, url)
+    window = cache.get(key)
+    if window is None:
+        window = FeedContent(_render_stored_feed_window(url, offset, limit), max_age=cached_content.max_age)
+        cache.set(key, window, timeout=app.config["FEED_CONTENT_STALE_TTL"])
+    return window
+
+
+def _refresh_feed_content_in_background(url):
+    def refresh():
+        try:
+            _refresh_feed_content(url)
+        except Exception as error:
+            print("Error refreshing RSS feed URL {}: {}".format(url, error))
+
+    feed_refreshes.do_in_background(url, refresh, feed_refresh_executor)
+
+
+@app.route("/river", methods=["GET"])
+@login_required
+def fetch_river_content():
+    """
+    Fetches the newest items across every configured RSS feed URL, ordered by publish time.
+    :return: the newest RSS feed items.
+    """
+    limit = request.args.get("limit", app.config["FEED_RIVER_LIMIT"], type=int)
+    if not 0 < limit <= app.config["FEED_CONTENT_MAX_LIMIT"]:
+        return abort(400)
+
+    # Walks the publish time index newest first, stopping as soon as enough items are found.
+    items = RssFeedItem.query \
+        .join(RssFeedUrl, RssFeedUrl.url == RssFeedItem.channel_url) \
+        .order_by(RssFeedItem.published_at.desc()) \
+        .limit(limit)
+    rss_items = [item.to_rss_item() for item in items]
+    rss_channel = RssChannel.from_rss_items("Latest", None, "Newest items from all RSS feeds", rss_items)
+    return rss_channel.format_feed_content()
+
+
+@app.route("/search", methods=["GET"])
+@login_required
+def search_feed_content():
+    """
+    Searches the title, summary and author of every stored RSS feed item.
+    :return: the best matching RSS feed items.
+    """
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", app.config["FEED_SEARCH_LIMIT"], type=int)
+    if not query or not 0 < limit <= app.config["FEED_CONTENT_MAX_LIMIT"]:
+        return abort(400)
+
+    print("Searching RSS feed items for " + query)
+    rss_items = [item.to_rss_item() for item in _search_items(query, limit)]
+    rss_channel = RssChannel.from_rss_items("Search", None, "Results for \"{}\"".format(escape(query)), rss_items)
+    return rss_channel.format_feed_content()
+
+
+def _search_items(query, limit):
+    terms = query.split()
+    if db.engine.dialect.name != "sqlite":
+        matches = [or_(RssFeedItem.title.contains(term), RssFeedItem.summary.contains(term),
+                       RssFeedItem.author.contains(term)) for term in terms]
+        return RssFeedItem.query.filter(*matches).order_by(RssFeedItem.published_at.desc()).limit(limit).all()
+
+    # Quote every term so user input is never interpreted as FTS query syntax.
+    match = " ".join("\"{}\"".format(term.replace("\"", "\"\"")) for term in terms)
+    statement = text("SELECT rss_feed_item.* FROM rss_feed_item_search "
+                     "JOIN rss_feed_item ON rss_feed_item.id = rss_feed_item_search.rowid "
+                     "WHERE rss_feed_item_search MATCH :match ORDER BY rank LIMIT :limit")
+    return RssFeedItem.query.from_statement(statement).params(match=match, limit=limit).all()
+
+
+@app.route("/metrics", methods=["GET"])
+def show_metrics():
+    """
+    Exposes request latencies, per feed stage timings, cache results and payload sizes for scraping.
+    The metrics are labelled with feed URLs, so are only shown to logged in users, or when a metrics token
+    is configured, to scrapers presenting it as a bearer token.
+    :return: the metrics in the Prometheus text format.
+    """
+    token = app.config["METRICS_TOKEN"]
+    if token:
+        if not hmac.compare_digest(request.headers.get("Authorization", ""), "Bearer " + token):
+            return abort(401)
+    elif not app.config.get("LOGIN_DISABLED") and not current_user.is_authenticated:
+        return login_manager.unauthorized()
+
+    backend = cache.cache
+    if hasattr(backend, "stats"):
+        for stat, value in backend.stats().items():
+            if isinstance(value, (int, float)):
+                CACHE_BACKEND_STATS.set(value, stat=stat)
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def _record_request_latency(response):
+    started = g.pop("request_started", None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route=route, method=request.method,
+                                status=response.status_code)
+    return response
+
+
+def start_feed_poller():
+    """
+    Starts the background poller refreshing the content of each configured RSS feed URL once it is due,
+    according to the feed's own refresh interval.
+    :return: the running feed poller.
+    """
+    global feed_poller
+    if feed_poller is None:
+        feed_poller = _create_feed_poller(_load_due_feed_urls)
+        feed_poller.start()
+        print("Started feed poller with interval {}s".format(feed_poller.interval))
+    return feed_poller
+
+
+def warm_feed_cache():
+    """
+    Refreshes the content of every configured RSS feed URL once, concurrently.
+    :return: the number of RSS feed URLs successfully refreshed.
+    """
+    return _create_feed_poller(_load_feed_urls).poll()
+
+
+async def prefetch_feed_content(environ, executor=None):
+    """
+    Fetches the RSS feed content a request for /content is about to serve, when its URL has never been fetched,
+    so the live fetch is awaited on the event loop and the request is then served from the cache, rather than
+    holding a worker thread for as long as the feed's server takes to respond. Awaited by the ASGI adapter before
+    each request is dispatched, and only for the parser backends which fetch over HTTP.
+    :param environ: the WSGI environ of the request about to be dispatched.
+    :param executor: the executor to read and write the store on, defaults to the event loop's.
+    """
+    if environ["REQUEST_METHOD"] != "GET" or environ["PATH_INFO"] != "/content":
+        return
+    if app.config["FEED_PARSER_BACKEND"] not in ASYNC_PARSER_BACKENDS:
+        return
+    args = parse_qs(environ.get("QUERY_STRING", ""))
+    url = args.get("url", [None])[0]
+    # Windows are cut from the stored channel once fetched, so are prefetched as the whole feed is.
+    if not url:
+        return
+
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(executor, _needs_live_fetch, environ, url):
+        return
+    # Concurrent requests for the same URL share a single fetch, so long as they share an event loop.
+    prefetch_loop, prefetch = feed_prefetches.get(url, (None, None))
+    if prefetch_loop is not loop:
+        prefetch = loop.create_task(_prefetch_rss_channel(url, executor))
+        feed_prefetches[url] = (loop, prefetch)
+        prefetch.add_done_callback(lambda done: _forget_prefetch(url, done))
+    # A request which goes away mid-fetch leaves the fetch to finish for the others.
+    await asyncio.shield(prefetch)
+
+
+def _needs_live_fetch(environ, url):
+    with app.request_context(environ):
+        # Requests which would be turned away are never left holding a fetch.
+        if not app.config.get("LOGIN_DISABLED") and not current_user.is_authenticated:
+            return False
+        return cache.get(_feed_content_key(url)) is None and not _is_feed_stored(url)
+
+
+def _forget_prefetch(url, prefetch):
+    if feed_prefetches.get(url, (None, None))[1] is prefetch:
+        del feed_prefetches[url]
+
+
+async def _prefetch_rss_channel(url, executor):
+    loop = asyncio.get_running_loop()
+    try:
+        rss_channel = await feed.fetch_channel_for_feed_url_async(url, app.config["FEED_PARSER_BACKEND"],
+                                                                  feed_async_http_client, executor,
+                                                                  _load_unmodified_channel)
+    except RssParserError as error:
+        print(error.message)
+        await loop.run_in_executor(executor, _cache_failed_fetch, url)
+        return
+    except Exception as error:
+        # Leaves the request to fetch the feed itself, as it would without the prefetch.
+        print("Error prefetching RSS feed URL {}: {}".format(url, error))
+        return
+    await loop.run_in_executor(executor, _cache_rss_channel, url, rss_channel)
+
+
+def _cache_failed_fetch(url):
+    with _ensure_app_context():
+        # Wait out the feed's usual interval before trying a failing feed again.
+        _schedule_refresh(url, None)
+        _cache_feed_content(url, "No RSS feed content to display")
+
+
+def _create_feed_poller(url_source):
+    # Polls join any refresh of the same URL already in flight for a request, rather than fetching it again.
+    return FeedPoller(url_source, lambda url: feed_refreshes.do(url, lambda: _refresh_feed_content(url)),
+                      app.config["FEED_POLL_INTERVAL"],
+                      max_concurrency=app.config["FEED_FETCH_CONCURRENCY"],
+                      max_per_host=app.config["FEED_FETCH_PER_HOST"],
+                      timeout=app.config["FEED_FETCH_TIMEOUT"])
+
+
+def _load_feed_urls():
+    with _ensure_app_context():
+        return [entry.url for entry in RssFeedUrl.query.all()]
+
+
+def _load_due_feed_urls():
+    with _ensure_app_context():
+        due = or_(RssFeedUrl.next_refresh_at.is_(None), RssFeedUrl.next_refresh_at <= int(time.time()))
+        return [entry.url for entry in RssFeedUrl.query.filter(due)]
+
+
+def _refresh_feed_content(url):
+    with _refresh_lease(url) as waited:
+        # Another process may have just refreshed the feed while this one waited its turn.
+        cached_content = cache.get(_feed_content_key(url)) if waited else None
+        if cached_content is not None and not cached_content.is_stale(app.config["FEED_CONTENT_MAX_AGE"]):
+            return cached_content.content
+
+        try:
+            rss_channel = feed.fetch_channel_for_feed_url(url, app.config["FEED_PARSER_BACKEND"], feed_http_client,
+                                                          _load_unmodified_channel)
+        except Exception:
+            # Wait out the feed's usual interval before trying a failing feed again.
+            with _ensure_app_context():
+                _schedule_refresh(url, None)
+            raise
+        return _cache_rss_channel(url, rss_channel)
+
+
+def _cache_rss_channel(url, rss_channel):
+    with _ensure_app_context():
+        with FEED_STAGE_SECONDS.time(stage="store", feed=url):
+            _store_rss_channel(url, rss_channel)
+        interval = _schedule_refresh(url, rss_channel)
+        feed_content = _render_stored_feed(url)
+        _cache_feed_content(url, feed_content, interval)
+    return feed_content
+
+
+@contextmanager
+def _refresh_lease(url):
+    """
+    Holds the lease on refreshing an RSS feed URL, when the cache backend is shared between processes,
+    so only one process on the node refreshes a feed at a time. Within a process, refreshes are already
+    collapsed by feed_refreshes.
+    :return: whether the lease was held by another process, which had to be waited for.
+    """
+    backend = cache.cache
+    if not hasattr(backend, "acquire_lock"):
+        yield False
+        return
+
+    timeout = app.config["FEED_REFRESH_LEASE_TIMEOUT"]
+    deadline = time.time() + timeout
+    token = backend.acquire_lock(url, timeout)
+    waited = token is None
+    # Leases expire, so a process which died mid-refresh holds others up for at most the timeout.
+    while token is None and time.time() < deadline:
+        time.sleep(REFRESH_LEASE_POLL_INTERVAL)
+        token = backend.acquire_lock(url, timeout)
+    try:
+        yield waited
+    finally:
+        if token is not None:
+            backend.release_lock(url, token)
+
+
+def _schedule_refresh(url, rss_channel):
+    """
+    Works out when to next refresh an RSS feed URL, from the channel's ttl and the gaps between its newest items.
+    The interval is stored for configured URLs, which the feed poller refreshes once due.
+    :param rss_channel: the freshly fetched channel, or None if the fetch failed.
+    :return: the number of seconds until the next refresh.
+    """
+    rss_feed_url = RssFeedUrl.query.get(url)
+    if rss_channel is None:
+        interval = rss_feed_url and rss_feed_url.refresh_interval or app.config["FEED_REFRESH_DEFAULT_INTERVAL"]
+    else:
+        published_times = [published_at for (published_at,) in db.session.query(RssFeedItem.published_at)
+                           .filter(RssFeedItem.channel_url == url, RssFeedItem.published_at.isnot(None))
+                           .order_by(RssFeedItem.published_at.desc())
+                           .limit(app.config["FEED_CADENCE_ITEMS"])]
+        interval = refresh_interval(rss_channel.ttl, observed_interval(published_times),
+                                    app.config["FEED_REFRESH_DEFAULT_INTERVAL"],
+                                    app.config["FEED_REFRESH_MIN_INTERVAL"], app.config["FEED_REFRESH_MAX_INTERVAL"])
+    if rss_feed_url is not None:
+        rss_feed_url.refresh_interval = interval
+        rss_feed_url.next_refresh_at = int(time.time()) + interval
+        db.session.commit()
+    return interval
+
+
+def _cache_feed_content(url, content, max_age=None):
+    # Keep content well past its max age so stale content can be served while it is refreshed.
+    if max_age is None:
+        rss_feed_url = RssFeedUrl.query.get(url) if url else None
+        max_age = rss_feed_url.refresh_interval if rss_feed_url else None
+    feed_content = FeedContent(content, max_age=max_age)
+    # Unchanged renderings keep their original modified time, so If-Modified-Since still matches.
+    previous_content = cache.get(_feed_content_key(url))
+    if previous_content is not None and previous_content.etag == feed_content.etag:
+        feed_content.modified_at = previous_content.modified_at or previous_content.refreshed_at
+    FEED_PAYLOAD_BYTES.set(len(content.encode()), feed=url)
+    cache.set(_feed_content_key(url), feed_content, timeout=app.config["FEED_CONTENT_STALE_TTL"])
+    return feed_content
+
+
+def _store_rss_channel(url, rss_channel):
+    """
+    Stores the channel details and any items not already ingested for an RSS feed URL.
+    :return: the number of new items stored.
+    """
+    try:
+        new_items = _add_rss_channel(url, rss_channel)
+        db.session.commit()
+    except IntegrityError as error:
+        # Another process stored the same channel or items since they were read, so store against its rows instead.
+        db.session.rollback()
+        print(error)
+        new_items = _add_rss_channel(url, rss_channel)
+        db.session.commit()
+    print("Stored {} new items for RSS feed URL {}".format(len(new_items), url))
+    return len(new_items)
+
+
+def _add_rss_channel(url, rss_channel):
+    channel = RssFeedChannel.query.get(url) or RssFeedChannel(url=url)
+    channel.title = rss_channel.title
+    channel.link = rss_channel.url
+    channel.description = rss_channel.description
+    db.session.add(channel)
+
+    known_guids = {guid for (guid,) in db.session.query(RssFeedItem.guid).filter_by(channel_url=url)}
+    new_items = []
+    for rss_item in rss_channel.rss_items:
+        guid = str(rss_item.guid)
+        if guid not in known_guids:
+            known_guids.add(guid)
+            new_items.append(RssFeedItem(channel_url=url, guid=guid, title=rss_item.title, link=rss_item.link,
+                                         summary=rss_item.summary, published=rss_item.published,
+                                         published_at=rss_item.published_at, author=rss_item.author))
+    # Feeds list their newest items first, so insert oldest first to keep ids in publishing order.
+    db.session.add_all(reversed(new_items))
+    return new_items
+
+
+def _render_stored_feed(url):
+    with FEED_STAGE_SECONDS.time(stage="render", feed=url):
+        rss_channel = _load_stored_channel(url)
+        return rss_channel.format_feed_content() if rss_channel else None
+
+
+def _stream_stored_feed(url, rss_channel):
+    fragments = []
+    for fragment in rss_channel.iter_feed_content():
+        fragments.append(fragment)
+        yield fragment
+    # Only cache content which was rendered in full, not cut short by the client going away.
+    _cache_feed_content(url, "".join(fragments))
+
+
+def _render_stored_feed_window(url, offset, limit):
+    channel = RssFeedChannel.query.get(url)
+    if channel is None:
+        abort(404)
+    # Read one item past the window to tell whether there is a further page.
+    items = channel.items.offset(offset).limit(limit + 1).all()
+    rss_items = [item.to_rss_item() for item in items[:limit]]
+    rss_channel = RssChannel.from_rss_items(channel.title, channel.link, channel.description, rss_items)
+    fragments = rss_channel.iter_feed_content() if offset == 0 else rss_channel.iter_items_content()
+    feed_content = "".join(fragments)
+    if len(items) > limit:
+        feed_content += "<p><a class=\"more_items\" href=\"#\" data-offset=\"{}\">More</a></p>".format(
+            offset + limit)
+    return feed_content
+
+
+def _is_feed_stored(url):
+    return bool(url) and db.session.query(RssFeedChannel.query.filter_by(url=url).exists()).scalar()
+
+
+def _load_stored_channel(url):
+    channel = RssFeedChannel.query.get(url) if url else None
+    if channel is None:
+        return None
+    rss_items = (item.to_rss_item() for item in channel.items.yield_per(STORED_ITEM_BATCH_SIZE))
+    return RssChannel.from_rss_items(channel.title, channel.link, channel.description, rss_items)
+
+
+def _load_unmodified_channel(url):
+    """
+    Loads the details of a stored channel, for reuse when its RSS feed has not been modified since last fetched.
+    Every item of an unmodified feed is already stored, so none are loaded.
+    :return: the RSS channel, or None if it is not stored.
+    """
+    with _ensure_app_context():
+        channel = RssFeedChannel.query.get(url)
+        return channel and RssChannel.from_rss_items(channel.title, channel.link, channel.description, [])
+
+
+def _ensure_app_context():
+    # Pushing a second context inside a request would tear down the request's DB session.
+    return nullcontext() if has_app_context() else app.app_context()
 
 
 @app.route("/config", methods=["GET", "POST"])
@@ -134,6 +835,170 @@ def delete():
     return redirect("/config")
 
 
+@app.route("/import", methods=["POST"])
+@login_required
+def import_feeds():
+    """
+    Adds the RSS feed URLs listed in an uploaded OPML document, optionally only those which can be fetched.
+    :return: config web page containing updated list of URL entries.
+    """
+    opml_file = request.files.get("opml")
+    try:
+        urls = parse_opml(opml_file.read()) if opml_file else []
+    except OpmlError as error:
+        print(error.message)
+        urls = None
+    if not urls:
+        flash("Please provide an OPML file listing RSS feed URLs")
+        return redirect("/config")
+    if len(urls) > app.config["FEED_IMPORT_MAX_URLS"]:
+        flash("Please provide at most {} RSS feed URLs".format(app.config["FEED_IMPORT_MAX_URLS"]))
+        return redirect("/config")
+
+    try:
+        added, existing, invalid = _import_feed_urls(urls, validate=request.form.get("validate") == "on")
+    except IntegrityError as error:
+        # Another request added some of the same URLs since they were read, so nothing is imported.
+        db.session.rollback()
+        print(error)
+        flash("The RSS feed URLs were changed by another request, please retry")
+        return render_template("urlconfig.html", page_title="Configure RSS Feeds",
+                               rss_feed_urls=RssFeedUrl.query.all()), 409
+    message = "Imported {} RSS feed URLs, {} already added, {} invalid".format(len(added), len(existing), len(invalid))
+    print(message)
+    flash(message)
+    return redirect("/config")
+
+
+def _import_feed_urls(urls, validate=False):
+    # Finds every existing URL with a few set queries, rather than a query per URL.
+    existing = set()
+    for start in range(0, len(urls), STORED_ITEM_BATCH_SIZE):
+        batch = urls[start:start + STORED_ITEM_BATCH_SIZE]
+        existing.update(url for (url,) in db.session.query(RssFeedUrl.url).filter(RssFeedUrl.url.in_(batch)))
+    new_urls = [url for url in urls if url not in existing]
+
+    invalid = []
+    if validate and new_urls:
+        results = feed.fetch_many(new_urls, fetch=_fetch_channel,
+                                  max_concurrency=app.config["FEED_FETCH_CONCURRENCY"],
+                                  max_per_host=app.config["FEED_FETCH_PER_HOST"],
+                                  timeout=app.config["FEED_FETCH_TIMEOUT"])
+        invalid = {result.url for result in results if not result.succeeded}
+        new_urls = [url for url in new_urls if url not in invalid]
+
+    # Adds every new URL in a single transaction.
+    if new_urls:
+        db.session.execute(RssFeedUrl.__table__.insert(), [{"url": url} for url in new_urls])
+        db.session.commit()
+    return new_urls, existing, invalid
+
+
+def _fetch_channel(url):
+    return feed.fetch_channel_for_feed_url(url, app.config["FEED_PARSER_BACKEND"], feed_http_client,
+                                           _load_unmodified_channel)
+
+
+@app.route("/export", methods=["GET"])
+@login_required
+def export_feeds():
+    """
+    Lists every RSS feed URL in an OPML document, streamed as it is read from the database.
+    :return: the OPML document as an attachment.
+    """
+    feeds = db.session.query(RssFeedUrl.url, RssFeedChannel.title) \
+        .outerjoin(RssFeedChannel, RssFeedChannel.url == RssFeedUrl.url) \
+        .order_by(RssFeedUrl.url) \
+        .yield_per(STORED_ITEM_BATCH_SIZE)
+    return Response(stream_with_context(iter_opml("FeedMe RSS feeds", feeds)), mimetype="text/x-opml",
+                    headers={"Content-Disposition": "attachment; filename=feedme.opml"})
+
+
+@app.route("/api/feeds", methods=["POST"])
+@login_required
+def batch_update_feeds():
+    """
+    Adds, renames and deletes many RSS feed URLs in a single transaction.
+    The request is a JSON object with optional lists "delete" and "add" of URLs, and "rename" of objects
+    with "old_url" and "new_url". Deletes are applied first, then renames, then adds, each in list order.
+    :return: JSON object with the same lists, giving the status of each operation.
+    """
+    operations = request.get_json(silent=True)
+    if not isinstance(operations, dict):
+        return jsonify(error="Please provide a JSON object of operations"), 400
+    deletes = operations.get("delete", [])
+    renames = operations.get("rename", [])
+    adds = operations.get("add", [])
+    if not all(isinstance(operation, list) for operation in (deletes, renames, adds)):
+        return jsonify(error="Please provide the operations as lists"), 400
+    if len(deletes) + len(renames) + len(adds) > app.config["FEED_API_MAX_OPERATIONS"]:
+        return jsonify(error="Please provide at most {} operations".format(app.config["FEED_API_MAX_OPERATIONS"])), 400
+
+    renames = [(rename.get("old_url"), rename.get("new_url")) if isinstance(rename, dict) else (None, None)
+               for rename in renames]
+    referenced = list({url for url in deletes + adds + [url for rename in renames for url in rename]
+                       if _is_valid_url(url)})
+    known = set()
+    for start in range(0, len(referenced), STORED_ITEM_BATCH_SIZE):
+        batch = referenced[start:start + STORED_ITEM_BATCH_SIZE]
+        known.update(url for (url,) in db.session.query(RssFeedUrl.url).filter(RssFeedUrl.url.in_(batch)))
+
+    # Works out each operation's outcome against the URLs as they will be, so the SQL can be issued in bulk.
+    delete_results, deleted = [], []
+    for url in deletes:
+        status = "invalid" if not _is_valid_url(url) else "not_found" if url not in known else "deleted"
+        if status == "deleted":
+            known.discard(url)
+            deleted.append(url)
+        delete_results.append({"url": url, "status": status})
+
+    rename_results, renamed = [], []
+    for old_url, new_url in renames:
+        if not _is_valid_url(old_url) or not _is_valid_url(new_url):
+            status = "invalid"
+        elif old_url not in known:
+            status = "not_found"
+        elif new_url in known:
+            status = "conflict"
+        else:
+            status = "renamed"
+            known.discard(old_url)
+            known.add(new_url)
+            renamed.append({"old_url": old_url, "new_url": new_url})
+        rename_results.append({"old_url": old_url, "new_url": new_url, "status": status})
+
+    add_results, added = [], []
+    for url in adds:
+        status = "invalid" if not _is_valid_url(url) else "exists" if url in known else "added"
+        if status == "added":
+            known.add(url)
+            added.append({"url": url})
+        add_results.append({"url": url, "status": status})
+
+    table = RssFeedUrl.__table__
+    try:
+        for start in range(0, len(deleted), STORED_ITEM_BATCH_SIZE):
+            db.session.execute(table.delete().where(table.c.url.in_(deleted[start:start + STORED_ITEM_BATCH_SIZE])))
+        if renamed:
+            db.session.execute(table.update().where(table.c.url == bindparam("old_url"))
+                               .values(url=bindparam("new_url")), renamed)
+        if added:
+            db.session.execute(table.insert(), added)
+        db.session.commit()
+    except IntegrityError as error:
+        # Another request changed the same URLs since they were read, so nothing is applied.
+        db.session.rollback()
+        print(error)
+        return jsonify(error="The RSS feed URLs were changed by another request, please retry"), 409
+
+    print("Deleted {}, renamed {} and added {} RSS feed URLs".format(len(deleted), len(renamed), len(added)))
+    return jsonify(delete=delete_results, rename=rename_results, add=add_results)
+
+
+def _is_valid_url(url):
+    return isinstance(url, str) and bool(url.strip())
+
+
 @app.route("/login", methods=["GET", "POST"])
 def login():
     """
@@ -142,11 +1007,25 @@ def login():
     """
     login_form = LoginForm()
     if login_form.validate_on_submit():
+        if not password_attempts.allow(request.remote_addr):
+            flash("Too many attempts. Please try again later")
+            return render_template("login.html", page_title="Login", form=login_form), 429
+
         user = User.query.get(login_form.email.data)
+        try:
+            verified = user and password_hasher.verify(user.password, login_form.password.data)
+            # Upgrades the stored hash to the current work factor while the password is known.
+            new_password = (password_hasher.hash(login_form.password.data)
+                            if verified and password_hasher.needs_rehash(user.password) else None)
+        except PasswordHasherBusy as error:
+            print(error.message)
+            flash("The server is busy. Please try again later")
+            return render_template("login.html", page_title="Login", form=login_form), 503
 
-        if user and user.check_password(login_form.password.data):
+        if verified:
             login_user(user, remember=login_form.remember_me.data)
-            _mark_user_authenticated(user, True)
+            if new_password:
+                _update_user(user, {"password": new_password})
             flash("Logged in successfully")
 
             next_url = request.args.get("next")
@@ -165,20 +1044,19 @@ def logout():
     Log out the current user.
     :return: the home page.
     """
-    user = current_user
-    _mark_user_authenticated(user, False)
     logout_user()
     print("Successfully logged out user")
     return redirect("/")
 
 
-def _mark_user_authenticated(user, authenticated):
+def _update_user(user, values):
     try:
-        user.authenticated = authenticated
-        db.session.add(user)
+        # Updates the row directly, as the user may be a cached copy belonging to no session.
+        db.session.query(User).filter_by(email=user.get_id()).update(values, synchronize_session=False)
         db.session.commit()
     except InvalidRequestError as error:
         print(error)
+    loaded_users.delete(user.get_id())
 
 
 @app.route("/register", methods=["GET", "POST"])
@@ -192,8 +1070,16 @@ def register():
 
     registration_form = RegistrationForm()
     if registration_form.validate_on_submit():
-        user = User(email=registration_form.email.data)
-        user.set_password(registration_form.password.data)
+        if not password_attempts.allow(request.remote_addr):
+            flash("Too many attempts. Please try again later")
+            return render_template("register.html", page_title="Register", form=registration_form), 429
+        try:
+            password = password_hasher.hash(registration_form.password.data)
+        except PasswordHasherBusy as error:
+            print(error.message)
+            flash("The server is busy. Please try again later")
+            return render_template("register.html", page_title="Register", form=registration_form), 503
+        user = User(email=registration_form.email.data, password=password)
         db.session.add(user)
         db.session.commit()
         flash("You have successfully registered!")
@@ -207,10 +1093,32 @@ def user_loader(user_id):
     """
     Returns the associated User object for a given user id.
     :param user_id: email of the user
-    :return: the User object
+    :return: the User object, or None if there is no such user
     """
-    return User.query.get(user_id)
+    user = loaded_users.get(user_id)
+    if user is None:
+        user = User.query.get(user_id)
+        if user is None:
+            return None
+        # Caches a copy outside any session, so it can be shared between requests and threads. Users are only
+        # loaded for sessions they logged in to, so being logged in is told by the session, never stored.
+        user = User(email=user.email, password=user.password, authenticated=True)
+        loaded_users.set(user_id, user)
+    return user
+
+
+def _forget_loaded_user(mapper, connection, user):
+    loaded_users.delete(user.email)
+
+
+event.listen(User, "after_update", _forget_loaded_user)
+event.listen(User, "after_delete", _forget_loaded_user)
+
 
+# Avoid starting a second poller in the debug reloader's watcher process.
+if app.config["FEED_POLLER_ENABLED"] and (not app.debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true"):
+    start_feed_poller()
 
 if __name__ == '__main__':
+    start_feed_poller()
     app.run()
@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+"""
+Compares the memory and time taken to parse large feeds into slotted, lazily formatted items
+against dict backed items formatted eagerly on parse.
+
+Usage: python -m benchmarks.bench_rss_items [item counts...]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic_feed import generate_entries
+from parser.rss_channel import RssChannel, _validate_item, _extract_key
+
+DEFAULT_ITEM_COUNTS = [10000, 100000]
+ITEMS_SHOWN = 20
+
+
+class _EagerRssItem:
+    """
+    Item representation before slotting, formatted as soon as it is parsed.
+    """
+
+    def __init__(self, title, link, summary, published, author):
+        self.title = title
+        self.link = link
+        self.summary = summary
+        self.published = published
+        self.author = author
+
+    def format_item_content(self):
+        return "<h3>{title}</h3>" \
+               "<p><a href=\"{link}\" target=\"_blank\">{link}</a></p>" \
+               "<p>{summary}</p>" \
+               "<p>{published} - {author}</p>" \
+            .format(title=self.title, link=self.link, summary=self.summary, published=self.published,
+                    author=self.author)
+
+
+def _parse_items_eagerly(items):
+    rss_items = []
+    for item in items:
+        _validate_item(item)
+        rss_item = _EagerRssItem(item["title"], item["link"], _extract_key(item, "summary", None),
+                                 _extract_key(item, "published", "updated"), _extract_key(item, "author", None))
+        rss_items.append(rss_item.format_item_content())
+    return rss_items
+
+
+def measure(function):
+    """
+    :return: tuple of result, seconds taken and peak bytes allocated while calling function.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def run(item_counts):
+    print("{:>8} {:<8} {:>10} {:>12} {:>14}".format("items", "mode", "parse (s)", "peak (MiB)", "top 20 (ms)"))
+    for count in item_counts:
+        entries = generate_entries(count)
+
+        _, eager_seconds, eager_peak = measure(lambda: _parse_items_eagerly(entries))
+        print("{:>8} {:<8} {:>10.3f} {:>12.1f} {:>14}".format(count, "eager", eager_seconds, eager_peak / 2 ** 20, "-"))
+
+        rss_channel, lazy_seconds, lazy_peak = measure(lambda: RssChannel("Title", "link", "blah", entries))
+        rss_channel.rss_items = rss_channel.rss_items[:ITEMS_SHOWN]
+        _, render_seconds, _ = measure(rss_channel.format_feed_content)
+        print("{:>8} {:<8} {:>10.3f} {:>12.1f} {:>14.2f}".format(count, "lazy", lazy_seconds, lazy_peak / 2 ** 20,
+                                                                 render_seconds * 1000))
+
+
+if __name__ == '__main__':
+    sys.exit(run([int(count) for count in sys.argv[1:]] or DEFAULT_ITEM_COUNTS))
@@ -0,0 +1,37 @@
+#!/usr/bin/python3
+"""
+Compares the time and memory taken to parse large RSS 2.0 documents with feedparser
+against the fast xml parser backend.
+
+Usage: python -m benchmarks.bench_xml_parser [item counts...]
+"""
+import sys
+
+import feedparser
+
+from benchmarks.bench_rss_items import measure
+from benchmarks.synthetic_feed import generate_document
+from parser.xml_feed_parser import parse_feed_document
+
+DEFAULT_ITEM_COUNTS = [1000, 10000, 50000]
+PARSERS = {
+    "feedparser": feedparser.parse,
+    "xml": parse_feed_document
+}
+
+
+def run(item_counts):
+    print("{:>8} {:<12} {:>10} {:>12} {:>9}".format("items", "parser", "parse (s)", "peak (MiB)", "speed up"))
+    for count in item_counts:
+        document = generate_document(count)
+        baseline_seconds = None
+        for name, parse in PARSERS.items():
+            rss_feed, seconds, peak = measure(lambda: parse(document))
+            assert len(rss_feed["entries"]) == count
+            baseline_seconds = baseline_seconds or seconds
+            print("{:>8} {:<12} {:>10.3f} {:>12.1f} {:>8.1f}x".format(count, name, seconds, peak / 2 ** 20,
+                                                                      baseline_seconds / seconds))
+
+
+if __name__ == '__main__':
+    sys.exit(run([int(count) for count in sys.argv[1:]] or DEFAULT_ITEM_COUNTS))
@@ -0,0 +1,144 @@
+#!/usr/bin/python3
+"""
+Micro-benchmarks for the RSS parsing and rendering hot paths.
+Runs entirely offline against synthetic feeds and saves the results as JSON, so runs from
+different commits can be compared.
+
+Usage: python -m benchmarks.run_benchmarks [--sizes 10 1000] [--compare benchmarks/results/<label>.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+import tracemalloc
+
+from benchmarks.synthetic_feed import generate_feed, generate_document
+from parser.rss_channel import RssChannel, _parse_items, _validate_item
+from parser.rss_parser import _create_rss_channel
+from parser.xml_feed_parser import parse_feed_document
+from utils.files import get_full_path
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.25
+RESULTS_DIRECTORY = get_full_path("benchmarks", "results")
+
+
+def _benchmarks(rss_feed):
+    entries = rss_feed["entries"]
+    rss_channel = RssChannel("Synthetic Feed", "link", "blah", entries)
+    document = generate_document(len(entries))
+    return {
+        "parse_feed_document": lambda: parse_feed_document(document),
+        "_create_rss_channel": lambda: _create_rss_channel(rss_feed),
+        "_parse_items": lambda: _parse_items(entries),
+        "_validate_item": lambda: [_validate_item(entry) for entry in entries],
+        "format_feed_content": rss_channel.format_feed_content
+    }
+
+
+def _time(function, repeat):
+    # Loop small cases enough to dwarf timer resolution, then keep the least noisy (fastest) run.
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _peak_memory(function):
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(sizes, repeat):
+    """
+    Times each hot path against synthetic feeds of each size.
+    :param sizes: the numbers of entries to benchmark with.
+    :param repeat: the number of timed runs per benchmark, of which the fastest is kept.
+    :return: list of results, each with name, size, seconds and peak_bytes.
+    """
+    results = []
+    for size in sizes:
+        rss_feed = generate_feed(size)
+        for name, function in _benchmarks(rss_feed).items():
+            # Timed separately from the memory run, as tracing allocations slows everything down.
+            seconds = _time(function, repeat)
+            peak_bytes = _peak_memory(function)
+            results.append({"name": name, "size": size, "seconds": seconds, "peak_bytes": peak_bytes})
+            print("{:<22} {:>8} {:>12.6f}s {:>10.2f} MiB".format(name, size, seconds, peak_bytes / 2 ** 20))
+    return results
+
+
+def save(results, label, directory=RESULTS_DIRECTORY):
+    """
+    Saves benchmark results as JSON.
+    :return: the path of the saved results.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "{}.json".format(label))
+    with open(path, "w") as results_file:
+        json.dump({"label": label, "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                   "python": platform.python_version(), "results": results}, results_file, indent=2)
+    return path
+
+
+def compare(results, baseline_path, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares results with previously saved results.
+    :param threshold: the relative slow down or memory growth reported as a regression.
+    :return: list of regression descriptions.
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = {(result["name"], result["size"]): result for result in json.load(baseline_file)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get((result["name"], result["size"]))
+        if not previous:
+            continue
+        for metric in ["seconds", "peak_bytes"]:
+            change = (result[metric] - previous[metric]) / previous[metric] if previous[metric] else 0
+            print("{:<22} {:>8} {:<10} {:>+8.1%}".format(result["name"], result["size"], metric, change))
+            if change > threshold:
+                regressions.append("{} with {} entries: {} up {:.1%}".format(
+                    result["name"], result["size"], metric, change))
+    return regressions
+
+
+def _git_label():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=get_full_path(),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "local"
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the RSS parsing and rendering hot paths.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--label", default=None, help="name of the saved results, defaults to the git commit")
+    parser.add_argument("--output", default=RESULTS_DIRECTORY, help="directory to save results in")
+    parser.add_argument("--compare", default=None, help="saved results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    options = parser.parse_args(arguments)
+
+    results = run(options.sizes, options.repeat)
+    print("Saved results to", save(results, options.label or _git_label(), options.output))
+
+    if options.compare:
+        regressions = compare(results, options.compare, options.threshold)
+        for regression in regressions:
+            print("Regression:", regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
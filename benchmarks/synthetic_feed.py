@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Generates synthetic feedparser style responses for benchmarking, shaped like tests/test_data/rss_sample.json,
+along with the matching RSS 2.0 documents.
+"""
+import time
+from xml.sax.saxutils import escape
+
+FIRST_PUBLISHED_AT = 1560443067
+
+
+def generate_entries(count):
+    """
+    :param count: the number of entries to generate.
+    :return: feedparser style entries, newest first.
+    """
+    entries = []
+    for index in range(count):
+        published_at = FIRST_PUBLISHED_AT - index * 60
+        entries.append({
+            "id": "https://www.example.com/rss/{} at https://www.example.com".format(index),
+            "title": "Entry title number {}".format(index),
+            "link": "https://www.example.com/articles/{}?utm_source=internal&utm_medium=rss".format(index),
+            "summary": "Summary of entry number {} with a little more text to resemble a real feed.".format(index),
+            "published": time.strftime("%a, %d %b %Y %H:%M:%S +0000", time.gmtime(published_at)),
+            "published_parsed": time.gmtime(published_at),
+            "author": "Joe Bloggs"
+        })
+    return entries
+
+
+def generate_feed(count):
+    """
+    :param count: the number of entries to generate.
+    :return: a feedparser style response with count entries.
+    """
+    return {
+        "feed": {"title": "Synthetic Feed", "link": "https://www.example.com/rss/xml",
+                 "description": "Synthetic feed with {} entries".format(count), "language": "en"},
+        "entries": generate_entries(count),
+        "encoding": "utf-8",
+        "version": "rss20"
+    }
+
+
+def generate_document(count):
+    """
+    :param count: the number of entries to generate.
+    :return: an RSS 2.0 document with count items, encoded as UTF-8.
+    """
+    rss_feed = generate_feed(count)
+    items = ["<item><title>{title}</title><link>{link}</link><description>{summary}</description>"
+             "<pubDate>{published}</pubDate><author>{author}</author><guid>{id}</guid></item>"
+             .format(**{key: escape(value) for key, value in entry.items() if isinstance(value, str)})
+             for entry in rss_feed["entries"]]
+    feed = {key: escape(value) for key, value in rss_feed["feed"].items()}
+    return ("<?xml version=\"1.0\" encoding=\"UTF-8\"?><rss version=\"2.0\"><channel>"
+            "<title>{title}</title><link>{link}</link><description>{description}</description>"
+            "<language>{language}</language>{items}</channel></rss>"
+            .format(items="".join(items), **feed).encode("utf-8"))
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+"""
+Memory bounded cache which spills least recently used entries to disk.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask_caching.backends.base import BaseCache
+
+from caching.sqlite_cache import SqliteCache, DEFAULT_DISK_MAX_BYTES
+
+DEFAULT_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+
+
+class BoundedCache(BaseCache):
+    """
+    Two tier cache holding at most max_bytes of pickled values in memory.
+    The least recently used entries are evicted to an optional SQLite tier on disk,
+    and promoted back into memory when they are next read.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_MAX_BYTES, disk_path=None, disk_max_bytes=DEFAULT_DISK_MAX_BYTES,
+                 default_timeout=300):
+        super(BoundedCache, self).__init__(default_timeout)
+        self.max_bytes = max_bytes
+        self.disk = SqliteCache(disk_path, disk_max_bytes, default_timeout) if disk_path else None
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(dict(max_bytes=config.get("CACHE_MEMORY_MAX_BYTES", DEFAULT_MEMORY_MAX_BYTES),
+                           disk_path=config.get("CACHE_DISK_PATH"),
+                           disk_max_bytes=config.get("CACHE_DISK_MAX_BYTES", DEFAULT_DISK_MAX_BYTES)))
+        return cls(*args, **kwargs)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if not expires or expires > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return pickle.loads(value)
+                self._remove(key)
+
+        entry = self.disk.get_entry(key) if self.disk else None
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        value, expires = entry
+        self._store(key, value, expires)
+        with self._lock:
+            self.disk_hits += 1
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout=None):
+        timeout = self._normalize_timeout(timeout)
+        expires = time.time() + timeout if timeout > 0 else 0
+        self._store(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires)
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def has(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not entry[1] or entry[1] > time.time()):
+                return True
+        return bool(self.disk and self.disk.has(key))
+
+    def delete(self, key):
+        with self._lock:
+            deleted = self._remove(key)
+        if self.disk:
+            deleted = self.disk.delete(key) or deleted
+        return deleted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.disk:
+            self.disk.clear()
+        return True
+
+    def stats(self):
+        """
+        :return: dict of hit, miss and eviction counts along with the memory (and disk) usage.
+        """
+        with self._lock:
+            stats = {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                     "evictions": self.evictions, "entries": len(self._entries), "bytes": self._size,
+                     "max_bytes": self.max_bytes}
+        if self.disk:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+    def _store(self, key, value, expires):
+        with self._lock:
+            in_memory = self._remove(key)
+        # Entries live in a single tier, so a key missing from memory may have an older copy on disk.
+        if self.disk and not in_memory:
+            self.disk.delete(key)
+        with self._lock:
+            self._remove(key)
+            if _entry_size(key, value) > self.max_bytes:
+                evicted = [(key, value, expires)]
+            else:
+                self._entries[key] = (value, expires)
+                self._size += _entry_size(key, value)
+                evicted = self._evict()
+        # Write evicted entries to disk outside the lock so readers never wait on disk I/O.
+        for evicted_key, evicted_value, evicted_expires in evicted:
+            if self.disk and (not evicted_expires or evicted_expires > time.time()):
+                self.disk.set_entry(evicted_key, evicted_value, evicted_expires)
+
+    def _evict(self):
+        evicted = []
+        while self._size > self.max_bytes:
+            key, (value, expires) = self._entries.popitem(last=False)
+            self._size -= _entry_size(key, value)
+            self.evictions += 1
+            evicted.append((key, value, expires))
+        return evicted
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._size -= _entry_size(key, entry[0])
+        return True
+
+
+def _entry_size(key, value):
+    return len(key) + len(value)
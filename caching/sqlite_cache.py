@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+"""
+SQLite backed cache, used as the on-disk tier of the bounded cache, or on its own as a cache
+shared by every process on a node.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+
+from flask_caching.backends.base import BaseCache
+
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+PRUNE_BATCH_SIZE = 100
+# Other processes write to the same database, so its size is summed afresh at least this often.
+PRUNE_CHECK_WRITES = 100
+# Once over budget, prunes to below it, so the next writes need not prune again straight away.
+PRUNE_TARGET_RATIO = 0.9
+BUSY_TIMEOUT = 5
+BUSY_RETRY_INTERVAL = 0.01
+# Entries are only marked as recently used this many seconds apart, so most reads never write.
+TOUCH_INTERVAL = 60
+
+
+class SqliteCache(BaseCache):
+    """
+    Cache storing pickled values in a SQLite database, evicting the least recently used
+    entries once the stored values exceed max_bytes.
+    Any number of processes may share the database, and hold leases on keys to coordinate work between them.
+    """
+
+    def __init__(self, path, max_bytes=DEFAULT_DISK_MAX_BYTES, default_timeout=300):
+        super(SqliteCache, self).__init__(default_timeout)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        # Estimated bytes stored, so the stored values need only be summed once likely over budget.
+        self._size = None
+        self._writes = 0
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        kwargs.update(dict(path=config["CACHE_DISK_PATH"],
+                           max_bytes=config.get("CACHE_DISK_MAX_BYTES", DEFAULT_DISK_MAX_BYTES)))
+        return cls(*args, **kwargs)
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return pickle.loads(entry[0]) if entry else None
+
+    def set(self, key, value, timeout=None):
+        self.set_entry(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiry(timeout))
+        return True
+
+    def add(self, key, value, timeout=None):
+        if self.has(key):
+            return False
+        return self.set(key, value, timeout)
+
+    def has(self, key):
+        return self.get_entry(key, touch=False) is not None
+
+    def delete(self, key):
+        with self._lock:
+            deleted = self._execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount
+        return deleted > 0
+
+    def clear(self):
+        with self._lock:
+            self._execute("DELETE FROM cache")
+            self._size = 0
+        return True
+
+    def get_entry(self, key, touch=True):
+        """
+        Returns the raw entry stored for a key.
+        :param key: the cache key.
+        :param touch: whether to mark the entry as recently used, unless it was marked within the touch interval.
+        :return: tuple of pickled value and expiry time, or None if missing or expired.
+        """
+        with self._lock:
+            row = self._execute("SELECT value, expires, accessed FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, expires, accessed = row
+            now = time.time()
+            if expires and expires <= now:
+                self._execute("DELETE FROM cache WHERE key = ?", (key,))
+                return None
+            if touch and now - accessed >= TOUCH_INTERVAL:
+                self._execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return value, expires
+
+    def set_entry(self, key, value, expires):
+        """
+        Stores a raw entry, evicting the least recently used entries if over budget.
+        :param key: the cache key.
+        :param value: the pickled value.
+        :param expires: the expiry time, or 0 if the entry never expires.
+        """
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            self._execute("INSERT OR REPLACE INTO cache (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)",
+                          (key, sqlite3.Binary(value), expires, time.time(), len(value)))
+            self._writes += 1
+            if self._size is not None:
+                self._size += len(value)
+            if self._size is None or self._size > self.max_bytes or self._writes >= PRUNE_CHECK_WRITES:
+                self._prune()
+
+    def acquire_lock(self, key, timeout):
+        """
+        Takes a lease on a key, unless another holder's lease on it has yet to expire.
+        :param key: identifies what the lease is for.
+        :param timeout: seconds until the lease expires, should its holder never release it.
+        :return: token to release the lease with, or None if the key is already leased.
+        """
+        token = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            # A single upsert, so competing processes can never both take the lease.
+            acquired = self._execute("INSERT INTO locks (key, token, expires) VALUES (?, ?, ?) "
+                                     "ON CONFLICT (key) DO UPDATE SET token = excluded.token, "
+                                     "expires = excluded.expires WHERE locks.expires <= ?",
+                                     (key, token, now + timeout, now)).rowcount
+        return token if acquired else None
+
+    def release_lock(self, key, token):
+        """
+        Releases a lease, unless it has since expired and been taken by another holder.
+        :return: True if the lease was released.
+        """
+        with self._lock:
+            released = self._execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token)).rowcount
+        return released > 0
+
+    def stats(self):
+        """
+        :return: dict of entry count, stored bytes and eviction count.
+        """
+        with self._lock:
+            entries, size = self._execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+        return {"entries": entries, "bytes": size, "evictions": self.evictions}
+
+    def _expiry(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    def _prune(self):
+        self._writes = 0
+        (size,) = self._execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+        if size <= self.max_bytes:
+            self._size = size
+            return
+        self._execute("DELETE FROM cache WHERE expires > 0 AND expires <= ?", (time.time(),))
+        (size,) = self._execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()
+        target = self.max_bytes * PRUNE_TARGET_RATIO
+        while size > target:
+            rows = self._execute("SELECT key, size FROM cache ORDER BY accessed LIMIT ?",
+                                 (PRUNE_BATCH_SIZE,)).fetchall()
+            # Another process may have emptied the cache since it was summed.
+            if not rows:
+                size = 0
+                break
+            for key, entry_size in rows:
+                if size <= target:
+                    break
+                if self._execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount:
+                    size -= entry_size
+                    self.evictions += 1
+        self._size = size
+
+    def _execute(self, statement, parameters=()):
+        # A connection inherited from a parent process must never be used, so forked workers reconnect.
+        if self._connection is None or self._pid != os.getpid():
+            # Autocommit mode, each statement is durable on its own.
+            self._connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                                               isolation_level=None)
+            self._pid = os.getpid()
+            self._enable_wal()
+            self._connection.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                                     "expires REAL NOT NULL, accessed REAL NOT NULL, size INTEGER NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, token TEXT NOT NULL, "
+                                     "expires REAL NOT NULL)")
+        return self._connection.execute(statement, parameters)
+
+    def _enable_wal(self):
+        # Lets readers in other processes carry on while one process writes. SQLite skips the busy timeout while
+        # a new database is switched to WAL, so retry while another process is switching it.
+        deadline = time.monotonic() + BUSY_TIMEOUT
+        while True:
+            try:
+                self._connection.execute("PRAGMA journal_mode = WAL")
+                return
+            except sqlite3.OperationalError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(BUSY_RETRY_INTERVAL)
@@ -2,26 +2,163 @@
 """
 Responsible for handling the RSS feed data.
 """
-from parser.rss_parser import RssUrlParser, RssParserError
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from parser.rss_parser import RssUrlParser, RssParserError, DEFAULT_PARSER_BACKEND
+from urllib.parse import urlparse
 
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_MAX_PER_HOST = 2
+DEFAULT_FETCH_TIMEOUT = 30
 
-def fetch_content_for_feed_url(rss_feed_url):
+
+def fetch_content_for_feed_url(rss_feed_url, parser_backend=DEFAULT_PARSER_BACKEND):
     """
     Returns the feed content for a provided RSS feed url.
     :param rss_feed_url:
+    :param parser_backend: name of the parser backend to parse the RSS feed with.
     :return:
     """
     feed_content = "No RSS feed content to display"
     if not rss_feed_url:
         return feed_content
     try:
-        rss_url_parser = RssUrlParser(rss_feed_url)
-        feed_content = rss_url_parser.parse()
+        feed_content = _parse_feed_content(rss_feed_url, parser_backend)
     except RssParserError as error:
         print(error.message)
     return feed_content
 
 
+def fetch_channel_for_feed_url(rss_feed_url, parser_backend=DEFAULT_PARSER_BACKEND, http_client=None,
+                               load_unmodified=None):
+    """
+    Returns the parsed RSS channel for a provided RSS feed url.
+    :param rss_feed_url: the RSS feed url.
+    :param parser_backend: name of the parser backend to parse the RSS feed with.
+    :param http_client: the HttpClient to fetch the RSS feed with, for the backends which use one.
+    :param load_unmodified: callable returning the channel kept for the RSS feed url, reused if it is not modified.
+    :return: the parsed RSS channel.
+    :raises RssParserError: if the RSS feed could not be fetched or parsed.
+    """
+    rss_url_parser = RssUrlParser(rss_feed_url, parser_backend, http_client, load_unmodified)
+    return rss_url_parser.parse_channel()
+
+
+async def fetch_channel_for_feed_url_async(rss_feed_url, parser_backend, http_client, executor=None,
+                                           load_unmodified=None):
+    """
+    Returns the parsed RSS channel for a provided RSS feed url, awaiting its fetch on the running event loop.
+    :param rss_feed_url: the RSS feed url.
+    :param parser_backend: name of the parser backend to parse the RSS feed with, one which fetches over HTTP.
+    :param http_client: the AsyncHttpClient to fetch the RSS feed with.
+    :param executor: the executor to parse the fetched RSS feed on, defaults to the event loop's.
+    :param load_unmodified: callable returning the channel kept for the RSS feed url, reused if it is not modified.
+    :return: the parsed RSS channel.
+    :raises RssParserError: if the RSS feed could not be fetched or parsed.
+    """
+    rss_url_parser = RssUrlParser(rss_feed_url, parser_backend, load_unmodified=load_unmodified)
+    return await rss_url_parser.parse_channel_async(http_client, executor)
+
+
+def fetch_many(rss_feed_urls, fetch=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+               max_per_host=DEFAULT_MAX_PER_HOST, timeout=DEFAULT_FETCH_TIMEOUT):
+    """
+    Fetches the feed content for many RSS feed urls concurrently.
+    At most max_concurrency fetches run at once, and at most max_per_host against any single host.
+    :param rss_feed_urls: the RSS feed urls to fetch.
+    :param fetch: callable fetching a single RSS feed url, defaults to parsing its formatted content.
+    :param max_concurrency: the maximum number of fetches in flight.
+    :param max_per_host: the maximum number of fetches in flight per host.
+    :param timeout: seconds a single fetch may take, including any wait for a free worker, before it is reported
+    as failed, or None to wait forever.
+    :return: generator of FeedFetchResult, in the order the fetches complete.
+    """
+    fetch = fetch or _parse_feed_content
+    pending = deque(url for url in dict.fromkeys(rss_feed_urls) if url)
+    in_flight = {}
+    in_flight_per_host = defaultdict(int)
+    # Deadlines run from submission, as a fetch queued behind a hung one may never get a thread to start on.
+    submitted = {}
+
+    def submit_ready():
+        for _ in range(len(pending)):
+            if len(in_flight) >= max_concurrency:
+                return
+            url = pending.popleft()
+            host = urlparse(url).netloc
+            if in_flight_per_host[host] >= max_per_host:
+                pending.append(url)
+                continue
+            in_flight_per_host[host] += 1
+            submitted[url] = time.monotonic()
+            in_flight[executor.submit(fetch, url)] = (url, host)
+
+    def complete(future):
+        url, host = in_flight.pop(future)
+        in_flight_per_host[host] -= 1
+        submitted.pop(url, None)
+        return url
+
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="feed-fetch")
+    try:
+        while pending or in_flight:
+            submit_ready()
+            done, _ = wait(in_flight, timeout=_next_fetch_deadline(submitted, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                url = complete(future)
+                try:
+                    yield FeedFetchResult(url, content=future.result())
+                except Exception as error:
+                    yield FeedFetchResult(url, error=error)
+            for future in _expired_fetches(in_flight, submitted, timeout):
+                url = complete(future)
+                future.cancel()
+                yield FeedFetchResult(url, error=RssFeedError("Timed out fetching RSS feed URL %s" % url))
+    finally:
+        # Timed out fetches cannot be interrupted, so never block waiting on them.
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _parse_feed_content(rss_feed_url, parser_backend=DEFAULT_PARSER_BACKEND):
+    rss_url_parser = RssUrlParser(rss_feed_url, parser_backend)
+    return rss_url_parser.parse()
+
+
+def _next_fetch_deadline(submitted, timeout):
+    if timeout is None or not submitted:
+        return None
+    return max(0.0, min(submitted.values()) + timeout - time.monotonic())
+
+
+def _expired_fetches(in_flight, submitted, timeout):
+    if timeout is None:
+        return []
+    now = time.monotonic()
+    return [future for future, (url, _) in in_flight.items()
+            if now - submitted[url] >= timeout and not future.done()]
+
+
+class FeedFetchResult:
+    """
+    Outcome of fetching a single RSS feed URL.
+    """
+
+    def __init__(self, url, content=None, error=None):
+        self.url = url
+        self.content = content
+        self.error = error
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    def __repr__(self):
+        return "<FeedFetchResult: {} {}>".format(self.url, "ok" if self.succeeded else self.error)
+
+
 class RssFeedError(Exception):
     """
     Thrown when an error occurs when updating RSS feed.
@@ -0,0 +1,76 @@
+#!/usr/bin/python3
+"""
+Rendered RSS feed content, as held in the cache.
+"""
+import gzip
+import hashlib
+import io
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+
+
+class FeedContent:
+    """
+    Rendered content for an RSS feed URL, when it was rendered and, optionally, how long it stays fresh.
+    The etag identifies the rendering, and modified_at is when a rendering with that etag was first cached.
+    The content is compressed once, as gzip and, if available, brotli. Only these encodings are cached,
+    with the content itself decompressed when first needed.
+    """
+    # Defaults for content cached before max ages and validators were recorded.
+    max_age = None
+    etag = None
+    modified_at = None
+
+    def __init__(self, content, refreshed_at=None, max_age=None, modified_at=None):
+        self.refreshed_at = time.time() if refreshed_at is None else refreshed_at
+        self.max_age = max_age
+        data = content.encode("utf-8")
+        self.etag = hashlib.blake2b(data, digest_size=16).hexdigest()
+        self.modified_at = self.refreshed_at if modified_at is None else modified_at
+        self.encodings = {"gzip": _gzip_compress(data)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(data, quality=BROTLI_QUALITY)
+        self._content = content
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = gzip.decompress(self.encodings["gzip"]).decode("utf-8")
+        return self._content
+
+    def is_stale(self, max_age):
+        """
+        :param max_age: number of seconds the content is considered fresh for, unless it has its own max age.
+        :return: True if the content is older than its max age.
+        """
+        return time.time() - self.refreshed_at > (self.max_age or max_age)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_content"] = None
+        return state
+
+    def __setstate__(self, state):
+        # Content cached before it was compressed holds only the content itself.
+        if "content" in state:
+            state["_content"] = state.pop("content")
+            state["encodings"] = {}
+        self.__dict__.update(state)
+
+    def __repr__(self):
+        return "<FeedContent: {} encodings>".format(", ".join(self.encodings) or "no")
+
+
+def _gzip_compress(data):
+    # A fixed mtime keeps the encoding the same for the same content. gzip.compress only takes one from Python 3.8.
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) as gzip_file:
+        gzip_file.write(data)
+    return buffer.getvalue()
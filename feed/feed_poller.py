@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Background poller which keeps RSS feed content refreshed ahead of cache expiry.
+"""
+import threading
+
+from feed.feed import fetch_many, DEFAULT_MAX_CONCURRENCY, DEFAULT_MAX_PER_HOST, DEFAULT_FETCH_TIMEOUT
+
+
+class FeedPoller(threading.Thread):
+    """
+    Periodically refreshes the content of every configured RSS feed URL.
+    """
+
+    def __init__(self, url_source, refresh, interval, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_per_host=DEFAULT_MAX_PER_HOST, timeout=DEFAULT_FETCH_TIMEOUT):
+        """
+        :param url_source: callable returning the RSS feed URLs to refresh.
+        :param refresh: callable refreshing the content for a single RSS feed URL.
+        :param interval: number of seconds to wait between polls.
+        :param max_concurrency: the maximum number of feeds refreshed at once.
+        :param max_per_host: the maximum number of feeds refreshed at once per host.
+        :param timeout: seconds a single refresh may run before it is reported as failed.
+        """
+        super(FeedPoller, self).__init__(name="feed-poller", daemon=True)
+        self.url_source = url_source
+        self.refresh = refresh
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            self.poll()
+            self._stopped.wait(self.interval)
+
+    def poll(self):
+        """
+        Refreshes the content for every RSS feed URL once.
+        :return: the number of RSS feed URLs successfully refreshed.
+        """
+        try:
+            urls = self.url_source()
+        except Exception as error:
+            print("Error loading RSS feed URLs to poll: {}".format(error))
+            return 0
+
+        refreshed = 0
+        results = fetch_many(urls, fetch=self.refresh, max_concurrency=self.max_concurrency,
+                             max_per_host=self.max_per_host, timeout=self.timeout)
+        for result in results:
+            if result.succeeded:
+                refreshed += 1
+            else:
+                print("Error refreshing RSS feed URL {}: {}".format(result.url, result.error))
+            if self._stopped.is_set():
+                results.close()
+                break
+        print("Refreshed {} of {} RSS feed URLs".format(refreshed, len(urls)))
+        return refreshed
+
+    def stop(self):
+        """
+        Stops the poller after the current refresh completes.
+        """
+        self._stopped.set()
@@ -0,0 +1,34 @@
+#!/usr/bin/python3
+"""
+Works out how often to refresh an RSS feed from its publisher's hints and how often it publishes.
+"""
+
+
+def observed_interval(published_times):
+    """
+    :param published_times: publish timestamps of the feed's most recent items, in any order.
+    :return: the median number of seconds between consecutive items, or None if it cannot be told.
+    """
+    times = sorted({published_at for published_at in published_times if published_at is not None})
+    gaps = sorted(later - earlier for earlier, later in zip(times, times[1:]))
+    if not gaps:
+        return None
+    middle = len(gaps) // 2
+    return gaps[middle] if len(gaps) % 2 else (gaps[middle - 1] + gaps[middle]) / 2
+
+
+def refresh_interval(ttl, observed, default_interval, min_interval, max_interval):
+    """
+    Refreshes twice per typical gap between items, so new items are picked up within about half a gap,
+    but never more often than the publisher allows the feed to be cached for.
+    :param ttl: seconds the publisher allows the feed to be cached for, or None.
+    :param observed: the typical seconds between the feed's items, or None.
+    :param default_interval: seconds between refreshes when the feed's cadence is unknown.
+    :param min_interval: the fewest seconds allowed between refreshes.
+    :param max_interval: the most seconds allowed between refreshes.
+    :return: the number of seconds to wait before refreshing the feed again.
+    """
+    interval = observed / 2 if observed else default_interval
+    if ttl:
+        interval = max(interval, ttl)
+    return int(min(max(interval, min_interval), max_interval))
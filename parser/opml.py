@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+"""
+Reads and writes OPML subscription lists, as used to move RSS feed URLs between feed readers.
+"""
+import io
+from parser.xml_events import iterparse, XML_PARSE_ERRORS
+from xml.sax.saxutils import escape, quoteattr
+
+
+def parse_opml(document):
+    """
+    Reads the RSS feed URLs from an OPML document, including those nested within categories.
+    :param document: the OPML document bytes.
+    :return: list of RSS feed URLs, in document order and without duplicates.
+    :raises OpmlError: if the document is not well-formed OPML.
+    """
+    urls = {}
+    try:
+        events = iterparse(io.BytesIO(document))
+        _, root = next(events)
+        if root.tag != "opml":
+            raise OpmlError("Unsupported OPML document: {}".format(root.tag))
+        for event, element in events:
+            if event == "start" and element.tag == "outline":
+                url = (element.get("xmlUrl") or "").strip()
+                if url:
+                    urls[url] = None
+            elif event == "end" and element.tag == "outline":
+                element.clear()
+    except StopIteration:
+        raise OpmlError("Empty OPML document")
+    except XML_PARSE_ERRORS as error:
+        raise OpmlError("Malformed OPML document: {}".format(error))
+    return list(urls)
+
+
+def iter_opml(title, feeds):
+    """
+    Writes an OPML document a piece at a time, so a long subscription list is never held in memory.
+    :param title: the title of the subscription list.
+    :param feeds: iterable of (url, title) for each RSS feed, where the title may be None.
+    :return: generator of the document's text fragments.
+    """
+    yield "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<opml version=\"2.0\">\n"
+    yield "<head><title>{}</title></head>\n<body>\n".format(escape(title))
+    for url, feed_title in feeds:
+        yield "<outline type=\"rss\" text={} xmlUrl={}/>\n".format(quoteattr(feed_title or url), quoteattr(url))
+    yield "</body>\n</opml>\n"
+
+
+class OpmlError(Exception):
+    """
+    Exception is thrown when an OPML document cannot be read.
+    """
+
+    def __init__(self, message):
+        super(OpmlError, self).__init__(message)
+        self.message = message
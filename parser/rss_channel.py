@@ -2,6 +2,8 @@
 """
 RSS feed channel.
 """
+import calendar
+from email.utils import parsedate_tz, mktime_tz
 
 
 def _validate_item(item):
@@ -12,8 +14,6 @@ def _validate_item(item):
 
 def _parse_items(items):
     rss_items = []
-    if not items:
-        rss_items.append("RSS feed is empty")
     for item in items:
         _validate_item(item)
         title = item['title']
@@ -21,11 +21,21 @@ def _parse_items(items):
         summary = _extract_key(item=item, key="summary", alternate=None)
         published = _extract_key(item=item, key="published", alternate="updated")
         author = _extract_key(item=item, key="author", alternate=None)
-        rss_item = RssItem(title, link, summary, published, author)
-        rss_items.append(rss_item.format_item_content())
+        guid = _extract_key(item=item, key="id", alternate="link") or link
+        published_at = _extract_timestamp(item, published)
+        rss_items.append(RssItem(title, link, summary, published, author, guid, published_at))
     return rss_items
 
 
+def _extract_timestamp(item, published):
+    published_parsed = _extract_key(item=item, key="published_parsed", alternate="updated_parsed")
+    if published_parsed:
+        return calendar.timegm(tuple(published_parsed)[:6] + (0, 0, 0))
+    # Feeds parsed without feedparser's *_parsed fields still carry RFC 822 dates.
+    parsed = parsedate_tz(published) if isinstance(published, str) else None
+    return mktime_tz(parsed) if parsed else None
+
+
 def _extract_key(item, key, alternate):
     try:
         value = item[key]
@@ -42,34 +52,75 @@ class RssChannel:
     Represents an RSS feed channel.
     """
 
-    def __init__(self, title, url, description, items):
+    def __init__(self, title, url, description, items, ttl=None):
+        """
+        :param ttl: seconds the publisher allows the feed to be cached for, if it says.
+        """
         self.title = title
         self.url = url
         self.description = description
         self.rss_items = _parse_items(items)
+        self.ttl = ttl
+
+    @classmethod
+    def from_rss_items(cls, title, url, description, rss_items):
+        """
+        Creates a channel from already parsed items.
+        :param rss_items: iterable of RssItem, which may be a generator consumed when rendering.
+        :return: the RSS channel.
+        """
+        rss_channel = cls(title, url, description, [])
+        rss_channel.rss_items = rss_items
+        return rss_channel
 
     def format_feed_content(self):
         """
         Formats feed content is a clean and readable manner.
         :return: the formatted feed content.
         """
-        return "<h2>{title}</h2>" \
-               "<p>{summary}</p>" \
-               "{rss_items}" \
-            .format(title=self.title, url=self.url, summary=self.description, rss_items="\n\n".join(self.rss_items))
+        return "".join(self.iter_feed_content())
+
+    def iter_feed_content(self):
+        """
+        Formats feed content incrementally, one item at a time.
+        :return: generator of formatted feed content fragments.
+        """
+        yield "<h2>{title}</h2>" \
+              "<p>{summary}</p>" \
+            .format(title=self.title, summary=self.description)
+        empty = True
+        for fragment in self.iter_items_content():
+            empty = False
+            yield fragment
+        if empty:
+            yield "RSS feed is empty"
+
+    def iter_items_content(self):
+        """
+        Formats the channel items incrementally, without the channel details.
+        :return: generator of formatted items.
+        """
+        separator = ""
+        for rss_item in self.rss_items:
+            yield separator + rss_item.format_item_content()
+            separator = "\n\n"
 
 
 class RssItem:
     """
     Represents an RSS feed channel item.
+    Slotted to keep large feeds compact; items are only formatted when rendered.
     """
+    __slots__ = ("title", "link", "summary", "published", "author", "guid", "published_at")
 
-    def __init__(self, title, link, summary, published, author):
+    def __init__(self, title, link, summary, published, author, guid=None, published_at=None):
         self.title = title
         self.link = link
         self.summary = summary
         self.published = published
         self.author = author
+        self.guid = guid or link
+        self.published_at = published_at
 
     def format_item_content(self):
         """
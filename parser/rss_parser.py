@@ -3,10 +3,31 @@
 Parser for RSS feeds.
 """
 
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_tz, mktime_tz
 from parser.rss_channel import RssChannel
+from parser.xml_feed_parser import parse_feed_document, XmlFeedError
 
 import feedparser
 
+from utils.http_client import HttpClient, HttpFetchError
+from utils.metrics import FEED_STAGE_SECONDS
+
+HTTP_NOT_MODIFIED = 304
+MAX_FEED_VALIDATORS = 1024
+DEFAULT_PARSER_BACKEND = "http"
+SYNDICATION_PERIODS = {"hourly": 60 * 60, "daily": 24 * 60 * 60, "weekly": 7 * 24 * 60 * 60,
+                       "monthly": 30 * 24 * 60 * 60, "yearly": 365 * 24 * 60 * 60}
+CACHE_CONTROL_MAX_AGE = re.compile(r"(?:^|[,\s])max-age\s*=\s*\"?(\d+)")
+
+_feed_validators = OrderedDict()
+_feed_validators_lock = threading.Lock()
+default_http_client = HttpClient()
+
 
 def _validate_rss_channel(rss_feed):
     if "feed" not in rss_feed or "entries" not in rss_feed:
@@ -28,7 +49,164 @@ def _create_rss_channel(rss_feed):
         description = feed['subtitle']
 
     items = rss_feed['entries']
-    return RssChannel(title, link, description, items)
+    return RssChannel(title, link, description, items, _extract_ttl(rss_feed))
+
+
+def _extract_ttl(rss_feed):
+    """
+    Reads how long the feed may be cached for from its ttl, its syndication update period
+    and the response's Cache-Control or Expires headers.
+    :return: the longest of the hinted number of seconds, or None if there are no hints.
+    """
+    feed = rss_feed['feed']
+    headers = {name.lower(): value for name, value in (rss_feed.get("headers") or {}).items()}
+    hints = [_feed_ttl(feed), _syndication_ttl(feed), _cache_control_ttl(headers), _expires_ttl(headers)]
+    hints = [hint for hint in hints if hint and hint > 0]
+    return max(hints) if hints else None
+
+
+def _feed_ttl(feed):
+    try:
+        return int(feed["ttl"]) * 60
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _syndication_ttl(feed):
+    if "sy_updateperiod" not in feed and "sy_updatefrequency" not in feed:
+        return None
+    period = SYNDICATION_PERIODS.get(str(feed.get("sy_updateperiod", "daily")).strip().lower())
+    try:
+        frequency = int(feed.get("sy_updatefrequency", 1))
+    except (TypeError, ValueError):
+        frequency = 1
+    return period // frequency if period and frequency > 0 else None
+
+
+def _cache_control_ttl(headers):
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-cache" in cache_control or "no-store" in cache_control:
+        return None
+    match = CACHE_CONTROL_MAX_AGE.search(cache_control)
+    return int(match.group(1)) if match else None
+
+
+def _expires_ttl(headers):
+    expires = parsedate_tz(headers.get("expires", ""))
+    if not expires:
+        return None
+    date = parsedate_tz(headers.get("date", ""))
+    return mktime_tz(expires) - (mktime_tz(date) if date else int(time.time()))
+
+
+def _get_feed_validators(url):
+    with _feed_validators_lock:
+        validators = _feed_validators.get(url)
+        if validators:
+            _feed_validators.move_to_end(url)
+        return validators
+
+
+def _store_feed_validators(url, rss_feed_response, rss_channel):
+    etag = rss_feed_response.get("etag")
+    modified = rss_feed_response.get("modified")
+    with _feed_validators_lock:
+        if not etag and not modified:
+            _feed_validators.pop(url, None)
+            return
+        _feed_validators[url] = FeedValidators(etag, modified, rss_channel.ttl)
+        _feed_validators.move_to_end(url)
+        while len(_feed_validators) > MAX_FEED_VALIDATORS:
+            _feed_validators.popitem(last=False)
+
+
+def clear_feed_validators():
+    """
+    Forgets the HTTP validators of every RSS feed URL, forcing full fetches.
+    """
+    with _feed_validators_lock:
+        _feed_validators.clear()
+
+
+def _parse_with_feedparser(url, validators, http_client):
+    if validators:
+        return feedparser.parse(url, etag=validators.etag, modified=validators.modified)
+    return feedparser.parse(url)
+
+
+def _parse_fetched_with_feedparser(url, validators, http_client):
+    return _fetch_and_parse(url, validators, http_client, _parse_document_with_feedparser)
+
+
+def _parse_fetched_with_xml_parser(url, validators, http_client):
+    return _fetch_and_parse(url, validators, http_client, _parse_document_with_xml_parser)
+
+
+def _fetch_and_parse(url, validators, http_client, parse_document):
+    try:
+        with FEED_STAGE_SECONDS.time(stage="download", feed=url):
+            response = http_client.get(url, _conditional_headers(validators))
+    except HttpFetchError as error:
+        raise RssParserError(error.message)
+    return _parse_fetched_response(url, response, parse_document)
+
+
+def _conditional_headers(validators):
+    headers = {}
+    if validators and validators.etag:
+        headers["If-None-Match"] = validators.etag
+    if validators and validators.modified:
+        headers["If-Modified-Since"] = validators.modified
+    return headers
+
+
+def _parse_fetched_response(url, response, parse_document):
+    if response.status == HTTP_NOT_MODIFIED:
+        return {"status": HTTP_NOT_MODIFIED}
+
+    rss_feed_response = parse_document(url, response)
+    rss_feed_response.update(status=response.status, etag=response.headers.get("ETag"),
+                             modified=response.headers.get("Last-Modified"),
+                             headers={name.lower(): value for name, value in response.headers.items()})
+    return rss_feed_response
+
+
+def _parse_document_with_feedparser(url, response):
+    # The body is already decompressed, so only pass on the headers which still describe it.
+    response_headers = {"content-type": response.headers.get("Content-Type", ""), "content-location": response.url}
+    return feedparser.parse(response.content, response_headers=response_headers)
+
+
+def _parse_document_with_xml_parser(url, response):
+    try:
+        return parse_feed_document(response.content)
+    except XmlFeedError as error:
+        print("Falling back to feedparser for URL {}: {}".format(url, error.message))
+        return _parse_document_with_feedparser(url, response)
+
+
+PARSER_BACKENDS = {
+    "feedparser": _parse_with_feedparser,
+    "http": _parse_fetched_with_feedparser,
+    "xml": _parse_fetched_with_xml_parser
+}
+# The backends whose fetches go through an HTTP client, and so can be awaited, with how each parses what it fetched.
+ASYNC_PARSER_BACKENDS = {
+    "http": _parse_document_with_feedparser,
+    "xml": _parse_document_with_xml_parser
+}
+
+
+class FeedValidators:
+    """
+    HTTP validators returned for an RSS feed URL, along with the ttl of the channel parsed from that response.
+    The channel itself is left to the caller to keep, as holding every parsed channel here would pin their items.
+    """
+
+    def __init__(self, etag, modified, ttl=None):
+        self.etag = etag
+        self.modified = modified
+        self.ttl = ttl
 
 
 class RssUrlParser:
@@ -36,22 +214,106 @@ class RssUrlParser:
     Parses RSS feed data from given RSS feed URL.
     """
 
-    def __init__(self, url):
+    def __init__(self, url, backend=DEFAULT_PARSER_BACKEND, http_client=None, load_unmodified=None):
+        """
+        :param url: the RSS feed URL.
+        :param backend: name of the parser backend. feedparser fetches and parses the feed itself, while
+        http and xml fetch it with the pooled HTTP client, then parse it with feedparser or the faster
+        xml parser respectively. The xml parser falls back to feedparser for documents it cannot parse.
+        :param http_client: the HttpClient used by the http and xml backends, defaults to a shared client.
+        :param load_unmodified: callable given the RSS feed URL, returning the channel kept from its last fetch,
+        or None if none was kept. The feed is only fetched conditionally when given.
+        """
+        if backend not in PARSER_BACKENDS:
+            raise RssParserError("Unknown parser backend %s" % backend)
         self.url = url
+        self.backend = backend
+        self.http_client = http_client or default_http_client
+        self.load_unmodified = load_unmodified
 
     def parse(self):
         """
         Parses RSS feed data from given RSS feed URL.
         :return: the formatted RSS feed data.
         """
-        if not self.url:
+        return self.parse_channel().format_feed_content()
+
+    def parse_channel(self):
+        """
+        Parses RSS feed data from given RSS feed URL.
+        The feed is fetched conditionally using the validators from the previous fetch,
+        reusing the channel given by load_unmodified if the feed has not been modified.
+        :return: the parsed RSS channel.
+        """
+        if not self.url or not self.url.strip():
             raise RssParserError("Error parsing for URL %s" % self.url)
 
         print("Parsing RSS feed for URL:", self.url)
-        rss_feed_response = feedparser.parse(self.url)
-        self._validate_response(rss_feed_response)
-        rss_channel = _create_rss_channel(rss_feed_response)
-        return rss_channel.format_feed_content()
+        rss_channel = self._fetch_channel(self._get_validators())
+        if rss_channel is None:
+            # The unmodified channel was no longer kept, so fetch it in full.
+            rss_channel = self._fetch_channel(None)
+        return rss_channel
+
+    def _fetch_channel(self, validators):
+        with FEED_STAGE_SECONDS.time(stage="fetch", feed=self.url):
+            rss_feed_response = PARSER_BACKENDS[self.backend](self.url, validators, self.http_client)
+        return self._create_channel(validators, rss_feed_response)
+
+    async def parse_channel_async(self, http_client, executor=None):
+        """
+        Parses RSS feed data from given RSS feed URL, as parse_channel does, but awaits the fetch
+        so no thread is held waiting on the feed's server. The fetched feed is parsed on the executor.
+        :param http_client: the AsyncHttpClient to fetch the RSS feed with.
+        :param executor: the executor to parse the fetched feed on, defaults to the event loop's.
+        :return: the parsed RSS channel.
+        :raises RssParserError: if the backend cannot be awaited, or the feed could not be fetched or parsed.
+        """
+        if self.backend not in ASYNC_PARSER_BACKENDS:
+            raise RssParserError("Parser backend %s cannot fetch asynchronously" % self.backend)
+        if not self.url or not self.url.strip():
+            raise RssParserError("Error parsing for URL %s" % self.url)
+
+        print("Parsing RSS feed asynchronously for URL:", self.url)
+        rss_channel = await self._fetch_channel_async(http_client, executor, self._get_validators())
+        if rss_channel is None:
+            # The unmodified channel was no longer kept, so fetch it in full.
+            rss_channel = await self._fetch_channel_async(http_client, executor, None)
+        return rss_channel
+
+    async def _fetch_channel_async(self, http_client, executor, validators):
+        try:
+            with FEED_STAGE_SECONDS.time(stage="download", feed=self.url):
+                response = await http_client.get(self.url, _conditional_headers(validators))
+        except HttpFetchError as error:
+            raise RssParserError(error.message)
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, self._create_channel_from_response, validators, response)
+
+    def _create_channel_from_response(self, validators, response):
+        with FEED_STAGE_SECONDS.time(stage="fetch", feed=self.url):
+            rss_feed_response = _parse_fetched_response(self.url, response, ASYNC_PARSER_BACKENDS[self.backend])
+        return self._create_channel(validators, rss_feed_response)
+
+    def _get_validators(self):
+        # Without a kept channel to reuse, a conditional fetch could leave nothing to return.
+        return _get_feed_validators(self.url) if self.load_unmodified else None
+
+    def _create_channel(self, validators, rss_feed_response):
+        with FEED_STAGE_SECONDS.time(stage="validate", feed=self.url):
+            self._validate_response(rss_feed_response)
+
+        if validators and rss_feed_response.get("status") == HTTP_NOT_MODIFIED:
+            print("RSS feed not modified for URL:", self.url)
+            rss_channel = self.load_unmodified(self.url)
+            if rss_channel is not None and rss_channel.ttl is None:
+                rss_channel.ttl = validators.ttl
+            return rss_channel
+
+        with FEED_STAGE_SECONDS.time(stage="parse", feed=self.url):
+            rss_channel = _create_rss_channel(rss_feed_response)
+        _store_feed_validators(self.url, rss_feed_response, rss_channel)
+        return rss_channel
 
     def _validate_response(self, rss_feed_response):
         if not rss_feed_response:
@@ -0,0 +1,25 @@
+#!/usr/bin/python3
+"""
+Incremental XML parsing shared by the feed and OPML parsers, using lxml when installed and ElementTree otherwise.
+"""
+from xml.etree.ElementTree import ParseError
+
+try:
+    from lxml import etree
+    XML_PARSE_ERRORS = (ParseError, etree.XMLSyntaxError)
+except ImportError:
+    from xml.etree import ElementTree as etree
+    XML_PARSE_ERRORS = (ParseError,)
+
+
+def iterparse(source):
+    """
+    Parses an untrusted XML document incrementally.
+    :param source: file object reading the document bytes.
+    :return: iterator of (event, element) for each element's start and end, raising one of XML_PARSE_ERRORS
+    if the document is malformed.
+    """
+    if etree.__name__ == "lxml.etree":
+        # Never fetch or expand external entities from uploaded documents or untrusted feeds.
+        return etree.iterparse(source, events=("start", "end"), resolve_entities=False, no_network=True)
+    return etree.iterparse(source, events=("start", "end"))
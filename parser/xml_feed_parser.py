@@ -0,0 +1,163 @@
+#!/usr/bin/python3
+"""
+Fast incremental parser for well-formed RSS 2.0 and Atom documents.
+Produces the same feed and entries shape as feedparser, raising XmlFeedError for anything
+it does not handle so the caller can fall back to feedparser.
+"""
+import calendar
+import io
+import re
+import time
+from email.utils import parsedate_tz, mktime_tz
+from parser.xml_events import iterparse, XML_PARSE_ERRORS
+
+try:
+    # Not part of feedparser's public API, so feedparser is pinned to the versions known to provide it.
+    from feedparser.sanitizer import _sanitize_html
+except ImportError:
+    _sanitize_html = None
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+DC = "{http://purl.org/dc/elements/1.1/}"
+CONTENT = "{http://purl.org/rss/1.0/modules/content/}"
+SY = "{http://purl.org/rss/1.0/modules/syndication/}"
+SYNDICATION_KEYS = {SY + "updatePeriod": "sy_updateperiod", SY + "updateFrequency": "sy_updatefrequency"}
+RSS_VERSIONS = ["2.0", "0.92", "0.91"]
+ISO_8601 = re.compile(r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2})(?::(\d{2}))?(?:\.\d+)?(Z|[+-]\d{2}:?\d{2})?$")
+
+
+def parse_feed_document(document):
+    """
+    Parses an RSS 2.0 or Atom document, clearing each entry once parsed to keep memory flat.
+    :param document: the feed document bytes.
+    :return: dict with the feed details and its entries, as returned by feedparser.
+    :raises XmlFeedError: if the document is not well-formed RSS 2.0 or Atom.
+    """
+    try:
+        events = iterparse(io.BytesIO(document))
+        _, root = next(events)
+        if root.tag == "rss" and root.get("version") in RSS_VERSIONS:
+            return _parse_elements(events, root, "channel", "item", _parse_rss_element)
+        if root.tag == ATOM + "feed":
+            return _parse_elements(events, root, root.tag, ATOM + "entry", _parse_atom_element)
+    except StopIteration:
+        raise XmlFeedError("Empty feed document")
+    except XML_PARSE_ERRORS as error:
+        raise XmlFeedError("Malformed feed document: {}".format(error))
+    raise XmlFeedError("Unsupported feed document: {}".format(root.tag))
+
+
+def _parse_elements(events, root, feed_tag, entry_tag, parse_element):
+    feed = {}
+    entries = []
+    parents = [root]
+    for event, element in events:
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        parent = parents[-1] if parents else None
+        if element.tag == entry_tag:
+            entry = {}
+            for child in element:
+                parse_element(child, entry)
+            entries.append(entry)
+            # Drop each parsed entry from the tree, so large documents are never held in full.
+            element.clear()
+            parent.remove(element)
+        elif parent is not None and parent.tag == feed_tag:
+            parse_element(element, feed)
+            if element.tag in SYNDICATION_KEYS:
+                feed[SYNDICATION_KEYS[element.tag]] = _text(element)
+    if "title" not in feed:
+        raise XmlFeedError("Feed document has no title")
+    # feedparser aliases the RSS channel description and the Atom feed subtitle.
+    description = feed.pop("summary", None) or feed.get("subtitle")
+    if description is not None:
+        feed["description"] = feed["subtitle"] = description
+    return {"feed": feed, "entries": entries}
+
+
+def _parse_rss_element(element, values):
+    tag = element.tag
+    if tag in ("title", "link"):
+        values[tag] = _text(element)
+    elif tag == "description" or (tag == CONTENT + "encoded" and "summary" not in values):
+        values["summary"] = _sanitize((element.text or "").strip())
+    elif tag in ("author", DC + "creator"):
+        values.setdefault("author", _text(element))
+    elif tag == "guid":
+        values["id"] = _text(element)
+    elif tag == "ttl":
+        values["ttl"] = _text(element)
+    elif tag == "pubDate":
+        _set_date(values, "published", _text(element))
+    elif tag == DC + "date":
+        _set_date(values, "updated", _text(element))
+
+
+def _parse_atom_element(element, values):
+    tag = element.tag[len(ATOM):] if element.tag.startswith(ATOM) else None
+    if tag in ("title", "subtitle", "summary", "content") and element.get("type") == "xhtml":
+        raise XmlFeedError("Unsupported Atom XHTML {}".format(tag))
+    if tag == "title":
+        values["title"] = _text(element)
+    elif tag == "link":
+        if element.get("rel", "alternate") == "alternate" and "link" not in values:
+            values["link"] = element.get("href", "")
+    elif tag == "subtitle":
+        values["subtitle"] = _text(element)
+    elif tag == "summary" or (tag == "content" and "summary" not in values):
+        values["summary"] = _sanitize(element.text or "")
+    elif tag == "author":
+        name = element.find(ATOM + "name")
+        if name is not None:
+            values.setdefault("author", _text(name))
+    elif tag == "id":
+        values["id"] = _text(element)
+    elif tag in ("published", "updated"):
+        _set_date(values, tag, _text(element))
+
+
+def _text(element):
+    text = (element.text or "").strip()
+    # Only markup needs sanitizing, matching feedparser which leaves plain text as is.
+    return _sanitize(text) if "<" in text else text
+
+
+def _sanitize(html):
+    if _sanitize_html is None:
+        # Leaves markup to feedparser, which always sanitizes it, rather than ever passing it through unsanitized.
+        raise XmlFeedError("No HTML sanitizer available")
+    return _sanitize_html(html, "utf-8", "text/html")
+
+
+def _set_date(values, key, text):
+    values[key] = text
+    timestamp = _parse_timestamp(text)
+    if timestamp is not None:
+        values[key + "_parsed"] = time.gmtime(timestamp)
+
+
+def _parse_timestamp(text):
+    match = ISO_8601.match(text)
+    if not match:
+        parsed = parsedate_tz(text)
+        return mktime_tz(parsed) if parsed else None
+
+    year, month, day, hour, minute, second, zone = match.groups()
+    timestamp = calendar.timegm((int(year), int(month), int(day), int(hour), int(minute), int(second or 0)))
+    if zone and zone != "Z":
+        offset = int(zone[1:3]) * 3600 + int(zone[-2:]) * 60
+        timestamp -= offset if zone[0] == "+" else -offset
+    return timestamp
+
+
+class XmlFeedError(Exception):
+    """
+    Exception is thrown when a feed document cannot be parsed by the fast parser.
+    """
+
+    def __init__(self, message):
+        super(XmlFeedError, self).__init__(message)
+        self.message = message
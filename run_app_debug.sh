@@ -15,4 +15,5 @@ fi
 # start app in debug mode
 export FLASK_APP=app/feedme_app.py
 export FLASK_ENV=development
+export FEEDME_FEED_POLLER=1
 flask run
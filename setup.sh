@@ -12,7 +12,6 @@ pip install -r requirements.txt
 echo "===== Creating database ====="
 export FLASK_APP=app/feedme_app.py
 echo "Flask app set to: $FLASK_APP"
-flask db init
 flask db upgrade
 
 echo "===== Creating database schema ====="
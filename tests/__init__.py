@@ -0,0 +1,13 @@
+#!/usr/bin/python3
+"""
+Points the app at a throwaway database before any test imports it, so tests never touch urldatabase.db.
+"""
+import atexit
+import os
+import shutil
+import tempfile
+
+if "FEEDME_DATABASE_URL" not in os.environ:
+    _database_dir = tempfile.mkdtemp(prefix="feedme-tests-")
+    atexit.register(shutil.rmtree, _database_dir, ignore_errors=True)
+    os.environ["FEEDME_DATABASE_URL"] = "sqlite:///{}".format(os.path.join(_database_dir, "urldatabase.db"))
@@ -0,0 +1,142 @@
+#!/usr/bin/python3
+"""
+Local HTTP server serving RSS feeds to the HTTP client tests, routing each path to the handler method of its name.
+"""
+import gzip
+import threading
+import time
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DOCUMENT = b"<rss version=\"2.0\"><channel><title>Local Feed</title></channel></rss>"
+RSS_HEADERS = {"Content-Type": "application/rss+xml"}
+HOLD_TIMEOUT = 5
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super(FeedHandler, self).setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append(self.headers)
+        route = getattr(self, "_" + self.path.strip("/").replace("-", "_"), None)
+        if route:
+            route()
+        else:
+            self._send(404, b"")
+
+    def _feed(self):
+        self._send(200, DOCUMENT)
+
+    def _closed_when_idle(self):
+        # Keeps the connection alive as far as the client knows, then closes it as an idle server would.
+        self._send(200, DOCUMENT)
+        self.close_connection = True
+
+    def _gzip(self):
+        self._send(200, gzip.compress(DOCUMENT), {"Content-Encoding": "gzip"})
+
+    def _deflate(self):
+        self._send(200, zlib.compress(DOCUMENT), {"Content-Encoding": "deflate"})
+
+    def _raw_deflate(self):
+        compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        self._send(200, compressor.compress(DOCUMENT) + compressor.flush(), {"Content-Encoding": "deflate"})
+
+    def _large(self):
+        self._send(200, b"x" * 4096)
+
+    def _gzip_bomb(self):
+        self._send(200, gzip.compress(b"\0" * 1024 * 1024), {"Content-Encoding": "gzip"})
+
+    def _chunked(self):
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for _ in range(64):
+            self.wfile.write(b"40\r\n" + b"x" * 64 + b"\r\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _slow(self):
+        time.sleep(1)
+        try:
+            self._send(200, DOCUMENT)
+        except BrokenPipeError:
+            pass
+
+    def _redirect(self):
+        self._send(301, b"", {"Location": "/feed"})
+
+    def _conditional(self):
+        if self.headers.get("If-None-Match") == "\"abc123\"":
+            self._send(304, b"", {"ETag": "\"abc123\""})
+        else:
+            self._send(200, DOCUMENT, {"ETag": "\"abc123\""})
+
+    def _error(self):
+        self._send(500, b"Internal Server Error")
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingFeedHandler(FeedHandler):
+    """
+    Tracks how many requests are served at once, and holds requests for /held-feed until the server is released.
+    """
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.active += 1
+            self.server.most_active = max(self.server.most_active, self.server.active)
+        try:
+            super(CountingFeedHandler, self).do_GET()
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def _held_feed(self):
+        self.server.release.wait(HOLD_TIMEOUT)
+        self._send(200, self.server.document, RSS_HEADERS)
+
+
+def start_feed_server(handler_class=FeedHandler, document=DOCUMENT):
+    """
+    Starts serving feeds on a free local port, from a background thread.
+    :param handler_class: the request handler serving the feeds.
+    :param document: the feed served for /held-feed.
+    :return: the server.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_class)
+    server.daemon_threads = True
+    server.connections = 0
+    server.requests = []
+    server.lock = threading.Lock()
+    server.active = 0
+    server.most_active = 0
+    server.release = threading.Event()
+    server.document = document
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+def stop_feed_server(server):
+    """
+    Releases any held requests, then stops the server.
+    :param server: the server started by start_feed_server.
+    """
+    server.release.set()
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,177 @@
+#!/usr/bin/python3
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from app.feedme_app import app, cache, prefetch_feed_content, _feed_content_key
+from feed.feed_content import FeedContent
+from parser.rss_parser import DEFAULT_PARSER_BACKEND
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+from tests.feed_server import CountingFeedHandler, RSS_HEADERS, start_feed_server, stop_feed_server
+from tests.test_asgi import asgi_request
+from utils.asgi import AsgiAdapter
+from utils.files import get_full_path
+
+CACHED_FEED_URL = "https://www.cached.com/rss/xml"
+HTTP_FOUND = 302
+POLL_INTERVAL = 0.01
+
+with open(get_full_path("tests", "test_data", "rss_sample.xml"), "rb") as document_file:
+    RSS_DOCUMENT = document_file.read()
+
+
+class _RssFeedHandler(CountingFeedHandler):
+
+    def _feed(self):
+        self._send(200, RSS_DOCUMENT, RSS_HEADERS)
+
+
+class TestAppAsgi(TestAppBase):
+
+    def setUp(self):
+        super(TestAppAsgi, self).setUp()
+        self.server = start_feed_server(_RssFeedHandler, RSS_DOCUMENT)
+        self.base_url = "http://127.0.0.1:{}".format(self.server.server_port)
+        self.backend = app.config["FEED_PARSER_BACKEND"]
+        app.config["FEED_PARSER_BACKEND"] = "xml"
+        # A single worker thread, so any request holding it while a feed is fetched would hold up every other.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.obj_under_test = AsgiAdapter(app, self.executor,
+                                          before_dispatch=partial(prefetch_feed_content, executor=self.executor))
+
+    def tearDown(self):
+        app.config["FEED_PARSER_BACKEND"] = self.backend
+        app.config["LOGIN_DISABLED"] = True
+        self.executor.shutdown()
+        stop_feed_server(self.server)
+        urls = [self.base_url + path for path in ("/feed", "/held-feed", "/missing")] + [CACHED_FEED_URL]
+        for url in urls:
+            cache.delete(_feed_content_key(url))
+        super(TestAppAsgi, self).tearDown()
+
+    def _get_content(self, url, window=""):
+        return asgi_request(self.obj_under_test, "/content", "url={}{}".format(url, window).encode())
+
+    async def _until_held(self):
+        while not self.server.active:
+            await asyncio.sleep(POLL_INTERVAL)
+
+    @parameterized.expand([
+        ["xml backend", "xml"],
+        ["default backend", DEFAULT_PARSER_BACKEND]
+    ])
+    def test_content_fetched_on_event_loop(self, _, backend):
+        # Given: an RSS feed URL which has never been fetched, and a parser backend fetching over HTTP
+        app.config["FEED_PARSER_BACKEND"] = backend
+        url = self.base_url + "/feed"
+
+        # When: its content is fetched over ASGI
+        with patch("app.feedme_app.feed_http_client") as mock_http_client:
+            status, _, messages = asyncio.run(self._get_content(url))
+
+        # Then: the feed is fetched by the asynchronous client, and served as the WSGI app serves it
+        body = b"".join(message["body"] for message in messages)
+        self.assertEqual(HTTP_SUCCESS, status)
+        self.assertIn(b"FierceWireless", body)
+        self.assertEqual(1, len(self.server.requests))
+        mock_http_client.get.assert_not_called()
+        self.assertEqual(body, app.test_client().get("/content?url=" + url).data)
+
+    def test_window_fetched_on_event_loop(self):
+        # Given: an RSS feed URL which has never been fetched
+        url = self.base_url + "/feed"
+
+        # When: the first page of its content is fetched over ASGI, as the UI asks for it
+        with patch("app.feedme_app.feed_http_client") as mock_http_client:
+            status, _, messages = asyncio.run(self._get_content(url, "&limit=20"))
+
+        # Then: the feed is fetched by the asynchronous client, and the page cut from the stored feed
+        self.assertEqual(HTTP_SUCCESS, status)
+        self.assertIn(b"FierceWireless", b"".join(message["body"] for message in messages))
+        self.assertEqual(1, len(self.server.requests))
+        mock_http_client.get.assert_not_called()
+
+    def test_slow_feed_does_not_hold_worker(self):
+        # Given: cached RSS feed content, and an RSS feed URL whose server holds requests until released
+        cache.set(_feed_content_key(CACHED_FEED_URL), FeedContent("<h2>Cached Feed</h2>"))
+        completed = []
+
+        async def get_content(url):
+            status, _, messages = await self._get_content(url)
+            completed.append((url, status, b"".join(message["body"] for message in messages)))
+
+        async def requests():
+            slow = asyncio.ensure_future(get_content(self.base_url + "/held-feed"))
+            await self._until_held()
+            await get_content(CACHED_FEED_URL)
+            self.server.release.set()
+            await slow
+
+        # When: both are fetched at once, over ASGI
+        asyncio.run(asyncio.wait_for(requests(), 5))
+
+        # Then: the cached content is served while the slow feed is still being fetched
+        self.assertEqual([CACHED_FEED_URL, self.base_url + "/held-feed"], [url for url, _, _ in completed])
+        self.assertIn(b"Cached Feed", completed[0][2])
+        self.assertIn(b"FierceWireless", completed[1][2])
+
+    def test_concurrent_requests_share_fetch(self):
+        # Given: an RSS feed URL which has never been fetched, and whose server holds requests until released
+        url = self.base_url + "/held-feed"
+
+        async def requests():
+            responses = asyncio.gather(self._get_content(url), self._get_content(url))
+            await self._until_held()
+            self.server.release.set()
+            return await responses
+
+        # When: its content is fetched by two requests at once
+        responses = asyncio.run(asyncio.wait_for(requests(), 5))
+
+        # Then: the feed is fetched once for both
+        self.assertEqual([HTTP_SUCCESS, HTTP_SUCCESS], [status for status, _, _ in responses])
+        self.assertEqual(1, len(self.server.requests))
+
+    def test_content_for_unavailable_feed(self):
+        # Given: an RSS feed URL which cannot be fetched
+        url = self.base_url + "/missing"
+
+        # When: its content is fetched over ASGI
+        status, _, messages = asyncio.run(self._get_content(url))
+
+        # Then: no RSS feed content is returned, as the WSGI app returns
+        self.assertEqual(HTTP_SUCCESS, status)
+        self.assertIn(b"No RSS feed content to display", b"".join(message["body"] for message in messages))
+        self.assertEqual(1, len(self.server.requests))
+
+    @patch("feedparser.parse")
+    def test_content_with_feedparser_backend(self, mock_response):
+        # Given: the feedparser backend, which fetches feeds itself
+        app.config["FEED_PARSER_BACKEND"] = "feedparser"
+        mock_response.return_value = {
+            "feed": {"title": "Cached Feed", "link": "some link", "description": "blah"}, "entries": []
+        }
+
+        # When: RSS feed content is fetched over ASGI
+        status, _, messages = asyncio.run(self._get_content(CACHED_FEED_URL))
+
+        # Then: the feed is fetched by the WSGI app, as it would be without ASGI
+        self.assertEqual(HTTP_SUCCESS, status)
+        self.assertIn(b"Cached Feed", b"".join(message["body"] for message in messages))
+        mock_response.assert_called_once_with(CACHED_FEED_URL)
+
+    def test_unauthenticated_request_not_fetched(self):
+        # Given: a request from a user who has not logged in
+        app.config["LOGIN_DISABLED"] = False
+
+        # When: the content of an RSS feed URL which has never been fetched is requested over ASGI
+        status, headers, _ = asyncio.run(self._get_content(self.base_url + "/held-feed"))
+
+        # Then: the user is sent to log in, without the feed being fetched
+        self.assertEqual(HTTP_FOUND, status)
+        self.assertIn("/login", headers["location"])
+        self.assertEqual(0, len(self.server.requests))
@@ -2,7 +2,8 @@
 
 import unittest
 
-from app.feedme_app import app
+from app.feedme_app import app, db, password_attempts
+from user.user import User
 
 HTTP_SUCCESS = 200
 
@@ -13,3 +14,17 @@ class TestAppBase(unittest.TestCase):
         app.config["TESTING"] = True
         app.config["LOGIN_DISABLED"] = True
         app.config["WTF_CSRF_ENABLED"] = False
+        password_attempts.clear()
+        # The tests mock feedparser.parse, so use the backend which fetches feeds with it.
+        app.config["FEED_PARSER_BACKEND"] = "feedparser"
+        # Each test starts from empty tables in the throwaway database set up by the tests package.
+        with app.app_context():
+            db.create_all()
+            # Users are modelled apart from the app's own tables.
+            User.metadata.create_all(db.engine)
+
+    def tearDown(self):
+        with app.app_context():
+            db.session.remove()
+            db.drop_all()
+            User.metadata.drop_all(db.engine)
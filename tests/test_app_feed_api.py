@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+
+from unittest.mock import patch
+
+from sqlalchemy.exc import IntegrityError
+
+from app.feedme_app import app, db, RssFeedUrl
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+API_URLS = ["https://www.api.com/{}/rss".format(index) for index in range(5)]
+HTTP_BAD_REQUEST = 400
+HTTP_CONFLICT = 409
+
+
+class TestAppFeedApi(TestAppBase):
+
+    def setUp(self):
+        super(TestAppFeedApi, self).setUp()
+        with app.app_context():
+            db.session.add_all([RssFeedUrl(url=API_URLS[0]), RssFeedUrl(url=API_URLS[1])])
+            db.session.commit()
+
+    def _stored_urls(self):
+        with app.app_context():
+            return sorted(url for (url,) in db.session.query(RssFeedUrl.url).filter(RssFeedUrl.url.in_(API_URLS)))
+
+    def test_batch_applies_operations_in_one_transaction(self):
+        # Given: a batch of deletes, renames and adds
+        operations = {
+            "delete": [API_URLS[0]],
+            "rename": [{"old_url": API_URLS[1], "new_url": API_URLS[2]}],
+            "add": [API_URLS[3], API_URLS[4]]
+        }
+
+        # When: the batch is applied
+        with patch.object(db.session, "commit", wraps=db.session.commit) as mock_commit:
+            response = app.test_client().post("/api/feeds", json=operations)
+
+        # Then: every operation is applied with a single commit
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertEqual(["deleted"], [result["status"] for result in response.json["delete"]])
+        self.assertEqual(["renamed"], [result["status"] for result in response.json["rename"]])
+        self.assertEqual(["added", "added"], [result["status"] for result in response.json["add"]])
+        self.assertEqual(API_URLS[2:], self._stored_urls())
+        self.assertEqual(1, mock_commit.call_count)
+
+    def test_batch_reports_each_failed_operation(self):
+        # Given: operations which cannot be applied
+        operations = {
+            "delete": [API_URLS[4], ""],
+            "rename": [{"old_url": API_URLS[3], "new_url": API_URLS[4]},
+                       {"old_url": API_URLS[0], "new_url": API_URLS[1]},
+                       "not a rename"],
+            "add": [API_URLS[0], None, API_URLS[2], API_URLS[2]]
+        }
+
+        # When: the batch is applied
+        response = app.test_client().post("/api/feeds", json=operations)
+
+        # Then: each operation reports its outcome, and only the valid one is applied
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertEqual(["not_found", "invalid"], [result["status"] for result in response.json["delete"]])
+        self.assertEqual(["not_found", "conflict", "invalid"],
+                         [result["status"] for result in response.json["rename"]])
+        self.assertEqual(["exists", "invalid", "added", "exists"],
+                         [result["status"] for result in response.json["add"]])
+        self.assertEqual(API_URLS[:3], self._stored_urls())
+
+    def test_batch_sees_earlier_operations(self):
+        # Given: a URL deleted and then added again, and a chain of renames
+        operations = {
+            "delete": [API_URLS[0]],
+            "rename": [{"old_url": API_URLS[1], "new_url": API_URLS[2]},
+                       {"old_url": API_URLS[2], "new_url": API_URLS[3]}],
+            "add": [API_URLS[0]]
+        }
+
+        # When: the batch is applied
+        response = app.test_client().post("/api/feeds", json=operations)
+
+        # Then: each operation applies to the URLs as left by the ones before it
+        self.assertEqual(["renamed", "renamed"], [result["status"] for result in response.json["rename"]])
+        self.assertEqual(["added"], [result["status"] for result in response.json["add"]])
+        self.assertEqual([API_URLS[0], API_URLS[3]], self._stored_urls())
+
+    def test_batch_rejects_malformed_request(self):
+        # When: a request which is not a JSON object of lists is made
+        responses = [app.test_client().post("/api/feeds", data="not json"),
+                     app.test_client().post("/api/feeds", json={"add": API_URLS[3]})]
+
+        # Then: the request is rejected and nothing is applied
+        self.assertEqual([HTTP_BAD_REQUEST] * 2, [response.status_code for response in responses])
+        self.assertEqual(API_URLS[:2], self._stored_urls())
+
+    def test_batch_rejects_too_many_operations(self):
+        # When: more operations than allowed are requested
+        with patch.dict(app.config, {"FEED_API_MAX_OPERATIONS": 1}):
+            response = app.test_client().post("/api/feeds", json={"add": API_URLS[3:]})
+
+        # Then: the request is rejected
+        self.assertEqual(HTTP_BAD_REQUEST, response.status_code)
+        self.assertIn("at most 1 operations", response.json["error"])
+
+    def test_batch_rolled_back_on_concurrent_change(self):
+        # Given: another request adds the same URL before the batch commits
+        with patch.object(db.session, "commit", side_effect=IntegrityError("INSERT", {}, Exception("UNIQUE"))):
+
+            # When: the batch is applied
+            response = app.test_client().post("/api/feeds", json={"delete": [API_URLS[0]], "add": [API_URLS[3]]})
+
+        # Then: nothing is applied
+        self.assertEqual(HTTP_CONFLICT, response.status_code)
+        self.assertEqual(API_URLS[:2], self._stored_urls())
@@ -2,7 +2,7 @@
 
 from unittest.mock import patch
 
-from app.feedme_app import app, RssFeedUrl
+from app.feedme_app import app, cache, RssFeedUrl, _refresh_feed_content
 from tests.test_app_base import TestAppBase, HTTP_SUCCESS
 
 
@@ -53,3 +53,42 @@ class TestAppFeedContent(TestAppBase):
         # Then: no RSS feed content is returned
         self.assertEqual(HTTP_SUCCESS, response.status_code)
         self.assertIn(b"No RSS feed content to display", response.data)
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_refreshed_by_poller(self, mock_response):
+        # Given: RSS feed content already refreshed by the feed poller
+        rss_feed_url = "https://www.polled.com/rss/xml"
+        mock_response.return_value = {
+            "feed": {"title": "Polled Feed", "link": "some link", "description": "blah"},
+            "entries": [{"title": "Some Entry Title", "link": "some link", "author": "Joe Bloggs", "summary": "blah",
+                         "published": "123"}]
+        }
+        _refresh_feed_content(rss_feed_url)
+        mock_response.reset_mock()
+
+        # When: the RSS feed content is fetched for URL
+        response = app.test_client().get("/content?url=" + rss_feed_url)
+
+        # Then: the prepared feed content is returned without a live fetch
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Polled Feed", response.data)
+        mock_response.assert_not_called()
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_for_url_named_like_cached_page(self, mock_response):
+        # Given: the home page cached, and a feed URL named the same as the home page's cache key
+        with patch("app.feedme_app.RssFeedUrl") as mock_rss_feed_url:
+            mock_rss_feed_url.query.all.return_value = []
+            app.test_client().get("/")
+        self.addCleanup(cache.clear)
+        mock_response.return_value = {
+            "feed": {"title": "Named Feed", "link": "some link", "description": "blah"},
+            "entries": []
+        }
+
+        # When: the RSS feed content is fetched for URL
+        response = app.test_client().get("/content?url=feed_urls")
+
+        # Then: the feed content is returned, rather than the cached home page
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Named Feed", response.data)
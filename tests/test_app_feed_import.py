@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+
+import io
+from unittest.mock import patch
+
+from sqlalchemy.exc import IntegrityError
+
+from app.feedme_app import app, db, RssFeedChannel, RssFeedUrl
+from parser.opml import iter_opml
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+HTTP_CONFLICT = 409
+IMPORTED_URLS = ["https://www.imported.com/{}/rss".format(index) for index in range(3)]
+VALID_RESPONSE = {
+    "feed": {"title": "Imported Feed", "link": "some link", "description": "blah"},
+    "entries": []
+}
+
+
+def _opml_upload(urls):
+    document = "".join(iter_opml("Subscriptions", [(url, None) for url in urls])).encode("utf-8")
+    return {"opml": (io.BytesIO(document), "subscriptions.opml")}
+
+
+class TestAppFeedImport(TestAppBase):
+
+    def _imported_urls(self):
+        with app.app_context():
+            return sorted(url for (url,) in db.session.query(RssFeedUrl.url).filter(RssFeedUrl.url.in_(IMPORTED_URLS)))
+
+    def test_import_adds_new_urls_in_one_transaction(self):
+        # Given: an RSS feed URL which has already been added
+        with app.app_context():
+            db.session.add(RssFeedUrl(url=IMPORTED_URLS[0]))
+            db.session.commit()
+
+        # When: an OPML document listing it and two new URLs is imported
+        with patch.object(db.session, "commit", wraps=db.session.commit) as mock_commit:
+            response = app.test_client().post("/import", data=_opml_upload(IMPORTED_URLS),
+                                              content_type="multipart/form-data", follow_redirects=True)
+
+        # Then: only the new URLs are added, with a single commit
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Imported 2 RSS feed URLs, 1 already added, 0 invalid", response.data)
+        self.assertEqual(IMPORTED_URLS, self._imported_urls())
+        self.assertEqual(1, mock_commit.call_count)
+
+    @patch("feedparser.parse")
+    def test_import_with_validation_skips_invalid_feeds(self, mock_response):
+        # Given: an RSS feed URL which cannot be parsed
+        mock_response.side_effect = lambda url, **kwargs: {"bozo_exception": "Not a feed"} \
+            if url == IMPORTED_URLS[1] else VALID_RESPONSE
+
+        # When: an OPML document listing it is imported with validation
+        data = _opml_upload(IMPORTED_URLS)
+        data["validate"] = "on"
+        response = app.test_client().post("/import", data=data, content_type="multipart/form-data",
+                                          follow_redirects=True)
+
+        # Then: only the valid feeds are added
+        self.assertIn(b"Imported 2 RSS feed URLs, 0 already added, 1 invalid", response.data)
+        self.assertEqual([IMPORTED_URLS[0], IMPORTED_URLS[2]], self._imported_urls())
+        self.assertEqual(3, mock_response.call_count)
+
+    def test_import_rolled_back_on_concurrent_change(self):
+        # Given: another request adds the same URLs before the import commits
+        with patch.object(db.session, "commit", side_effect=IntegrityError("INSERT", {}, Exception("UNIQUE"))):
+
+            # When: an OPML document listing them is imported
+            response = app.test_client().post("/import", data=_opml_upload(IMPORTED_URLS),
+                                              content_type="multipart/form-data")
+
+        # Then: nothing is imported, and the user is asked to retry
+        self.assertEqual(HTTP_CONFLICT, response.status_code)
+        self.assertIn(b"The RSS feed URLs were changed by another request, please retry", response.data)
+        self.assertEqual([], self._imported_urls())
+
+    def test_import_rejects_invalid_document(self):
+        # When: a document which is not OPML is imported
+        response = app.test_client().post("/import", data={"opml": (io.BytesIO(b"<html>"), "feeds.opml")},
+                                          content_type="multipart/form-data", follow_redirects=True)
+
+        # Then: nothing is added
+        self.assertIn(b"Please provide an OPML file listing RSS feed URLs", response.data)
+        self.assertEqual([], self._imported_urls())
+
+    def test_import_rejects_too_many_urls(self):
+        # When: a document listing more URLs than allowed is imported
+        with patch.dict(app.config, {"FEED_IMPORT_MAX_URLS": 2}):
+            response = app.test_client().post("/import", data=_opml_upload(IMPORTED_URLS),
+                                              content_type="multipart/form-data", follow_redirects=True)
+
+        # Then: nothing is added
+        self.assertIn(b"Please provide at most 2 RSS feed URLs", response.data)
+        self.assertEqual([], self._imported_urls())
+
+    def test_export_streams_opml(self):
+        # Given: added RSS feed URLs, one of which has been fetched
+        with app.app_context():
+            db.session.add_all([RssFeedUrl(url=url) for url in IMPORTED_URLS])
+            db.session.add(RssFeedChannel(url=IMPORTED_URLS[0], title="Imported Feed"))
+            db.session.commit()
+
+        # When: the RSS feed URLs are exported
+        response = app.test_client().get("/export")
+
+        # Then: an OPML document lists every URL, titled where known
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual("text/x-opml", response.mimetype)
+        self.assertIn("attachment", response.headers["Content-Disposition"])
+        self.assertIn(b"text=\"Imported Feed\" xmlUrl=\"https://www.imported.com/0/rss\"", response.data)
+        self.assertIn(b"xmlUrl=\"https://www.imported.com/2/rss\"", response.data)
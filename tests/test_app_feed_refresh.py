@@ -0,0 +1,115 @@
+#!/usr/bin/python3
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from app.feedme_app import app, cache, feed_refreshes, _create_feed_poller, _feed_content_key
+from feed.feed_content import FeedContent
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+RSS_FEED_URL = "https://www.refreshed.com/rss/xml"
+RSS_FEED_RESPONSE = {
+    "feed": {"title": "Refreshed Feed", "link": "some link", "description": "blah"},
+    "entries": [{"id": "1", "title": "Fresh Entry Title", "link": "first link"}]
+}
+
+
+class TestAppFeedRefresh(TestAppBase):
+
+    def setUp(self):
+        super(TestAppFeedRefresh, self).setUp()
+        app.config["FEED_STALE_WHILE_REVALIDATE"] = True
+
+    def tearDown(self):
+        app.config["FEED_STALE_WHILE_REVALIDATE"] = True
+        cache.delete(_feed_content_key(RSS_FEED_URL))
+        super(TestAppFeedRefresh, self).tearDown()
+
+    @patch("feedparser.parse")
+    def test_concurrent_misses_fetch_feed_once(self, mock_response):
+        # Given: an RSS feed which is slow to fetch
+        def slow_parse(*args, **kwargs):
+            time.sleep(0.2)
+            return RSS_FEED_RESPONSE
+
+        mock_response.side_effect = slow_parse
+
+        # When: the RSS feed content is requested concurrently
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            responses = list(executor.map(lambda _: app.test_client().get("/content?url=" + RSS_FEED_URL), range(5)))
+
+        # Then: every request gets the feed content from a single fetch
+        for response in responses:
+            self.assertEqual(HTTP_SUCCESS, response.status_code)
+            self.assertIn(b"Fresh Entry Title", response.data)
+        self.assertEqual(1, mock_response.call_count)
+
+    @patch("feedparser.parse")
+    def test_stale_content_served_while_refreshed(self, mock_response):
+        # Given: stale RSS feed content in the cache
+        mock_response.return_value = RSS_FEED_RESPONSE
+        with app.app_context():
+            cache.set(_feed_content_key(RSS_FEED_URL), FeedContent("Stale content", refreshed_at=0))
+
+        # When: the RSS feed content is fetched for URL
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the stale content is returned immediately
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Stale content", response.data)
+
+        # And: the content is refreshed in the background
+        self._wait_for_refresh()
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+        self.assertIn(b"Fresh Entry Title", response.data)
+
+    @patch("feedparser.parse")
+    def test_stale_content_refreshed_before_response(self, mock_response):
+        # Given: stale RSS feed content in the cache and stale-while-revalidate disabled
+        app.config["FEED_STALE_WHILE_REVALIDATE"] = False
+        mock_response.return_value = RSS_FEED_RESPONSE
+        with app.app_context():
+            cache.set(_feed_content_key(RSS_FEED_URL), FeedContent("Stale content", refreshed_at=0))
+
+        # When: the RSS feed content is fetched for URL
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the refreshed content is returned
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Fresh Entry Title", response.data)
+
+    @patch("feedparser.parse")
+    def test_stale_content_served_when_refresh_fails(self, mock_response):
+        # Given: stale RSS feed content in the cache for a feed which is now broken
+        app.config["FEED_STALE_WHILE_REVALIDATE"] = False
+        mock_response.return_value = {"entries": [], "bozo": 1, "bozo_exception": TypeError("broken"), "feed": {}}
+        with app.app_context():
+            cache.set(_feed_content_key(RSS_FEED_URL), FeedContent("Stale content", refreshed_at=0))
+
+        # When: the RSS feed content is fetched for URL
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the stale content is returned
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Stale content", response.data)
+
+    @staticmethod
+    def _wait_for_refresh():
+        deadline = time.time() + 5
+        while feed_refreshes.in_flight(RSS_FEED_URL) and time.time() < deadline:
+            time.sleep(0.01)
+
+    @patch("feedparser.parse")
+    @patch("app.feedme_app.feed_refreshes")
+    def test_poll_shares_refreshes_with_requests(self, mock_feed_refreshes, mock_response):
+        # Given: a feed poller for an RSS feed URL
+
+        # When: the RSS feed is polled
+        refreshed = _create_feed_poller(lambda: [RSS_FEED_URL]).poll()
+
+        # Then: the refresh goes through the refreshes shared with requests, joining any already in flight
+        self.assertEqual(1, refreshed)
+        mock_feed_refreshes.do.assert_called_once()
+        self.assertEqual(RSS_FEED_URL, mock_feed_refreshes.do.call_args[0][0])
+        mock_response.assert_not_called()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+from unittest.mock import patch
+
+from app.feedme_app import app, cache, db, RssFeedUrl, _refresh_feed_content, _feed_content_key
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+FIRST_RSS_FEED_URL = "https://www.first.com/rss/xml"
+SECOND_RSS_FEED_URL = "https://www.second.com/rss/xml"
+UNCONFIGURED_RSS_FEED_URL = "https://www.unconfigured.com/rss/xml"
+RSS_FEED_URLS = [FIRST_RSS_FEED_URL, SECOND_RSS_FEED_URL, UNCONFIGURED_RSS_FEED_URL]
+
+
+def _rss_feed_response(title, entries):
+    return {"feed": {"title": title, "link": "some link", "description": "blah"}, "entries": entries}
+
+
+class TestAppFeedRiver(TestAppBase):
+
+    def setUp(self):
+        super(TestAppFeedRiver, self).setUp()
+        with app.app_context():
+            db.session.add_all([RssFeedUrl(url=FIRST_RSS_FEED_URL), RssFeedUrl(url=SECOND_RSS_FEED_URL)])
+            db.session.commit()
+
+    def tearDown(self):
+        for url in RSS_FEED_URLS:
+            cache.delete(_feed_content_key(url))
+        super(TestAppFeedRiver, self).tearDown()
+
+    @patch("feedparser.parse")
+    def test_river_merges_feeds_by_publish_time(self, mock_response):
+        # Given: two configured RSS feeds with interleaved publish times
+        mock_response.return_value = _rss_feed_response("First Feed", [
+            {"id": "1", "title": "Newest Entry", "link": "some link", "published": "Thu, 13 Jun 2019 18:00:00 +0000"},
+            {"id": "2", "title": "Oldest Entry", "link": "some link", "published": "Thu, 13 Jun 2019 10:00:00 +0000"}
+        ])
+        _refresh_feed_content(FIRST_RSS_FEED_URL)
+        mock_response.return_value = _rss_feed_response("Second Feed", [
+            {"id": "3", "title": "Middle Entry", "link": "some link",
+             "published_parsed": [2019, 6, 13, 14, 0, 0, 3, 164, 0]}
+        ])
+        _refresh_feed_content(SECOND_RSS_FEED_URL)
+
+        # When: the river is fetched
+        response = app.test_client().get("/river")
+
+        # Then: the items from both feeds are returned newest first
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        content = response.data.decode()
+        self.assertLess(content.index("Newest Entry"), content.index("Middle Entry"))
+        self.assertLess(content.index("Middle Entry"), content.index("Oldest Entry"))
+
+    @patch("feedparser.parse")
+    def test_river_limits_items_to_configured_feeds(self, mock_response):
+        # Given: an ingested RSS feed which is not configured
+        mock_response.return_value = _rss_feed_response("Unconfigured Feed", [
+            {"id": "1", "title": "Unconfigured Entry", "link": "some link",
+             "published": "Thu, 13 Jun 2019 18:00:00 +0000"}
+        ])
+        _refresh_feed_content(UNCONFIGURED_RSS_FEED_URL)
+        mock_response.return_value = _rss_feed_response("First Feed", [
+            {"id": "1", "title": "Configured Entry", "link": "some link",
+             "published": "Thu, 13 Jun 2019 10:00:00 +0000"}
+        ])
+        _refresh_feed_content(FIRST_RSS_FEED_URL)
+
+        # When: a single item river is fetched
+        response = app.test_client().get("/river?limit=1")
+
+        # Then: only the configured feed's item is returned
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Configured Entry", response.data)
+        self.assertNotIn(b"Unconfigured Entry", response.data)
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+
+import time
+from unittest.mock import patch
+
+from app.feedme_app import app, cache, db, RssFeedUrl, _refresh_feed_content, _load_due_feed_urls, _feed_content_key
+from feed.feed_content import FeedContent
+from parser.rss_parser import RssParserError
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+RSS_FEED_URL = "https://www.scheduled.com/rss/xml"
+DUE_RSS_FEED_URL = "https://www.due.com/rss/xml"
+RSS_FEED_URLS = [RSS_FEED_URL, DUE_RSS_FEED_URL]
+
+
+def _rss_feed_response(ttl=None, gap=3600):
+    feed = {"title": "Scheduled Feed", "link": "some link", "description": "blah"}
+    if ttl:
+        feed["ttl"] = ttl
+    entries = [{"id": str(index), "title": "Entry {}".format(index), "link": "some link",
+                "published_parsed": time.gmtime(1560443067 - index * gap)} for index in range(5)]
+    return {"feed": feed, "entries": entries}
+
+
+class TestAppFeedSchedule(TestAppBase):
+
+    def setUp(self):
+        super(TestAppFeedSchedule, self).setUp()
+        with app.app_context():
+            db.session.add(RssFeedUrl(url=RSS_FEED_URL))
+            db.session.commit()
+
+    def tearDown(self):
+        for url in RSS_FEED_URLS:
+            cache.delete(_feed_content_key(url))
+        super(TestAppFeedSchedule, self).tearDown()
+
+    @patch("feedparser.parse")
+    def test_refresh_schedules_feed_from_observed_cadence(self, mock_response):
+        # Given: an RSS feed publishing an item every hour
+        mock_response.return_value = _rss_feed_response(gap=3600)
+
+        # When: the RSS feed is refreshed
+        _refresh_feed_content(RSS_FEED_URL)
+
+        # Then: it is scheduled to refresh again in half an hour
+        with app.app_context():
+            rss_feed_url = RssFeedUrl.query.get(RSS_FEED_URL)
+            self.assertEqual(1800, rss_feed_url.refresh_interval)
+            self.assertAlmostEqual(time.time() + 1800, rss_feed_url.next_refresh_at, delta=5)
+            self.assertEqual(1800, cache.get(_feed_content_key(RSS_FEED_URL)).max_age)
+
+    @patch("feedparser.parse")
+    def test_refresh_respects_feed_ttl(self, mock_response):
+        # Given: an RSS feed publishing every hour, which asks to be cached for two hours
+        mock_response.return_value = _rss_feed_response(ttl="120", gap=3600)
+
+        # When: the RSS feed is refreshed
+        _refresh_feed_content(RSS_FEED_URL)
+
+        # Then: it is scheduled to refresh again in two hours
+        with app.app_context():
+            self.assertEqual(7200, RssFeedUrl.query.get(RSS_FEED_URL).refresh_interval)
+
+    @patch("feedparser.parse")
+    def test_failed_refresh_is_deferred(self, mock_response):
+        # Given: an RSS feed which cannot be parsed
+        mock_response.return_value = {"bozo_exception": "error"}
+
+        # When: the RSS feed is refreshed
+        with self.assertRaises(RssParserError):
+            _refresh_feed_content(RSS_FEED_URL)
+
+        # Then: it is not retried until the default interval has passed
+        with app.app_context():
+            self.assertGreater(RssFeedUrl.query.get(RSS_FEED_URL).next_refresh_at,
+                               time.time() + app.config["FEED_REFRESH_DEFAULT_INTERVAL"] - 5)
+            self.assertNotIn(RSS_FEED_URL, _load_due_feed_urls())
+
+    def test_only_due_feeds_are_polled(self):
+        # Given: an RSS feed refreshed recently and one whose refresh is due
+        with app.app_context():
+            RssFeedUrl.query.get(RSS_FEED_URL).next_refresh_at = int(time.time()) + 600
+            db.session.add(RssFeedUrl(url=DUE_RSS_FEED_URL, next_refresh_at=int(time.time()) - 1))
+            db.session.commit()
+
+        # When: the due RSS feed URLs are loaded
+        urls = _load_due_feed_urls()
+
+        # Then: only the due RSS feed is returned
+        self.assertIn(DUE_RSS_FEED_URL, urls)
+        self.assertNotIn(RSS_FEED_URL, urls)
+
+    @patch("feedparser.parse")
+    def test_content_fresh_for_feed_interval(self, mock_response):
+        # Given: cached content older than the default max age, but within the feed's own interval
+        with app.app_context():
+            cache.set(_feed_content_key(RSS_FEED_URL),
+                      FeedContent("Cached content", refreshed_at=time.time() - 600, max_age=1800))
+
+        # When: the RSS feed content is fetched
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the cached content is returned without a refresh
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertEqual(b"Cached content", response.data)
+        mock_response.assert_not_called()
@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from app.feedme_app import app, cache, _refresh_feed_content, _feed_content_key
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+RSS_FEED_URL = "https://www.searched.com/rss/xml"
+HTTP_BAD_REQUEST = 400
+
+
+class TestAppFeedSearch(TestAppBase):
+
+    @patch("feedparser.parse")
+    def setUp(self, mock_response):
+        super(TestAppFeedSearch, self).setUp()
+        mock_response.return_value = {
+            "feed": {"title": "Searched Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "1", "title": "Germany ends spectrum auction", "link": "first link",
+                         "summary": "The auction lasted almost three months", "author": "Kendra Chamberlain"},
+                        {"id": "2", "title": "Surging connections", "link": "second link",
+                         "summary": "Wide-Area connections increased nearly 70%", "author": "Stefan Pongratz"}]
+        }
+        _refresh_feed_content(RSS_FEED_URL)
+
+    def tearDown(self):
+        cache.delete(_feed_content_key(RSS_FEED_URL))
+        super(TestAppFeedSearch, self).tearDown()
+
+    @parameterized.expand([
+        ["Title", "spectrum", b"Germany ends spectrum auction"],
+        ["Summary", "three months", b"Germany ends spectrum auction"],
+        ["Author", "Pongratz", b"Surging connections"]
+    ])
+    def test_search_matches_ingested_items(self, _, query, expected_title):
+        # When: the stored items are searched
+        response = app.test_client().get("/search?q=" + query)
+
+        # Then: the matching item is returned
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(expected_title, response.data)
+
+    def test_search_excludes_items_not_matching_every_term(self):
+        # When: the stored items are searched for terms in different items
+        response = app.test_client().get("/search?q=spectrum Pongratz")
+
+        # Then: no items are returned
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"RSS feed is empty", response.data)
+
+    def test_search_with_query_syntax_characters(self):
+        # When: the stored items are searched with FTS query syntax
+        response = app.test_client().get("/search?q=\"spectrum OR (NEAR*")
+
+        # Then: the query is treated as plain text
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertNotIn(b"Germany ends spectrum auction", response.data)
+
+    def test_search_escapes_query(self):
+        # When: the stored items are searched with markup in the query
+        response = app.test_client().get("/search?q=<script>")
+
+        # Then: the query is not echoed back as markup
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertNotIn(b"<script>", response.data)
+
+    @parameterized.expand([
+        ["Missing query", "/search"],
+        ["Blank query", "/search?q=++"]
+    ])
+    def test_search_without_query(self, _, path):
+        # When: the stored items are searched without a query
+        response = app.test_client().get(path)
+
+        # Then: the request is rejected
+        self.assertEqual(HTTP_BAD_REQUEST, response.status_code)
@@ -0,0 +1,242 @@
+#!/usr/bin/python3
+
+import gzip
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from app.feedme_app import app, cache, db, RssFeedChannel, RssFeedItem, _refresh_feed_content, _feed_content_key, \
+    _add_rss_channel
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+RSS_FEED_URL = "https://www.stored.com/rss/xml"
+HTTP_BAD_REQUEST = 400
+HTTP_NOT_MODIFIED = 304
+THREE_ENTRY_RESPONSE = {
+    "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+    "entries": [{"id": "3", "title": "Third Entry Title", "link": "third link"},
+                {"id": "2", "title": "Second Entry Title", "link": "second link"},
+                {"id": "1", "title": "First Entry Title", "link": "first link"}]
+}
+
+
+class TestAppFeedStore(TestAppBase):
+
+    def tearDown(self):
+        cache.delete(_feed_content_key(RSS_FEED_URL))
+        super(TestAppFeedStore, self).tearDown()
+
+    @patch("feedparser.parse")
+    def test_refresh_stores_only_new_items(self, mock_response):
+        # Given: an RSS feed which has already been ingested
+        mock_response.return_value = {
+            "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "1", "title": "First Entry Title", "link": "first link"}]
+        }
+        _refresh_feed_content(RSS_FEED_URL)
+
+        # When: the RSS feed is refreshed with a new item
+        mock_response.return_value = {
+            "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "2", "title": "Second Entry Title", "link": "second link"},
+                        {"id": "1", "title": "First Entry Title", "link": "first link"}]
+        }
+        feed_content = _refresh_feed_content(RSS_FEED_URL)
+
+        # Then: only the new item is stored
+        with app.app_context():
+            self.assertEqual(["1", "2"], [item.guid for item in RssFeedItem.query.filter_by(
+                channel_url=RSS_FEED_URL).order_by(RssFeedItem.id)])
+
+        # And: the items are rendered newest first
+        self.assertLess(feed_content.index("Second Entry Title"), feed_content.index("First Entry Title"))
+
+    @patch("feedparser.parse")
+    def test_refresh_keeps_items_no_longer_in_feed(self, mock_response):
+        # Given: an RSS feed which has already been ingested
+        mock_response.return_value = {
+            "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "1", "title": "First Entry Title", "link": "first link"}]
+        }
+        _refresh_feed_content(RSS_FEED_URL)
+
+        # When: the RSS feed is refreshed after the item dropped out of the feed
+        mock_response.return_value = {
+            "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "2", "title": "Second Entry Title", "link": "second link"}]
+        }
+        feed_content = _refresh_feed_content(RSS_FEED_URL)
+
+        # Then: the earlier item is still rendered
+        self.assertIn("First Entry Title", feed_content)
+        self.assertIn("Second Entry Title", feed_content)
+
+    @patch("feedparser.parse")
+    def test_refresh_renders_stored_items_when_not_modified(self, mock_response):
+        # Given: an RSS feed which has already been ingested, with validators
+        mock_response.return_value = dict(THREE_ENTRY_RESPONSE, etag="\"abc123\"")
+        _refresh_feed_content(RSS_FEED_URL)
+
+        # When: the RSS feed is refreshed and has not been modified
+        mock_response.return_value = {"feed": {}, "entries": [], "status": HTTP_NOT_MODIFIED, "etag": "\"abc123\""}
+        feed_content = _refresh_feed_content(RSS_FEED_URL)
+
+        # Then: the feed is fetched conditionally, and its stored items rendered
+        mock_response.assert_called_with(RSS_FEED_URL, etag="\"abc123\"", modified=None)
+        self.assertIn("Stored Feed", feed_content)
+        self.assertIn("First Entry Title", feed_content)
+        self.assertIn("Third Entry Title", feed_content)
+
+    @patch("feedparser.parse")
+    def test_refresh_stores_feed_stored_concurrently(self, mock_response):
+        # Given: another process storing the same channel and item while the RSS feed is refreshed
+        mock_response.return_value = {
+            "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "2", "title": "Second Entry Title", "link": "second link"},
+                        {"id": "1", "title": "First Entry Title", "link": "first link"}]
+        }
+        stored = []
+
+        def add_after_concurrent_store(url, rss_channel):
+            stored.append(url)
+            if len(stored) > 1:
+                return _add_rss_channel(url, rss_channel)
+            with db.engine.begin() as connection:
+                connection.execute(RssFeedChannel.__table__.insert(), {"url": url, "title": "Stored Feed"})
+                connection.execute(RssFeedItem.__table__.insert(), {"channel_url": url, "guid": "1",
+                                                                    "title": "First Entry Title", "link": "first link"})
+            # Adds the rows as read before the other process stored them.
+            item = RssFeedItem(channel_url=url, guid="1", title="First Entry Title", link="first link")
+            db.session.add_all([RssFeedChannel(url=url, title="Stored Feed"), item])
+            return [item]
+
+        # When: the RSS feed is refreshed
+        with patch("app.feedme_app._add_rss_channel", side_effect=add_after_concurrent_store):
+            feed_content = _refresh_feed_content(RSS_FEED_URL)
+
+        # Then: the refresh is retried against the stored rows, storing only the new item
+        self.assertEqual(2, len(stored))
+        with app.app_context():
+            self.assertEqual(["1", "2"], [item.guid for item in RssFeedItem.query.filter_by(
+                channel_url=RSS_FEED_URL).order_by(RssFeedItem.id)])
+        self.assertIn("Second Entry Title", feed_content)
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_renders_from_store_after_cache_expiry(self, mock_response):
+        # Given: an ingested RSS feed whose cache entry has expired
+        mock_response.return_value = {
+            "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "1", "title": "First Entry Title", "link": "first link"}]
+        }
+        _refresh_feed_content(RSS_FEED_URL)
+        with app.app_context():
+            cache.delete(_feed_content_key(RSS_FEED_URL))
+        mock_response.reset_mock()
+
+        # When: the RSS feed content is fetched for URL
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the feed content is rendered from the store without refetching
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"First Entry Title", response.data)
+        mock_response.assert_not_called()
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_streams_stored_feed(self, mock_response):
+        # Given: an ingested RSS feed which is not cached
+        mock_response.return_value = {
+            "feed": {"title": "Stored Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "1", "title": "First Entry Title", "link": "first link"}]
+        }
+        _refresh_feed_content(RSS_FEED_URL)
+        with app.app_context():
+            cache.delete(_feed_content_key(RSS_FEED_URL))
+
+        # When: the RSS feed content is fetched for URL
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the feed content is streamed
+        self.assertTrue(response.is_streamed)
+        self.assertIn(b"First Entry Title", response.data)
+
+        # And: the streamed content is cached once complete
+        with app.app_context():
+            self.assertEqual(response.data.decode(), cache.get(_feed_content_key(RSS_FEED_URL)).content)
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_first_page(self, mock_response):
+        # Given: an RSS feed with three items
+        mock_response.return_value = THREE_ENTRY_RESPONSE
+
+        # When: the first page of two items is fetched
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL + "&limit=2")
+
+        # Then: the channel details and the two newest items are returned
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"<h2>Stored Feed</h2>", response.data)
+        self.assertIn(b"Third Entry Title", response.data)
+        self.assertIn(b"Second Entry Title", response.data)
+        self.assertNotIn(b"First Entry Title", response.data)
+
+        # And: a link to the next page is returned
+        self.assertIn(b"data-offset=\"2\"", response.data)
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_last_page(self, mock_response):
+        # Given: an ingested RSS feed with three items
+        mock_response.return_value = THREE_ENTRY_RESPONSE
+        _refresh_feed_content(RSS_FEED_URL)
+        mock_response.reset_mock()
+
+        # When: the last page is fetched
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL + "&offset=2&limit=2")
+
+        # Then: only the remaining item is returned, from the store
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertNotIn(b"<h2>Stored Feed</h2>", response.data)
+        self.assertIn(b"First Entry Title", response.data)
+        self.assertNotIn(b"more_items", response.data)
+        mock_response.assert_not_called()
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_window_for_failing_feed(self, mock_response):
+        # Given: an RSS feed which cannot be fetched
+        mock_response.return_value = {"entries": [], "bozo": 1, "bozo_exception": ValueError("broken"), "feed": {}}
+
+        # When: its first page is fetched twice
+        responses = [app.test_client().get("/content?url=" + RSS_FEED_URL + "&limit=20") for _ in range(2)]
+
+        # Then: both times, no RSS feed content is returned
+        self.assertEqual([HTTP_SUCCESS, HTTP_SUCCESS], [response.status_code for response in responses])
+        for response in responses:
+            self.assertIn(b"No RSS feed content to display", response.data)
+
+    @patch("feedparser.parse")
+    def test_fetch_feed_content_window_has_validators(self, mock_response):
+        # Given: the first page of an ingested RSS feed, previously fetched by a client accepting gzip
+        mock_response.return_value = THREE_ENTRY_RESPONSE
+        _refresh_feed_content(RSS_FEED_URL)
+        headers = {"Accept-Encoding": "gzip"}
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL + "&limit=2", headers=headers)
+
+        # When: the page is fetched again with its ETag
+        headers["If-None-Match"] = response.headers["ETag"]
+        revalidated = app.test_client().get("/content?url=" + RSS_FEED_URL + "&limit=2", headers=headers)
+
+        # Then: the page was served precompressed, and is now reported as not modified
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertIn(b"Second Entry Title", gzip.decompress(response.data))
+        self.assertEqual("no-cache", response.headers["Cache-Control"])
+        self.assertEqual(HTTP_NOT_MODIFIED, revalidated.status_code)
+
+    @parameterized.expand([
+        ["Negative offset", "&offset=-1&limit=20"],
+        ["Zero limit", "&limit=0"],
+        ["Limit too large", "&limit=100000"]
+    ])
+    def test_fetch_feed_content_with_invalid_window(self, _, window):
+        # When: the RSS feed content is fetched with an invalid window
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL + window)
+
+        # Then: the request is rejected
+        self.assertEqual(HTTP_BAD_REQUEST, response.status_code)
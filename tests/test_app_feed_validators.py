@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+
+import gzip
+from unittest.mock import patch
+
+from app.feedme_app import app, cache, _cache_feed_content, _feed_content_key
+from feed.feed_content import FeedContent
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+RSS_FEED_URL = "https://www.validated.com/rss/xml"
+HTTP_NOT_MODIFIED = 304
+
+
+class TestAppFeedValidators(TestAppBase):
+
+    def setUp(self):
+        super(TestAppFeedValidators, self).setUp()
+        cache.set(_feed_content_key(RSS_FEED_URL), FeedContent("<h2>Validated Feed</h2>", refreshed_at=1700000000))
+
+    def tearDown(self):
+        cache.delete(_feed_content_key(RSS_FEED_URL))
+        super(TestAppFeedValidators, self).tearDown()
+
+    def test_content_has_validators(self):
+        # Given: cached RSS feed content
+
+        # When: the content is fetched
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the content is returned with its validators, to be revalidated before reuse
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertEqual("\"{}\"".format(cache.get(_feed_content_key(RSS_FEED_URL)).etag), response.headers["ETag"])
+        self.assertEqual("Tue, 14 Nov 2023 22:13:20 GMT", response.headers["Last-Modified"])
+        self.assertEqual("no-cache", response.headers["Cache-Control"])
+
+    def test_content_not_modified_for_matching_etag(self):
+        # Given: the validators of previously fetched content
+        etag = app.test_client().get("/content?url=" + RSS_FEED_URL).headers["ETag"]
+
+        # When: the content is fetched again with them
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL, headers={"If-None-Match": etag})
+
+        # Then: the content is reported as not modified, without a body
+        self.assertEqual(HTTP_NOT_MODIFIED, response.status_code)
+        self.assertEqual(b"", response.data)
+        self.assertEqual(etag, response.headers["ETag"])
+
+    def test_content_not_modified_since_last_fetched(self):
+        # Given: the time previously fetched content was last modified
+        last_modified = app.test_client().get("/content?url=" + RSS_FEED_URL).headers["Last-Modified"]
+
+        # When: the content is fetched again, if modified since then
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL,
+                                         headers={"If-Modified-Since": last_modified})
+
+        # Then: the content is reported as not modified
+        self.assertEqual(HTTP_NOT_MODIFIED, response.status_code)
+
+    def test_content_returned_once_changed(self):
+        # Given: the validators of previously fetched content
+        etag = app.test_client().get("/content?url=" + RSS_FEED_URL).headers["ETag"]
+
+        # When: the content changes and is fetched again with them
+        with app.app_context():
+            _cache_feed_content(RSS_FEED_URL, "<h2>Changed Feed</h2>", max_age=60)
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL, headers={"If-None-Match": etag})
+
+        # Then: the changed content is returned with a new ETag
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertIn(b"Changed Feed", response.data)
+        self.assertNotEqual(etag, response.headers["ETag"])
+
+    def test_unchanged_rendering_keeps_modified_time(self):
+        # Given: cached RSS feed content
+
+        # When: the same content is rendered and cached again
+        with app.app_context():
+            feed_content = _cache_feed_content(RSS_FEED_URL, "<h2>Validated Feed</h2>", max_age=60)
+
+        # Then: the content keeps its original modified time
+        self.assertEqual(1700000000, feed_content.modified_at)
+        self.assertGreater(feed_content.refreshed_at, 1700000000)
+
+    @patch("app.feedme_app._load_stored_channel")
+    def test_streamed_content_must_be_revalidated(self, mock_load_stored_channel):
+        # Given: stored RSS feed content missing from the cache
+        cache.delete(_feed_content_key(RSS_FEED_URL))
+        mock_load_stored_channel.return_value.iter_feed_content.return_value = iter(["<h2>Stored Feed</h2>"])
+
+        # When: the content is fetched
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL)
+
+        # Then: the content is streamed without validators, to be revalidated before reuse
+        self.assertIn(b"Stored Feed", response.data)
+        self.assertEqual("no-cache", response.headers["Cache-Control"])
+        self.assertNotIn("ETag", response.headers)
+
+    def test_content_served_precompressed(self):
+        # Given: a client accepting gzip
+        headers = {"Accept-Encoding": "gzip, deflate"}
+
+        # When: the content is fetched
+        with patch("app.feedme_app.FeedContent") as mock_feed_content:
+            response = app.test_client().get("/content?url=" + RSS_FEED_URL, headers=headers)
+
+        # Then: the cached gzip encoding is served, without compressing anything
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertEqual("gzip", response.headers["Content-Encoding"])
+        self.assertEqual(b"<h2>Validated Feed</h2>", gzip.decompress(response.data))
+        etag = cache.get(_feed_content_key(RSS_FEED_URL)).etag
+        self.assertEqual("\"{}-gzip\"".format(etag), response.headers["ETag"])
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        mock_feed_content.assert_not_called()
+
+    def test_content_served_in_preferred_encoding(self):
+        # Given: content cached as brotli too, and a client accepting it
+        feed_content = cache.get(_feed_content_key(RSS_FEED_URL))
+        feed_content.encodings["br"] = b"brotli content"
+        cache.set(_feed_content_key(RSS_FEED_URL), feed_content)
+
+        # When: the content is fetched
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL, headers={"Accept-Encoding": "gzip, br"})
+
+        # Then: the brotli encoding is served
+        self.assertEqual("br", response.headers["Content-Encoding"])
+        self.assertEqual(b"brotli content", response.data)
+
+    def test_compressed_content_not_modified_for_matching_etag(self):
+        # Given: the ETag of previously fetched gzip content
+        headers = {"Accept-Encoding": "gzip"}
+        etag = app.test_client().get("/content?url=" + RSS_FEED_URL, headers=headers).headers["ETag"]
+
+        # When: the content is fetched again with it
+        headers["If-None-Match"] = etag
+        response = app.test_client().get("/content?url=" + RSS_FEED_URL, headers=headers)
+
+        # Then: the content is reported as not modified
+        self.assertEqual(HTTP_NOT_MODIFIED, response.status_code)
+        self.assertEqual(b"", response.data)
@@ -4,13 +4,26 @@ from unittest.mock import patch
 
 from parameterized import parameterized
 
-from app.feedme_app import app
+from user.password_hasher import PasswordHasherBusy
+
+from app.feedme_app import app, loaded_users, password_hasher, user_loader, _update_user, _trust_proxies
 from tests.test_app_base import TestAppBase, HTTP_SUCCESS
 from user.user import User
 
+HTTP_FOUND = 302
+
 
 class TestAppLogin(TestAppBase):
 
+    def setUp(self):
+        super(TestAppLogin, self).setUp()
+        loaded_users.clear()
+
+    def tearDown(self):
+        app.config["LOGIN_DISABLED"] = True
+        loaded_users.clear()
+        super(TestAppLogin, self).tearDown()
+
     @patch("app.feedme_app.db")
     @patch("app.feedme_app.User")
     def test_login_with_valid_credentials(self, mock_user, mock_db):
@@ -25,8 +38,8 @@ class TestAppLogin(TestAppBase):
             data=dict(email="bill@email.com", password="test", remember_me=False, login=True),
             follow_redirects=True
         )
-        # Then: the user is successfully logged in
-        assert mock_db.session.commit.called
+        # Then: the user is successfully logged in, without a write to the DB
+        mock_db.session.commit.assert_not_called()
         self.assertEqual(HTTP_SUCCESS, response.status_code)
         self.assertIn(b"FeedMe - Home", response.data)
 
@@ -77,3 +90,139 @@ class TestAppLogin(TestAppBase):
         assert not mock_db.session.commit.called
         self.assertEqual(HTTP_SUCCESS, response.status_code)
         self.assertIn(b"FeedMe - Login", response.data)
+
+    @patch("app.feedme_app.User", side_effect=User)
+    def test_user_loader_caches_loaded_user(self, mock_user):
+        # Given: a registered user
+        mock_user.query.get.return_value = User(email="bill@email.com", password="hash", authenticated=True)
+
+        # When: the user is loaded for several requests
+        users = [user_loader("bill@email.com") for _ in range(3)]
+
+        # Then: the user is queried from the DB only once, and is authenticated by its session
+        mock_user.query.get.assert_called_once_with("bill@email.com")
+        self.assertEqual(["bill@email.com"] * 3, [user.email for user in users])
+        self.assertTrue(users[0].authenticated)
+
+    @patch("app.feedme_app.User", side_effect=User)
+    def test_user_loader_does_not_cache_missing_user(self, mock_user):
+        # Given: the user is not registered
+        mock_user.query.get.return_value = None
+
+        # When: the user is loaded twice
+        users = [user_loader("bill@email.com") for _ in range(2)]
+
+        # Then: the DB is queried each time, so a later registration is seen
+        self.assertEqual([None, None], users)
+        self.assertEqual(2, mock_user.query.get.call_count)
+
+    @patch("app.feedme_app.db")
+    @patch("app.feedme_app.User", side_effect=User)
+    def test_updating_user_invalidates_loaded_user(self, mock_user, mock_db):
+        # Given: a loaded user
+        mock_user.query.get.return_value = User(email="bill@email.com", password="hash", authenticated=True)
+        user = user_loader("bill@email.com")
+
+        # When: the user's password is updated
+        mock_user.query.get.return_value = User(email="bill@email.com", password="new hash", authenticated=False)
+        with app.app_context():
+            _update_user(user, {"password": "new hash"})
+
+        # Then: the change is stored and the user is loaded afresh
+        assert mock_db.session.commit.called
+        self.assertEqual("new hash", user_loader("bill@email.com").password)
+        self.assertEqual(2, mock_user.query.get.call_count)
+
+    @patch("app.feedme_app.db")
+    @patch("app.feedme_app.User")
+    def test_login_rehashes_password_with_changed_work_factor(self, mock_user, mock_db):
+        # Given: a registered user whose password was hashed with an older work factor
+        registered_user = User(email="bill@email.com", authenticated=False)
+        registered_user.set_password("test")
+        mock_user.query.get.return_value = registered_user
+
+        # When: the user logs in
+        with patch.object(password_hasher, "rounds", 4):
+            app.test_client().post("/login", data=dict(email="bill@email.com", password="test", login=True))
+
+        # Then: the password is stored hashed with the current work factor
+        query = mock_db.session.query.return_value.filter_by
+        query.assert_called_once_with(email="bill@email.com")
+        values = query.return_value.update.call_args[0][0]
+        self.assertEqual("04", values["password"].decode("utf-8").split("$")[2])
+        self.assertTrue(password_hasher.verify(values["password"], "test"))
+
+    @patch("app.feedme_app.db")
+    @patch("app.feedme_app.User")
+    def test_login_throttled_before_verifying_password(self, mock_user, mock_db):
+        # Given: a client which has used up its login attempts
+        mock_user.query.get.return_value = None
+        client = app.test_client()
+        for _ in range(app.config["PASSWORD_ATTEMPT_BURST"]):
+            client.post("/login", data=dict(email="bill@email.com", password="wrong", login=True))
+        mock_user.query.get.reset_mock()
+
+        # When: the client tries to log in again
+        with patch.object(password_hasher, "verify") as mock_verify:
+            response = client.post("/login", data=dict(email="bill@email.com", password="test", login=True))
+
+        # Then: the attempt is refused without looking up or verifying the password
+        self.assertEqual(429, response.status_code)
+        self.assertIn(b"Too many attempts", response.data)
+        mock_user.query.get.assert_not_called()
+        mock_verify.assert_not_called()
+
+    @parameterized.expand([
+        ["behind a trusted proxy", 1, HTTP_SUCCESS],
+        ["exposed directly", 0, 429]
+    ])
+    @patch("app.feedme_app.db")
+    @patch("app.feedme_app.User")
+    def test_login_throttled_per_client_address(self, _, hops, status_code, mock_user, mock_db):
+        # Given: a client which has used up its login attempts, with the address it gave in X-Forwarded-For
+        mock_user.query.get.return_value = None
+        client = app.test_client()
+        with patch.object(app, "wsgi_app", _trust_proxies(app.wsgi_app, hops)):
+            for _ in range(app.config["PASSWORD_ATTEMPT_BURST"]):
+                client.post("/login", data=dict(email="bill@email.com", password="wrong", login=True),
+                            headers={"X-Forwarded-For": "203.0.113.1"})
+
+            # When: a client giving another address in X-Forwarded-For tries to log in over the same connection
+            response = client.post("/login", data=dict(email="bill@email.com", password="wrong", login=True),
+                                   headers={"X-Forwarded-For": "203.0.113.2"})
+
+        # Then: the attempt is only allowed if the address was resolved by a trusted proxy
+        self.assertEqual(status_code, response.status_code)
+
+    @patch("app.feedme_app.db")
+    @patch("app.feedme_app.User")
+    def test_login_refused_when_password_hasher_busy(self, mock_user, mock_db):
+        # Given: a registered user and a busy password hasher
+        mock_user.query.get.return_value = User(email="bill@email.com", password="hash", authenticated=False)
+
+        # When: the user logs in
+        with patch.object(password_hasher, "verify", side_effect=PasswordHasherBusy("busy")):
+            response = app.test_client().post("/login", data=dict(email="bill@email.com", password="test", login=True))
+
+        # Then: the login is refused as unavailable
+        self.assertEqual(503, response.status_code)
+        assert not mock_db.session.commit.called
+
+    @patch("app.feedme_app.db")
+    @patch("app.feedme_app.User", side_effect=User)
+    def test_logout_does_not_write_to_db(self, mock_user, mock_db):
+        # Given: a logged in user
+        mock_user.query.get.return_value = User(email="bill@email.com", password="hash", authenticated=False)
+        app.config["LOGIN_DISABLED"] = False
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = "bill@email.com"
+            session["_fresh"] = True
+        self.assertEqual(HTTP_SUCCESS, client.get("/").status_code)
+
+        # When: the user logs out
+        client.get("/logout")
+
+        # Then: the session is ended without a write to the DB, so the user must log in again
+        mock_db.session.commit.assert_not_called()
+        self.assertEqual(HTTP_FOUND, client.get("/").status_code)
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from app.feedme_app import app, cache, _feed_content_key
+from tests.test_app_base import TestAppBase, HTTP_SUCCESS
+
+RSS_FEED_URL = "https://www.metrics.com/rss/xml"
+HTTP_FOUND = 302
+HTTP_UNAUTHORIZED = 401
+
+
+class TestAppMetrics(TestAppBase):
+
+    def tearDown(self):
+        app.config["LOGIN_DISABLED"] = True
+        app.config["METRICS_TOKEN"] = None
+        cache.delete(_feed_content_key(RSS_FEED_URL))
+        super(TestAppMetrics, self).tearDown()
+
+    @patch("feedparser.parse")
+    def test_metrics_include_feed_stages_and_cache_results(self, mock_response):
+        # Given: an RSS feed fetched once and then served from the cache
+        mock_response.return_value = {
+            "feed": {"title": "Metrics Feed", "link": "some link", "description": "blah"},
+            "entries": [{"id": "1", "title": "Some Entry Title", "link": "some link", "published": "123"}]
+        }
+        client = app.test_client()
+        client.get("/content?url=" + RSS_FEED_URL)
+        client.get("/content?url=" + RSS_FEED_URL)
+
+        # When: the metrics are fetched
+        response = client.get("/metrics")
+
+        # Then: the stage timings, cache results, payload size and request latencies are exposed
+        self.assertEqual(HTTP_SUCCESS, response.status_code)
+        self.assertTrue(response.mimetype.startswith("text/plain"))
+        text = response.data.decode()
+        for stage in ["fetch", "validate", "parse", "store", "render"]:
+            self.assertIn("feedme_feed_stage_seconds_count{{stage=\"{}\",feed=\"{}\"}}".format(stage, RSS_FEED_URL),
+                          text)
+        self.assertIn("feedme_feed_cache_requests_total{{result=\"miss\",feed=\"{}\"}}".format(RSS_FEED_URL), text)
+        self.assertIn("feedme_feed_cache_requests_total{{result=\"hit\",feed=\"{}\"}}".format(RSS_FEED_URL), text)
+        self.assertIn("feedme_feed_payload_bytes{{feed=\"{}\"}}".format(RSS_FEED_URL), text)
+        self.assertIn("feedme_request_seconds_count{route=\"/content\",method=\"GET\",status=\"200\"}", text)
+        self.assertIn("feedme_cache_backend{stat=\"hits\"}", text)
+
+    def test_metrics_require_login(self):
+        # Given: a user who has not logged in, and no metrics token
+        app.config["LOGIN_DISABLED"] = False
+
+        # When: the metrics are fetched
+        response = app.test_client().get("/metrics")
+
+        # Then: the user is sent to log in
+        self.assertEqual(HTTP_FOUND, response.status_code)
+        self.assertIn("/login", response.headers["Location"])
+
+    @parameterized.expand([
+        ["no token", {}, HTTP_UNAUTHORIZED],
+        ["wrong token", {"Authorization": "Bearer wrong"}, HTTP_UNAUTHORIZED],
+        ["token", {"Authorization": "Bearer s3cret"}, HTTP_SUCCESS]
+    ])
+    def test_metrics_require_configured_token(self, _, headers, status):
+        # Given: a configured metrics token, and a scraper which has not logged in
+        app.config["METRICS_TOKEN"] = "s3cret"
+        app.config["LOGIN_DISABLED"] = False
+
+        # When: the metrics are fetched
+        response = app.test_client().get("/metrics", headers=headers)
+
+        # Then: only a scraper presenting the token is shown them
+        self.assertEqual(status, response.status_code)
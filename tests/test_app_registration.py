@@ -4,7 +4,7 @@ from unittest.mock import patch
 
 from parameterized import parameterized
 
-from app.feedme_app import app
+from app.feedme_app import app, password_hasher
 from tests.test_app_base import TestAppBase, HTTP_SUCCESS
 from user.user import User
 
@@ -93,3 +93,32 @@ class TestAppRegistration(TestAppBase):
         self.assertEqual(HTTP_SUCCESS, response.status_code)
         self.assertIn(b"Register", response.data)
         self.assertIn(b"Field must be equal to password", response.data)
+
+    def test_register_hashes_password_off_request_thread(self, mock_db):
+        # When: a new user is registered
+        with patch.object(password_hasher, "hash", return_value=b"hash") as mock_hash:
+            app.test_client().post(
+                "/register",
+                data=dict(email="bill@email.com", password="test", repeat_password="test", register=True)
+            )
+
+        # Then: the user is stored with the password hashed by the password hasher
+        mock_hash.assert_called_once_with("test")
+        self.assertEqual(b"hash", mock_db.session.add.call_args[0][0].password)
+
+    def test_register_throttled_before_hashing_password(self, mock_db):
+        # Given: a client which has used up its attempts
+        client = app.test_client()
+        data = dict(email="bill@email.com", password="test", repeat_password="test", register=True)
+        with patch.object(password_hasher, "hash", return_value=b"hash"):
+            for _ in range(app.config["PASSWORD_ATTEMPT_BURST"]):
+                client.post("/register", data=data)
+
+        # When: the client registers again
+        with patch.object(password_hasher, "hash") as mock_hash:
+            response = client.post("/register", data=data)
+
+        # Then: the attempt is refused without hashing the password
+        self.assertEqual(429, response.status_code)
+        self.assertIn(b"Too many attempts", response.data)
+        mock_hash.assert_not_called()
@@ -0,0 +1,71 @@
+#!/usr/bin/python3
+
+import multiprocessing
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from tests.test_app_base import TestAppBase
+
+RSS_FEED_URL = "https://www.shared.com/rss/xml"
+RSS_FEED_RESPONSE = {
+    "feed": {"title": "Shared Feed", "link": "some link", "description": "blah"},
+    "entries": [{"id": "1", "title": "Shared Entry Title", "link": "some link"}]
+}
+WORKER_COUNT = 3
+
+
+def _refresh_in_worker(fetches_path, results):
+    # Runs in a freshly spawned interpreter, configured for the shared cache by the environment.
+    from app.feedme_app import app, _refresh_feed_content
+    app.config["FEED_PARSER_BACKEND"] = "feedparser"
+
+    def slow_parse(*args, **kwargs):
+        with open(fetches_path, "a") as fetches_file:
+            fetches_file.write("{}\n".format(os.getpid()))
+        time.sleep(0.5)
+        return RSS_FEED_RESPONSE
+
+    with patch("feedparser.parse", side_effect=slow_parse):
+        try:
+            results.put(_refresh_feed_content(RSS_FEED_URL))
+        except Exception as error:
+            results.put(repr(error))
+
+
+class TestAppSharedCache(TestAppBase):
+
+    def setUp(self):
+        super(TestAppSharedCache, self).setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.environ = patch.dict(os.environ, {"FEEDME_SHARED_CACHE": "1",
+                                               "FEEDME_CACHE_PATH": os.path.join(self.temp_dir.name, "cache.db")})
+        self.environ.start()
+
+    def tearDown(self):
+        self.environ.stop()
+        self.temp_dir.cleanup()
+        super(TestAppSharedCache, self).tearDown()
+
+    def test_workers_share_a_single_refresh(self):
+        # Given: several worker processes sharing a cache
+        context = multiprocessing.get_context("spawn")
+        fetches_path = os.path.join(self.temp_dir.name, "fetches")
+        results = context.Queue()
+        workers = [context.Process(target=_refresh_in_worker, args=(fetches_path, results))
+                   for _ in range(WORKER_COUNT)]
+
+        # When: every worker refreshes the same RSS feed at once
+        for worker in workers:
+            worker.start()
+        contents = [results.get(timeout=60) for _ in workers]
+        for worker in workers:
+            worker.join(10)
+
+        # Then: the feed is fetched by only one worker, and every worker has its content
+        self.assertEqual([0] * WORKER_COUNT, [worker.exitcode for worker in workers])
+        with open(fetches_path) as fetches_file:
+            self.assertEqual(1, len(fetches_file.readlines()))
+        for content in contents:
+            self.assertIn("Shared Entry Title", content)
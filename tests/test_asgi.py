@@ -0,0 +1,140 @@
+#!/usr/bin/python3
+
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.asgi import AsgiAdapter
+
+
+async def asgi_request(application, path, query_string=b"", method="GET", headers=None, body=b""):
+    """
+    Sends a single request to an ASGI app.
+    :return: tuple of the response status, headers and the body messages sent.
+    """
+    requests = [{"type": "http.request", "body": body, "more_body": False}]
+    messages = []
+
+    async def receive():
+        return requests.pop(0) if requests else {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "http_version": "1.1", "method": method, "scheme": "http", "path": path,
+             "root_path": "", "query_string": query_string, "headers": headers or [],
+             "server": ("127.0.0.1", 8000), "client": ("127.0.0.1", 50000)}
+    await application(scope, receive, send)
+    start = messages[0]
+    response_headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in start["headers"]}
+    return start["status"], response_headers, messages[1:]
+
+
+def _body(messages):
+    return b"".join(message["body"] for message in messages)
+
+
+class _ClosingResponse:
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class TestAsgiAdapter(unittest.TestCase):
+
+    def setUp(self):
+        self.environs = []
+        self.response = _ClosingResponse([b"first", b"", b"second"])
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.obj_under_test = AsgiAdapter(self._wsgi_app, self.executor)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _wsgi_app(self, environ, start_response):
+        self.environs.append(environ)
+        if environ["PATH_INFO"] == "/echo":
+            start_response("201 Created", [("Content-Type", "text/plain"), ("X-Method", environ["REQUEST_METHOD"])])
+            return [environ["wsgi.input"].read()]
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return self.response
+
+    def test_request_translated_to_environ(self):
+        # Given: a request with a query string, headers and a body
+        headers = [(b"content-type", b"text/plain"), (b"content-length", b"4"), (b"x-feed", b"a"),
+                   (b"x-feed", b"b"), (b"cookie", b"one=1"), (b"cookie", b"two=2")]
+
+        # When: the request is sent
+        status, response_headers, messages = asyncio.run(asgi_request(
+            self.obj_under_test, "/echo", b"url=https%3A%2F%2Fwww.feed.com", "POST", headers, b"body"))
+
+        # Then: the app sees the request as WSGI describes it, and its response is sent back
+        environ = self.environs[0]
+        self.assertEqual("/echo", environ["PATH_INFO"])
+        self.assertEqual("url=https%3A%2F%2Fwww.feed.com", environ["QUERY_STRING"])
+        self.assertEqual("text/plain", environ["CONTENT_TYPE"])
+        self.assertEqual("4", environ["CONTENT_LENGTH"])
+        self.assertEqual("a,b", environ["HTTP_X_FEED"])
+        self.assertEqual("one=1; two=2", environ["HTTP_COOKIE"])
+        self.assertEqual(201, status)
+        self.assertEqual("POST", response_headers["x-method"])
+        self.assertEqual(b"body", _body(messages))
+
+    def test_response_streamed_and_closed(self):
+        # Given: an app responding in chunks
+
+        # When: a request is sent
+        status, _, messages = asyncio.run(asgi_request(self.obj_under_test, "/stream"))
+
+        # Then: each chunk is sent as it is produced, and the response is closed once sent
+        self.assertEqual(200, status)
+        self.assertEqual([b"first", b"second", b""], [message["body"] for message in messages])
+        self.assertEqual([True, True, False], [message["more_body"] for message in messages])
+        self.assertTrue(self.response.closed)
+
+    def test_before_dispatch_awaited_without_holding_worker(self):
+        # Given: a hook which waits on a request to /slow until a later request has been served
+        async def requests():
+            # Created on the running loop, as Python 3.7 binds events to a loop when they are made.
+            served = asyncio.Event()
+
+            async def before_dispatch(environ):
+                if environ["PATH_INFO"] == "/slow":
+                    await served.wait()
+
+            self.obj_under_test.before_dispatch = before_dispatch
+            slow = asyncio.ensure_future(asgi_request(self.obj_under_test, "/slow"))
+            await asgi_request(self.obj_under_test, "/fast")
+            served.set()
+            await slow
+
+        # When: both requests are sent to an adapter with a single worker
+        asyncio.run(asyncio.wait_for(requests(), 5))
+
+        # Then: the later request is served while the earlier one waits
+        self.assertEqual(["/fast", "/slow"], [environ["PATH_INFO"] for environ in self.environs])
+
+    def test_lifespan(self):
+        # Given: an ASGI server starting up and shutting down
+        events = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return events.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        # When: the lifespan is run
+        asyncio.run(self.obj_under_test({"type": "lifespan"}, receive, send))
+
+        # Then: each stage is completed
+        self.assertEqual(["lifespan.startup.complete", "lifespan.shutdown.complete"],
+                         [message["type"] for message in sent])
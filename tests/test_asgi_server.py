@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+
+import asyncio
+import unittest
+
+from parameterized import parameterized
+
+from utils.asgi_server import AsgiServer
+
+
+async def _echo_app(scope, receive, send):
+    message = await receive()
+    if scope["path"] == "/stream":
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+        for chunk in (b"first", b"second"):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+        return
+    if scope["path"] == "/error":
+        raise ValueError("app failed")
+    body = "{} {} {} ".format(scope["method"], scope["path"], scope["query_string"].decode()).encode() + message["body"]
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": body})
+
+
+class TestAsgiServer(unittest.TestCase):
+
+    def _exchange(self, *requests):
+        """
+        Sends each request in turn over a single connection to a running server.
+        :return: list of the responses read back, empty once the server has closed the connection.
+        """
+        async def exchange():
+            server = await AsgiServer(_echo_app, port=0, keep_alive_timeout=1).start()
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for request in requests:
+                writer.write(request)
+                responses.append(await self._read_response(reader))
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return responses
+
+        return asyncio.run(asyncio.wait_for(exchange(), 5))
+
+    @staticmethod
+    async def _read_response(reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as error:
+            return error.partial
+        if b"transfer-encoding: chunked" in head:
+            return head + await reader.readuntil(b"0\r\n\r\n")
+        content_length = int(head.split(b"content-length: ")[1].split(b"\r\n")[0])
+        return head + await reader.readexactly(content_length)
+
+    def test_requests_served_over_kept_alive_connection(self):
+        # Given: two requests, one with a body
+
+        # When: both are sent over a single connection
+        responses = self._exchange(b"GET /feeds?page=2 HTTP/1.1\r\nHost: localhost\r\n\r\n",
+                                   b"POST /feeds HTTP/1.1\r\nHost: localhost\r\nContent-Length: 4\r\n\r\nbody")
+
+        # Then: each is answered on the same connection, with its length given
+        self.assertTrue(responses[0].startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertIn(b"content-length: 18\r\n", responses[0])
+        self.assertTrue(responses[0].endswith(b"\r\n\r\nGET /feeds page=2 "))
+        self.assertTrue(responses[1].endswith(b"\r\n\r\nPOST /feeds  body"))
+
+    def test_streamed_response_sent_chunked(self):
+        # Given: an app streaming its response
+
+        # When: it is requested
+        responses = self._exchange(b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n")
+
+        # Then: each chunk is sent as it is produced, ending with the last chunk
+        self.assertIn(b"transfer-encoding: chunked\r\n", responses[0])
+        self.assertTrue(responses[0].endswith(b"\r\n\r\n5\r\nfirst\r\n6\r\nsecond\r\n0\r\n\r\n"))
+
+    def test_chunked_request_body_read(self):
+        # Given: a request sending its body in chunks
+
+        # When: it is sent
+        responses = self._exchange(b"POST /feeds HTTP/1.1\r\nHost: localhost\r\nTransfer-Encoding: chunked\r\n\r\n"
+                                   b"2\r\nbo\r\n2\r\ndy\r\n0\r\n\r\n")
+
+        # Then: the app is given the whole body
+        self.assertTrue(responses[0].endswith(b"\r\n\r\nPOST /feeds  body"))
+
+    @parameterized.expand([
+        ["client closing", b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n", b"HTTP/1.1 200 OK\r\n"],
+        ["HTTP/1.0", b"GET / HTTP/1.0\r\n\r\n", b"HTTP/1.1 200 OK\r\n"],
+        ["malformed request", b"GET\r\n\r\n", b"HTTP/1.1 400 Bad Request\r\n"],
+        ["malformed header", b"GET / HTTP/1.1\r\nHost localhost\r\n\r\n", b"HTTP/1.1 400 Bad Request\r\n"],
+        ["app error", b"GET /error HTTP/1.1\r\n\r\n", b"HTTP/1.1 500 Internal Server Error\r\n"],
+        ["stalled body", b"POST / HTTP/1.1\r\nContent-Length: 4\r\n\r\nbo", b"HTTP/1.1 408 Request Timeout\r\n"],
+        ["stalled chunked body", b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n2\r\nbo\r\n",
+         b"HTTP/1.1 408 Request Timeout\r\n"]
+    ])
+    def test_connection_closed(self, _, request, status_line):
+        # Given: a request after which the connection cannot be kept alive
+
+        # When: it is sent, followed by another request
+        responses = self._exchange(request, b"GET / HTTP/1.1\r\n\r\n")
+
+        # Then: the request is answered, and the connection closed
+        self.assertTrue(responses[0].startswith(status_line))
+        self.assertIn(b"connection: close\r\n", responses[0])
+        self.assertEqual(b"", responses[1])
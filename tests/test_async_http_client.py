@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+
+import asyncio
+import time
+import unittest
+
+from parameterized import parameterized
+
+from tests.feed_server import CountingFeedHandler, DOCUMENT, start_feed_server, stop_feed_server
+from utils.async_http_client import AsyncHttpClient
+from utils.http_client import HttpFetchError
+
+POLL_INTERVAL = 0.01
+
+
+class TestAsyncHttpClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_feed_server(CountingFeedHandler)
+        self.base_url = "http://127.0.0.1:{}".format(self.server.server_port)
+        self.obj_under_test = AsyncHttpClient(connect_timeout=1, read_timeout=0.5, max_bytes=2048)
+
+    def tearDown(self):
+        stop_feed_server(self.server)
+
+    def _run(self, fetch):
+        async def fetch_and_close():
+            try:
+                return await fetch()
+            finally:
+                await self.obj_under_test.close()
+
+        return asyncio.run(fetch_and_close())
+
+    def _get(self, path, headers=None):
+        return self._run(lambda: self.obj_under_test.get(self.base_url + path, headers))
+
+    @parameterized.expand([
+        ["identity", "/feed"],
+        ["gzip", "/gzip"],
+        ["deflate", "/deflate"],
+        ["raw deflate", "/raw-deflate"]
+    ])
+    def test_get_decompresses_response(self, _, path):
+        # Given: a feed served with a content encoding
+
+        # When: the feed is fetched
+        response = self._get(path)
+
+        # Then: the decompressed feed is returned, having asked for compression
+        self.assertEqual(200, response.status)
+        self.assertEqual(DOCUMENT, response.content)
+        self.assertEqual("gzip, deflate", self.server.requests[0]["Accept-Encoding"])
+
+    def test_get_reads_chunked_response(self):
+        # Given: a response sent in chunks, within the maximum size
+        self.obj_under_test.max_bytes = 4096
+
+        # When: the response is fetched
+        response = self._get("/chunked")
+
+        # Then: the chunks are joined
+        self.assertEqual(b"x" * 4096, response.content)
+
+    @parameterized.expand([
+        ["content length", "/large"],
+        ["chunked", "/chunked"],
+        ["decompressed", "/gzip-bomb"]
+    ])
+    def test_get_rejects_responses_over_max_bytes(self, _, path):
+        # Given: a response larger than the maximum size
+
+        # When: the response is fetched
+        with self.assertRaises(HttpFetchError) as error:
+            self._get(path)
+
+        # Then: the response is rejected
+        self.assertIn("exceeds 2048 bytes", error.exception.message)
+
+    def test_get_times_out_slow_response(self):
+        # Given: a response slower than the read timeout
+
+        # When: the response is fetched
+        started = time.perf_counter()
+        with self.assertRaises(HttpFetchError) as error:
+            self._get("/slow")
+
+        # Then: the fetch is abandoned after the read timeout
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertIn("timed out", error.exception.message)
+
+    def test_get_follows_redirects(self):
+        # Given: a feed which has moved
+
+        # When: the old URL is fetched
+        response = self._get("/redirect")
+
+        # Then: the feed is fetched from its new URL
+        self.assertEqual(DOCUMENT, response.content)
+        self.assertEqual(self.base_url + "/feed", response.url)
+
+    def test_get_sends_conditional_headers(self):
+        # Given: the validators from a previous fetch
+        etag = self._get("/conditional").headers["ETag"]
+
+        # When: the feed is fetched with them
+        response = self._get("/conditional", {"If-None-Match": etag})
+
+        # Then: the feed is reported as not modified
+        self.assertEqual(304, response.status)
+        self.assertEqual(b"", response.content)
+
+    @parameterized.expand([
+        ["server error", "/error", 500],
+        ["not found", "/missing", 404]
+    ])
+    def test_get_reports_error_status(self, _, path, status):
+        # Given: a URL returning an error status
+
+        # When: the URL is fetched
+        with self.assertRaises(HttpFetchError) as error:
+            self._get(path)
+
+        # Then: the status is reported
+        self.assertEqual(status, error.exception.status)
+
+    def test_get_rejects_unsupported_url(self):
+        # Given: a URL which is not http or https
+
+        # When: the URL is fetched
+        with self.assertRaises(HttpFetchError) as error:
+            self._run(lambda: self.obj_under_test.get("file:///etc/passwd"))
+
+        # Then: the URL is rejected
+        self.assertIn("Unsupported URL", error.exception.message)
+
+    @parameterized.expand([
+        ["content length", "/feed"],
+        ["chunked", "/chunked"]
+    ])
+    def test_get_reuses_connections(self, _, path):
+        # Given: a response fetched once, whose end is marked
+        self.obj_under_test.max_bytes = 4096
+
+        async def fetch_twice():
+            await self.obj_under_test.get(self.base_url + path)
+
+            # When: the feed is fetched again, on the same event loop
+            return await self.obj_under_test.get(self.base_url + "/feed")
+
+        response = self._run(fetch_twice)
+
+        # Then: both fetches share a single connection
+        self.assertEqual(DOCUMENT, response.content)
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual(1, self.server.connections)
+
+    def test_get_retries_connection_closed_by_server(self):
+        # Given: a pooled connection which the server has since closed
+        async def fetch_twice():
+            await self.obj_under_test.get(self.base_url + "/closed-when-idle")
+
+            # When: the feed is fetched again
+            return await self.obj_under_test.get(self.base_url + "/feed")
+
+        response = self._run(fetch_twice)
+
+        # Then: the feed is fetched over a new connection
+        self.assertEqual(DOCUMENT, response.content)
+        self.assertEqual(2, self.server.connections)
+
+    def test_get_bounds_connections_per_host(self):
+        # Given: a client allowing 2 connections per host, and a host holding every request until released
+        self.obj_under_test.max_per_host = 2
+
+        async def fetch_all():
+            fetches = asyncio.gather(*[self.obj_under_test.get(self.base_url + "/held-feed") for _ in range(4)])
+            while self.server.active < 2:
+                await asyncio.sleep(POLL_INTERVAL)
+            # Gives any fetch over the bound time to reach the host before the held requests are released.
+            await asyncio.sleep(0.1)
+            held = len(self.server.requests)
+            self.server.release.set()
+            return held, await fetches
+
+        # When: 4 feeds are fetched from the host at once, from a single thread
+        held, responses = self._run(lambda: asyncio.wait_for(fetch_all(), 5))
+
+        # Then: only 2 requests reach the host while it holds them, and every feed is fetched in the end
+        self.assertEqual(2, held)
+        self.assertLessEqual(self.server.most_active, 2)
+        self.assertEqual([DOCUMENT] * 4, [response.content for response in responses])
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks import run_benchmarks
+from benchmarks.synthetic_feed import generate_feed, generate_document
+from parser.rss_parser import _create_rss_channel
+from parser.xml_feed_parser import parse_feed_document
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_synthetic_feed_is_valid(self):
+        # Given: a synthetic feed
+        rss_feed = generate_feed(3)
+
+        # When: the RSS channel is created
+        rss_channel = _create_rss_channel(rss_feed)
+
+        # Then: every entry is parsed with a publish time
+        self.assertEqual(3, len(rss_channel.rss_items))
+        self.assertTrue(all(rss_item.published_at for rss_item in rss_channel.rss_items))
+
+    def test_synthetic_document_matches_synthetic_feed(self):
+        # Given: a synthetic feed and the matching document
+        rss_feed = generate_feed(3)
+
+        # When: the document is parsed
+        parsed_feed = parse_feed_document(generate_document(3))
+
+        # Then: the same entries are parsed from the document
+        self.assertEqual(rss_feed["entries"], parsed_feed["entries"])
+
+    def test_results_saved_and_compared(self):
+        with tempfile.TemporaryDirectory() as output:
+            # Given: saved benchmark results
+            baseline = run_benchmarks.save([{"name": "_parse_items", "size": 10, "seconds": 1.0, "peak_bytes": 100}],
+                                           "baseline", output)
+
+            # When: slower results are compared against them
+            regressions = run_benchmarks.compare(
+                [{"name": "_parse_items", "size": 10, "seconds": 2.0, "peak_bytes": 100}], baseline)
+
+            # Then: the slow down is reported as a regression
+            with open(baseline) as baseline_file:
+                self.assertEqual("baseline", json.load(baseline_file)["label"])
+            self.assertEqual(1, len(regressions))
+            self.assertIn("_parse_items with 10 entries: seconds", regressions[0])
+
+    def test_run_benchmarks(self):
+        with tempfile.TemporaryDirectory() as output:
+            # When: the benchmarks are run for a small feed
+            exit_code = run_benchmarks.main(["--sizes", "10", "--repeat", "1", "--label", "test", "--output", output])
+
+            # Then: the results for every hot path are saved
+            self.assertEqual(0, exit_code)
+            with open(os.path.join(output, "test.json")) as results_file:
+                names = {result["name"] for result in json.load(results_file)["results"]}
+            self.assertEqual({"parse_feed_document", "_create_rss_channel", "_parse_items", "_validate_item",
+                              "format_feed_content"}, names)
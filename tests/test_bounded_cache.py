@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+
+import os
+import tempfile
+import time
+import unittest
+
+from caching.bounded_cache import BoundedCache
+
+
+class TestBoundedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.disk_path = os.path.join(self.temp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_cached_value(self):
+        # Given: a cache holding a value
+        obj_under_test = BoundedCache(max_bytes=1024)
+        obj_under_test.set("https://www.fiercewireless.com/rss/xml", "<h2>FierceWireless</h2>")
+
+        # When: the value is read
+        value = obj_under_test.get("https://www.fiercewireless.com/rss/xml")
+
+        # Then: the cached value is returned and counted as a hit
+        self.assertEqual("<h2>FierceWireless</h2>", value)
+        self.assertEqual(1, obj_under_test.stats()["hits"])
+
+    def test_get_missing_value(self):
+        # Given: an empty cache
+        obj_under_test = BoundedCache(max_bytes=1024)
+
+        # When: a missing value is read
+        value = obj_under_test.get("https://www.fiercewireless.com/rss/xml")
+
+        # Then: nothing is returned and the miss is counted
+        self.assertIsNone(value)
+        self.assertEqual(1, obj_under_test.stats()["misses"])
+
+    def test_memory_stays_within_budget(self):
+        # Given: a cache with room for only a few values
+        obj_under_test = BoundedCache(max_bytes=1024)
+
+        # When: more values are cached than fit in memory
+        for index in range(10):
+            obj_under_test.set("key-{}".format(index), "x" * 200)
+
+        # Then: the least recently used values are evicted
+        stats = obj_under_test.stats()
+        self.assertLessEqual(stats["bytes"], 1024)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNone(obj_under_test.get("key-0"))
+        self.assertEqual("x" * 200, obj_under_test.get("key-9"))
+
+    def test_recently_read_values_are_kept(self):
+        # Given: a full cache where the oldest value was recently read
+        obj_under_test = BoundedCache(max_bytes=700)
+        for index in range(3):
+            obj_under_test.set("key-{}".format(index), "x" * 200)
+        obj_under_test.get("key-0")
+
+        # When: another value is cached
+        obj_under_test.set("key-3", "x" * 200)
+
+        # Then: the least recently used value is evicted instead
+        self.assertIsNotNone(obj_under_test.get("key-0"))
+        self.assertIsNone(obj_under_test.get("key-1"))
+
+    def test_evicted_values_spill_to_disk(self):
+        # Given: a cache with a disk tier
+        obj_under_test = BoundedCache(max_bytes=700, disk_path=self.disk_path)
+
+        # When: more values are cached than fit in memory
+        for index in range(5):
+            obj_under_test.set("key-{}".format(index), "x" * 200)
+
+        # Then: evicted values are still served from disk
+        self.assertEqual("x" * 200, obj_under_test.get("key-0"))
+        stats = obj_under_test.stats()
+        self.assertEqual(1, stats["disk_hits"])
+        self.assertGreater(stats["disk"]["entries"], 0)
+
+    def test_expired_values_are_not_returned(self):
+        # Given: a cached value which has expired
+        obj_under_test = BoundedCache(max_bytes=1024, disk_path=self.disk_path)
+        obj_under_test.set("https://www.fiercewireless.com/rss/xml", "<h2>FierceWireless</h2>", timeout=1)
+        time.sleep(1.1)
+
+        # When: the value is read
+        value = obj_under_test.get("https://www.fiercewireless.com/rss/xml")
+
+        # Then: nothing is returned
+        self.assertIsNone(value)
+
+    def test_delete_removes_value_from_both_tiers(self):
+        # Given: a cache with values in memory and on disk
+        obj_under_test = BoundedCache(max_bytes=300, disk_path=self.disk_path)
+        obj_under_test.set("key-0", "x" * 200)
+        obj_under_test.set("key-1", "x" * 200)
+
+        # When: the values are deleted
+        obj_under_test.delete("key-0")
+        obj_under_test.delete("key-1")
+
+        # Then: neither value is returned
+        self.assertIsNone(obj_under_test.get("key-0"))
+        self.assertIsNone(obj_under_test.get("key-1"))
@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from parameterized import parameterized
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+from app.feedme_app import app, db
+from utils.database import DEFAULT_SQLITE_PRAGMAS, engine_options, apply_sqlite_pragmas
+
+
+class TestDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_engine_options_pool_sqlite_connections(self):
+        # Given: a SQLite database URL
+
+        # When: the engine options are made
+        options = engine_options("sqlite:////tmp/feedme.db", pool_size=5, max_overflow=10, pool_timeout=30,
+                                 pool_recycle=3600)
+
+        # Then: connections are pooled and may be used from any thread
+        self.assertEqual(QueuePool, options["poolclass"])
+        self.assertEqual(5, options["pool_size"])
+        self.assertFalse(options["connect_args"]["check_same_thread"])
+        self.assertNotIn("pool_pre_ping", options)
+
+    @parameterized.expand([
+        ["PostgreSQL", "postgresql://feedme@localhost/feedme"],
+        ["MySQL", "mysql://feedme@localhost/feedme"]
+    ])
+    def test_engine_options_recycle_server_connections(self, _, database_url):
+        # Given: a database server URL
+
+        # When: the engine options are made
+        options = engine_options(database_url, pool_size=5, max_overflow=10, pool_timeout=30, pool_recycle=3600)
+
+        # Then: pooled connections are checked and recycled
+        self.assertEqual(3600, options["pool_recycle"])
+        self.assertTrue(options["pool_pre_ping"])
+        self.assertEqual(10, options["max_overflow"])
+        self.assertNotIn("poolclass", options)
+
+    def test_apply_sqlite_pragmas_on_connect(self):
+        # Given: an engine applying the default pragmas to each connection
+        engine = create_engine("sqlite:///{}".format(os.path.join(self.temp_dir.name, "feedme.db")),
+                               **engine_options("sqlite://", pool_size=1, max_overflow=0, pool_timeout=1,
+                                                pool_recycle=3600))
+        event.listen(engine, "connect",
+                     lambda connection, _: apply_sqlite_pragmas(connection, DEFAULT_SQLITE_PRAGMAS))
+
+        # When: a connection is made
+        with engine.connect() as connection:
+            pragmas = {name: connection.exec_driver_sql("PRAGMA {}".format(name)).scalar()
+                       for name in ["journal_mode", "busy_timeout", "synchronous", "cache_size"]}
+
+        # Then: the pragmas are set
+        self.assertEqual({"journal_mode": "wal", "busy_timeout": 5000, "synchronous": 1, "cache_size": -16384},
+                         pragmas)
+        engine.dispose()
+
+    def test_apply_sqlite_pragmas_ignores_other_connections(self):
+        # Given: a connection to another database
+        connection = MagicMock()
+
+        # When: the pragmas are applied
+        apply_sqlite_pragmas(connection, DEFAULT_SQLITE_PRAGMAS)
+
+        # Then: nothing is executed
+        connection.cursor.assert_not_called()
+
+    def test_app_tunes_only_its_own_engine(self):
+        # Given: the app's engine, and another engine in the same process
+        other_engine = create_engine("sqlite:///{}".format(os.path.join(self.temp_dir.name, "other.db")))
+        with app.app_context():
+            app_engine = db.engine
+
+        # When: each opens a connection
+        with app_engine.connect() as connection:
+            app_cache_size = connection.exec_driver_sql("PRAGMA cache_size").scalar()
+        with other_engine.connect() as connection:
+            other_cache_size = connection.exec_driver_sql("PRAGMA cache_size").scalar()
+
+        # Then: only the app's connection is tuned
+        self.assertEqual(DEFAULT_SQLITE_PRAGMAS["cache_size"], app_cache_size)
+        self.assertNotEqual(DEFAULT_SQLITE_PRAGMAS["cache_size"], other_cache_size)
+        other_engine.dispose()
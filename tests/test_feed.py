@@ -1,6 +1,9 @@
 #!/usr/bin/python3
 
+import threading
+import time
 import unittest
+from functools import partial
 from unittest.mock import patch
 
 from parameterized import parameterized
@@ -21,7 +24,7 @@ class TestFeed(unittest.TestCase):
         }
 
         # When: the feed content is fetched for url
-        feed_content = feed.fetch_content_for_feed_url(rss_feed_url)
+        feed_content = feed.fetch_content_for_feed_url(rss_feed_url, "feedparser")
 
         # Then: the feed content is returned successfully
         self.assertIn("<h2>FierceWireless</h2>"
@@ -44,7 +47,7 @@ class TestFeed(unittest.TestCase):
                          "published": "123"}]
         }
         # When: the feed content is fetched for url
-        feed_content = feed.fetch_content_for_feed_url(rss_feed_url)
+        feed_content = feed.fetch_content_for_feed_url(rss_feed_url, "feedparser")
 
         # Then: the feed content is returned successfully
         self.assertIn("<h2>FierceWireless</h2>"
@@ -71,3 +74,100 @@ class TestFeed(unittest.TestCase):
 
         # Then: no RSS feed content is returned
         self.assertIn("No RSS feed content to display", feed_content)
+
+    @patch("feedparser.parse")
+    def test_fetch_many_returns_content_for_every_url(self, mock_response):
+        # Given: several valid RSS feed URLs
+        rss_feed_urls = ["https://www.fiercewireless.com/rss/xml", "https://martinfowler.com/feed.atom"]
+        mock_response.return_value = {
+            "feed": {"title": "FierceWireless", "link": "some link", "description": "blah"},
+            "entries": [{"title": "Some Entry Title", "link": "some link"}]
+        }
+
+        # When: the feed content is fetched for all urls
+        fetch = partial(feed.fetch_content_for_feed_url, parser_backend="feedparser")
+        results = list(feed.fetch_many(rss_feed_urls, fetch=fetch))
+
+        # Then: the feed content is returned for every url
+        self.assertEqual(set(rss_feed_urls), {result.url for result in results})
+        for result in results:
+            self.assertTrue(result.succeeded)
+            self.assertIn("<h2>FierceWireless</h2>", result.content)
+
+    def test_fetch_many_reports_errors_per_url(self):
+        # Given: an RSS feed URL which fails to fetch
+        def fetch(url):
+            if "broken" in url:
+                raise RuntimeError("Connection refused")
+            return "content for " + url
+
+        # When: the feed content is fetched for all urls
+        results = {result.url: result for result in
+                   feed.fetch_many(["https://www.broken.com/rss", "https://www.working.com/rss"], fetch=fetch)}
+
+        # Then: only the failing url reports an error
+        self.assertFalse(results["https://www.broken.com/rss"].succeeded)
+        self.assertEqual("content for https://www.working.com/rss", results["https://www.working.com/rss"].content)
+
+    def test_fetch_many_limits_concurrency_per_host(self):
+        # Given: many RSS feed URLs on a single host
+        lock = threading.Lock()
+        in_flight = {"current": 0, "peak": 0}
+
+        def fetch(url):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            time.sleep(0.02)
+            with lock:
+                in_flight["current"] -= 1
+            return url
+
+        rss_feed_urls = ["https://www.fiercewireless.com/rss/{}".format(index) for index in range(8)]
+
+        # When: the feed content is fetched with a per host limit
+        results = list(feed.fetch_many(rss_feed_urls, fetch=fetch, max_concurrency=8, max_per_host=2))
+
+        # Then: no more than the per host limit is fetched at once
+        self.assertEqual(8, len(results))
+        self.assertEqual(2, in_flight["peak"])
+
+    def test_fetch_many_times_out_slow_fetches(self):
+        # Given: an RSS feed URL which never responds in time
+        release = threading.Event()
+
+        def fetch(url):
+            if "slow" in url:
+                release.wait(5)
+            return url
+
+        # When: the feed content is fetched with a timeout
+        results = {result.url: result for result in
+                   feed.fetch_many(["https://www.slow.com/rss", "https://www.fast.com/rss"], fetch=fetch,
+                                   timeout=0.1)}
+        release.set()
+
+        # Then: the slow url is reported as timed out
+        self.assertIsInstance(results["https://www.slow.com/rss"].error, feed.RssFeedError)
+        self.assertTrue(results["https://www.fast.com/rss"].succeeded)
+
+    def test_fetch_many_times_out_fetches_queued_behind_hung_fetches(self):
+        # Given: more RSS feed URLs which never respond than there are workers
+        release = threading.Event()
+        started = []
+
+        def fetch(url):
+            started.append(url)
+            release.wait(5)
+            return url
+
+        rss_feed_urls = ["https://www.hung{}.com/rss".format(index) for index in range(4)]
+
+        # When: the feed content is fetched with a timeout
+        results = list(feed.fetch_many(rss_feed_urls, fetch=fetch, max_concurrency=2, timeout=0.1))
+        release.set()
+
+        # Then: every url is reported as timed out, without waiting for the hung fetches to free their workers
+        self.assertEqual(4, len(results))
+        self.assertTrue(all(isinstance(result.error, feed.RssFeedError) for result in results))
+        self.assertEqual(2, len(started))
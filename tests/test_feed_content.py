@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+
+import gzip
+import pickle
+import unittest
+from unittest.mock import patch
+
+from feed.feed_content import FeedContent
+
+CONTENT = "<h2>Feed</h2>" + "<p>Some long summary of an item</p>" * 1000
+
+
+class TestFeedContent(unittest.TestCase):
+
+    @patch("feed.feed_content.brotli", None)
+    def test_content_compressed_once(self):
+        # Given: rendered feed content, without brotli available
+
+        # When: the content is prepared for caching
+        feed_content = FeedContent(CONTENT)
+
+        # Then: only the gzip encoding is made
+        self.assertEqual(["gzip"], list(feed_content.encodings))
+        self.assertEqual(CONTENT, gzip.decompress(feed_content.encodings["gzip"]).decode("utf-8"))
+
+    @patch("feed.feed_content.brotli")
+    def test_content_compressed_with_brotli_when_available(self, mock_brotli):
+        # Given: rendered feed content, with brotli available
+        mock_brotli.compress.return_value = b"brotli content"
+
+        # When: the content is prepared for caching
+        feed_content = FeedContent(CONTENT)
+
+        # Then: the brotli encoding is made too
+        self.assertEqual(b"brotli content", feed_content.encodings["br"])
+        mock_brotli.compress.assert_called_once_with(CONTENT.encode("utf-8"), quality=9)
+
+    def test_cached_content_holds_only_encodings(self):
+        # Given: rendered feed content
+        feed_content = FeedContent(CONTENT, refreshed_at=100, max_age=60)
+
+        # When: the content is cached, and read back
+        value = pickle.dumps(feed_content, pickle.HIGHEST_PROTOCOL)
+        cached_content = pickle.loads(value)
+
+        # Then: the cached value is sized by its encodings, and the content is decompressed on use
+        self.assertLess(len(value), len(CONTENT) // 10)
+        self.assertEqual(CONTENT, cached_content.content)
+        self.assertEqual(feed_content.etag, cached_content.etag)
+        self.assertEqual((100, 60), (cached_content.refreshed_at, cached_content.max_age))
+
+    def test_content_cached_before_compression_is_read(self):
+        # Given: content cached before it was compressed
+        cached_content = FeedContent.__new__(FeedContent)
+        cached_content.__setstate__({"content": "Old content", "refreshed_at": 100})
+
+        # When: the content is read
+
+        # Then: the content is served uncompressed
+        self.assertEqual("Old content", cached_content.content)
+        self.assertEqual({}, cached_content.encodings)
+        self.assertIsNone(cached_content.etag)
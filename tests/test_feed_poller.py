@@ -0,0 +1,69 @@
+#!/usr/bin/python3
+
+import threading
+import unittest
+from unittest.mock import Mock
+
+from feed.feed_poller import FeedPoller
+
+
+class TestFeedPoller(unittest.TestCase):
+
+    def test_poll_refreshes_every_url(self):
+        # Given: a poller with two configured RSS feed URLs
+        refresh = Mock()
+        urls = ["https://www.fiercewireless.com/rss/xml", "https://martinfowler.com/feed.atom"]
+        obj_under_test = FeedPoller(lambda: urls, refresh, 300)
+
+        # When: the feeds are polled
+        refreshed = obj_under_test.poll()
+
+        # Then: every RSS feed URL is refreshed
+        self.assertEqual(2, refreshed)
+        refresh.assert_any_call("https://www.fiercewireless.com/rss/xml")
+        refresh.assert_any_call("https://martinfowler.com/feed.atom")
+
+    def test_poll_continues_after_refresh_error(self):
+        # Given: a poller where the first RSS feed URL fails to refresh
+        def refresh(url):
+            if url == "https://www.notarealfeed.com":
+                raise RuntimeError("Connection refused")
+
+        refresh = Mock(side_effect=refresh)
+        urls = ["https://www.notarealfeed.com", "https://martinfowler.com/feed.atom"]
+        obj_under_test = FeedPoller(lambda: urls, refresh, 300)
+
+        # When: the feeds are polled
+        refreshed = obj_under_test.poll()
+
+        # Then: the remaining RSS feed URL is still refreshed
+        self.assertEqual(1, refreshed)
+        refresh.assert_any_call("https://martinfowler.com/feed.atom")
+
+    def test_poll_with_url_source_error(self):
+        # Given: a poller whose RSS feed URLs cannot be loaded
+        refresh = Mock()
+        obj_under_test = FeedPoller(Mock(side_effect=RuntimeError("DB unavailable")), refresh, 300)
+
+        # When: the feeds are polled
+        refreshed = obj_under_test.poll()
+
+        # Then: nothing is refreshed
+        self.assertEqual(0, refreshed)
+        refresh.assert_not_called()
+
+    def test_stop_poller(self):
+        # Given: a running poller which has completed its first poll
+        polled = threading.Event()
+        refresh = Mock(side_effect=lambda url: polled.set())
+        obj_under_test = FeedPoller(lambda: ["https://www.fiercewireless.com/rss/xml"], refresh, 300)
+        obj_under_test.start()
+        self.assertTrue(polled.wait(timeout=5))
+
+        # When: the poller is stopped
+        obj_under_test.stop()
+        obj_under_test.join(timeout=5)
+
+        # Then: the poller thread exits without waiting for the next poll
+        self.assertFalse(obj_under_test.is_alive())
+        refresh.assert_called_once_with("https://www.fiercewireless.com/rss/xml")
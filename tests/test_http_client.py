@@ -0,0 +1,131 @@
+#!/usr/bin/python3
+
+import time
+import unittest
+
+from parameterized import parameterized
+
+from tests.feed_server import DOCUMENT, start_feed_server, stop_feed_server
+from utils.http_client import HttpClient, HttpFetchError
+
+
+class TestHttpClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = start_feed_server()
+        self.base_url = "http://127.0.0.1:{}".format(self.server.server_port)
+        self.obj_under_test = HttpClient(connect_timeout=1, read_timeout=0.5, max_bytes=2048)
+
+    def tearDown(self):
+        self.obj_under_test.close()
+        stop_feed_server(self.server)
+
+    @parameterized.expand([
+        ["identity", "/feed"],
+        ["gzip", "/gzip"],
+        ["deflate", "/deflate"],
+        ["raw deflate", "/raw-deflate"]
+    ])
+    def test_get_decompresses_response(self, _, path):
+        # Given: a feed served with a content encoding
+
+        # When: the feed is fetched
+        response = self.obj_under_test.get(self.base_url + path)
+
+        # Then: the decompressed feed is returned, having asked for compression
+        self.assertEqual(200, response.status)
+        self.assertEqual(DOCUMENT, response.content)
+        self.assertEqual("gzip, deflate", self.server.requests[0]["Accept-Encoding"])
+
+    def test_get_reuses_connections(self):
+        # Given: a feed fetched once
+        self.obj_under_test.get(self.base_url + "/feed")
+
+        # When: the feed is fetched again
+        self.obj_under_test.get(self.base_url + "/feed")
+
+        # Then: both fetches share a single connection
+        self.assertEqual(2, len(self.server.requests))
+        self.assertEqual(1, self.server.connections)
+
+    def test_get_retries_connection_closed_by_server(self):
+        # Given: a pooled connection which the server has since closed
+        self.obj_under_test.get(self.base_url + "/closed-when-idle")
+
+        # When: the feed is fetched again
+        response = self.obj_under_test.get(self.base_url + "/feed")
+
+        # Then: the feed is fetched over a new connection
+        self.assertEqual(DOCUMENT, response.content)
+        self.assertEqual(2, self.server.connections)
+
+    @parameterized.expand([
+        ["content length", "/large"],
+        ["chunked", "/chunked"],
+        ["decompressed", "/gzip-bomb"]
+    ])
+    def test_get_rejects_responses_over_max_bytes(self, _, path):
+        # Given: a response larger than the maximum size
+
+        # When: the response is fetched
+        with self.assertRaises(HttpFetchError) as error:
+            self.obj_under_test.get(self.base_url + path)
+
+        # Then: the response is rejected
+        self.assertIn("exceeds 2048 bytes", error.exception.message)
+
+    def test_get_times_out_slow_response(self):
+        # Given: a response slower than the read timeout
+
+        # When: the response is fetched
+        started = time.perf_counter()
+        with self.assertRaises(HttpFetchError):
+            self.obj_under_test.get(self.base_url + "/slow")
+
+        # Then: the fetch is abandoned after the read timeout
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_get_follows_redirects(self):
+        # Given: a feed which has moved
+
+        # When: the old URL is fetched
+        response = self.obj_under_test.get(self.base_url + "/redirect")
+
+        # Then: the feed is fetched from its new URL
+        self.assertEqual(DOCUMENT, response.content)
+        self.assertEqual(self.base_url + "/feed", response.url)
+
+    def test_get_sends_conditional_headers(self):
+        # Given: the validators from a previous fetch
+        etag = self.obj_under_test.get(self.base_url + "/conditional").headers["ETag"]
+
+        # When: the feed is fetched with them
+        response = self.obj_under_test.get(self.base_url + "/conditional", {"If-None-Match": etag})
+
+        # Then: the feed is reported as not modified
+        self.assertEqual(304, response.status)
+        self.assertEqual(b"", response.content)
+
+    @parameterized.expand([
+        ["server error", "/error", 500],
+        ["not found", "/missing", 404]
+    ])
+    def test_get_reports_error_status(self, _, path, status):
+        # Given: a URL returning an error status
+
+        # When: the URL is fetched
+        with self.assertRaises(HttpFetchError) as error:
+            self.obj_under_test.get(self.base_url + path)
+
+        # Then: the status is reported
+        self.assertEqual(status, error.exception.status)
+
+    def test_get_rejects_unsupported_url(self):
+        # Given: a URL which is not http or https
+
+        # When: the URL is fetched
+        with self.assertRaises(HttpFetchError) as error:
+            self.obj_under_test.get("file:///etc/passwd")
+
+        # Then: the URL is rejected
+        self.assertIn("Unsupported URL", error.exception.message)
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+
+import unittest
+
+from utils.metrics import Registry, Counter, Gauge, Histogram
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_counter_renders_a_series_per_label_set(self):
+        # Given: a counter incremented for two label sets
+        counter = Counter("requests_total", "Requests.", ["result"], registry=self.registry)
+        counter.inc(result="hit")
+        counter.inc(2, result="hit")
+        counter.inc(result="miss")
+
+        # When: the registry is rendered
+        text = self.registry.render()
+
+        # Then: each label set has its own total
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn("requests_total{result=\"hit\"} 3", text)
+        self.assertIn("requests_total{result=\"miss\"} 1", text)
+
+    def test_gauge_renders_the_last_value(self):
+        # Given: a gauge set twice
+        gauge = Gauge("payload_bytes", "Payload size.", ["feed"], registry=self.registry)
+        gauge.set(10, feed="a")
+        gauge.set(20, feed="a")
+
+        # When: the registry is rendered
+        text = self.registry.render()
+
+        # Then: only the last value is rendered
+        self.assertIn("payload_bytes{feed=\"a\"} 20", text)
+
+    def test_histogram_renders_cumulative_buckets(self):
+        # Given: a histogram with observations in different buckets
+        histogram = Histogram("stage_seconds", "Stage time.", ["stage"], buckets=(0.1, 1.0), registry=self.registry)
+        histogram.observe(0.05, stage="fetch")
+        histogram.observe(0.5, stage="fetch")
+        histogram.observe(5.0, stage="fetch")
+
+        # When: the registry is rendered
+        text = self.registry.render()
+
+        # Then: bucket counts are cumulative with a sum and count
+        self.assertIn("stage_seconds_bucket{stage=\"fetch\",le=\"0.1\"} 1", text)
+        self.assertIn("stage_seconds_bucket{stage=\"fetch\",le=\"1.0\"} 2", text)
+        self.assertIn("stage_seconds_bucket{stage=\"fetch\",le=\"+Inf\"} 3", text)
+        self.assertIn("stage_seconds_sum{stage=\"fetch\"} 5.55", text)
+        self.assertIn("stage_seconds_count{stage=\"fetch\"} 3", text)
+
+    def test_histogram_times_block(self):
+        # Given: a histogram
+        histogram = Histogram("stage_seconds", "Stage time.", ["stage"], registry=self.registry)
+
+        # When: a block is timed
+        with histogram.time(stage="render"):
+            pass
+
+        # Then: a single observation is recorded
+        self.assertIn("stage_seconds_count{stage=\"render\"} 1", self.registry.render())
+
+    def test_series_beyond_the_maximum_are_folded_together(self):
+        # Given: a counter limited to two series
+        counter = Counter("feeds_total", "Feeds.", ["feed"], registry=self.registry, max_series=2)
+
+        # When: more label sets than the maximum are counted
+        for feed in ["a", "b", "c", "d"]:
+            counter.inc(feed=feed)
+
+        # Then: the extra label sets share an overflow series
+        text = self.registry.render()
+        self.assertIn("feeds_total{feed=\"a\"} 1", text)
+        self.assertIn("feeds_total{feed=\"other\"} 2", text)
+        self.assertNotIn("feed=\"c\"", text)
+
+    def test_only_unbounded_labels_are_folded_together(self):
+        # Given: a counter limited to one series, labelled by result as well as feed
+        counter = Counter("feeds_total", "Feeds.", ["result", "feed"], registry=self.registry, max_series=1)
+
+        # When: more label sets than the maximum are counted
+        counter.inc(result="hit", feed="a")
+        counter.inc(result="hit", feed="b")
+        counter.inc(result="miss", feed="c")
+
+        # Then: the extra label sets share an overflow feed, keeping their result
+        text = self.registry.render()
+        self.assertIn("feeds_total{result=\"hit\",feed=\"other\"} 1", text)
+        self.assertIn("feeds_total{result=\"miss\",feed=\"other\"} 1", text)
+
+    def test_label_values_are_escaped(self):
+        # Given: a label value containing quotes, backslashes and newlines
+        counter = Counter("feeds_total", "Feeds.", ["feed"], registry=self.registry)
+
+        # When: it is counted
+        counter.inc(feed="a\"b\\c\nd")
+
+        # Then: the label value is escaped
+        self.assertIn("feeds_total{feed=\"a\\\"b\\\\c\\nd\"} 1", self.registry.render())
+
+
+if __name__ == '__main__':
+    unittest.main()
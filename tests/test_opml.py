@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+
+import unittest
+
+from parameterized import parameterized
+
+from parser.opml import parse_opml, iter_opml, OpmlError
+
+OPML_DOCUMENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<opml version="2.0">
+<head><title>Subscriptions</title></head>
+<body>
+<outline text="News">
+    <outline type="rss" text="First" xmlUrl="https://www.first.com/rss"/>
+    <outline type="rss" text="Second" xmlUrl=" https://www.second.com/rss "/>
+</outline>
+<outline type="rss" text="First again" xmlUrl="https://www.first.com/rss"/>
+<outline type="link" text="Not a feed" url="https://www.link.com"/>
+</body>
+</opml>"""
+
+
+class TestOpml(unittest.TestCase):
+
+    def test_parse_opml_reads_nested_feed_urls(self):
+        # Given: an OPML document with feeds nested in a category, listing one feed twice
+
+        # When: the document is parsed
+        urls = parse_opml(OPML_DOCUMENT)
+
+        # Then: each feed URL is read once, in document order
+        self.assertEqual(["https://www.first.com/rss", "https://www.second.com/rss"], urls)
+
+    @parameterized.expand([
+        ["Empty document", b""],
+        ["Malformed document", b"<opml><body><outline></body>"],
+        ["Not OPML", b"<rss version=\"2.0\"><channel></channel></rss>"]
+    ])
+    def test_parse_opml_rejects_invalid_document(self, _, document):
+        # Given: a document which is not well-formed OPML
+
+        # When: the document is parsed
+        with self.assertRaises(OpmlError):
+            parse_opml(document)
+
+        # Then: an OpmlError is raised
+
+    def test_iter_opml_round_trips_feeds(self):
+        # Given: feeds with and without titles, needing escaping
+        feeds = [("https://www.first.com/rss?a=1&b=2", "First & \"Best\""), ("https://www.second.com/rss", None)]
+
+        # When: the OPML document is written
+        document = "".join(iter_opml("FeedMe <feeds>", feeds))
+
+        # Then: the document is well-formed and lists every feed
+        self.assertIn("<title>FeedMe &lt;feeds&gt;</title>", document)
+        self.assertIn("text=\"https://www.second.com/rss\"", document)
+        self.assertEqual([url for url, _ in feeds], parse_opml(document.encode("utf-8")))
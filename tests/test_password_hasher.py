@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+import threading
+import unittest
+from unittest.mock import patch
+
+from parameterized import parameterized
+
+from user.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+class TestPasswordHasher(unittest.TestCase):
+
+    def test_verify_hashed_password(self):
+        # Given: a hashed password
+        obj_under_test = PasswordHasher(rounds=4)
+        password_hash = obj_under_test.hash("secret")
+
+        # When: passwords are verified against it
+
+        # Then: only the hashed password matches
+        self.assertTrue(obj_under_test.verify(password_hash, "secret"))
+        self.assertFalse(obj_under_test.verify(password_hash, "wrong"))
+
+    def test_hash_uses_work_factor(self):
+        # Given: a hasher with a work factor
+        obj_under_test = PasswordHasher(rounds=5)
+
+        # When: a password is hashed
+        password_hash = obj_under_test.hash("secret")
+
+        # Then: the hash records the work factor
+        self.assertEqual("05", password_hash.decode("utf-8").split("$")[2])
+
+    @parameterized.expand([
+        ["Same work factor", b"$2b$04$abcdefghijklmnopqrstuu", False],
+        ["Lower work factor", "$2b$04$abcdefghijklmnopqrstuu", False],
+        ["Different work factor", b"$2b$12$abcdefghijklmnopqrstuu", True],
+        ["Not a bcrypt hash", "plain", True]
+    ])
+    def test_needs_rehash(self, _, password_hash, expected):
+        # Given: a hasher with a work factor
+        obj_under_test = PasswordHasher(rounds=4)
+
+        # When: a stored hash is checked
+
+        # Then: hashes made with another work factor need rehashing
+        self.assertEqual(expected, obj_under_test.needs_rehash(password_hash))
+
+    def test_hash_refused_when_too_many_pending(self):
+        # Given: a hasher already hashing as many passwords as allowed
+        obj_under_test = PasswordHasher(rounds=4, workers=1, max_pending=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_hash(password, rounds):
+            started.set()
+            release.wait(5)
+            return b"hash"
+
+        with patch("user.password_hasher.generate_password_hash", side_effect=slow_hash):
+            thread = threading.Thread(target=obj_under_test.hash, args=("first",))
+            thread.start()
+            started.wait(5)
+
+            # When: another password is hashed
+            with self.assertRaises(PasswordHasherBusy):
+                obj_under_test.hash("second")
+
+            release.set()
+            thread.join(5)
+
+        # Then: hashing is allowed again once the pending work is done
+        self.assertTrue(obj_under_test.verify(obj_under_test.hash("third"), "third"))
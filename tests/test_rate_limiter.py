@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+
+import unittest
+from unittest.mock import patch
+
+from utils.rate_limiter import RateLimiter
+
+
+@patch("utils.rate_limiter.time.monotonic", return_value=100)
+class TestRateLimiter(unittest.TestCase):
+
+    def test_allow_up_to_burst(self, _):
+        # Given: a limiter allowing a burst of 3 attempts
+        obj_under_test = RateLimiter(rate=1, burst=3)
+
+        # When: a client makes 4 attempts at once
+        allowed = [obj_under_test.allow("client") for _ in range(4)]
+
+        # Then: the attempts beyond the burst are refused
+        self.assertEqual([True, True, True, False], allowed)
+
+    def test_allow_refills_over_time(self, mock_monotonic):
+        # Given: a client which has used its burst
+        obj_under_test = RateLimiter(rate=0.5, burst=1)
+        obj_under_test.allow("client")
+
+        # When: enough time passes to regain an attempt
+        mock_monotonic.return_value = 102
+
+        # Then: one more attempt is allowed
+        self.assertTrue(obj_under_test.allow("client"))
+        self.assertFalse(obj_under_test.allow("client"))
+
+    def test_allow_limits_clients_separately(self, _):
+        # Given: a client which has used its burst
+        obj_under_test = RateLimiter(rate=1, burst=1)
+        obj_under_test.allow("client")
+
+        # When: another client makes an attempt
+
+        # Then: the other client is allowed
+        self.assertTrue(obj_under_test.allow("other client"))
+        self.assertFalse(obj_under_test.allow("client"))
+
+    def test_allow_tracks_bounded_number_of_clients(self, _):
+        # Given: a limiter tracking 2 clients
+        obj_under_test = RateLimiter(rate=1, burst=1, max_clients=2)
+
+        # When: 3 clients make attempts
+        for client in ["first", "second", "third"]:
+            obj_under_test.allow(client)
+
+        # Then: the least recently seen client is forgotten
+        self.assertTrue(obj_under_test.allow("first"))
+        self.assertFalse(obj_under_test.allow("third"))
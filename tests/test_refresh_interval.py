@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+
+import unittest
+
+from parameterized import parameterized
+
+from feed.refresh_interval import observed_interval, refresh_interval
+
+DEFAULT_INTERVAL = 360
+MIN_INTERVAL = 120
+MAX_INTERVAL = 86400
+
+
+class TestRefreshInterval(unittest.TestCase):
+
+    @parameterized.expand([
+        ["odd gaps", [0, 60, 180, 3780], 120],
+        ["even gaps", [0, 60, 180], 90],
+        ["unordered with duplicates", [180, 0, 60, 60], 90],
+        ["missing times", [None, 0, None, 600], 600],
+        ["single item", [0], None],
+        ["no items", [], None]
+    ])
+    def test_observed_interval(self, _, published_times, expected):
+        # Given: the publish times of a feed's newest items
+
+        # When: the observed interval is worked out
+        interval = observed_interval(published_times)
+
+        # Then: the median gap between items is returned
+        self.assertEqual(expected, interval)
+
+    @parameterized.expand([
+        ["unknown cadence", None, None, DEFAULT_INTERVAL],
+        ["half the observed gap", None, 3600, 1800],
+        ["ttl longer than the observed gap", 7200, 3600, 7200],
+        ["ttl shorter than the observed gap", 600, 3600, 1800],
+        ["ttl with unknown cadence", 3600, None, 3600],
+        ["busy feed bounded by minimum", None, 30, MIN_INTERVAL],
+        ["quiet feed bounded by maximum", None, 30 * 86400, MAX_INTERVAL],
+        ["long ttl bounded by maximum", 7 * 86400, None, MAX_INTERVAL]
+    ])
+    def test_refresh_interval(self, _, ttl, observed, expected):
+        # Given: a feed's ttl and observed cadence
+
+        # When: the refresh interval is worked out
+        interval = refresh_interval(ttl, observed, DEFAULT_INTERVAL, MIN_INTERVAL, MAX_INTERVAL)
+
+        # Then: the bounded interval is returned
+        self.assertEqual(expected, interval)
@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+
+import unittest
+
+from parser.rss_channel import RssChannel, RssItem
+
+
+class TestRssChannel(unittest.TestCase):
+
+    def test_iter_feed_content_yields_each_item(self):
+        # Given: an RSS channel with two items
+        obj_under_test = RssChannel("FierceWireless", "some link", "blah", [
+            {"title": "Some Entry Title", "link": "some link", "author": "Joe Bloggs", "summary": "blah",
+             "published": "123"},
+            {"title": "Another Entry Title", "link": "some link", "author": "Joe Smith", "summary": "blah",
+             "published": "123"}])
+
+        # When: the feed content is formatted incrementally
+        fragments = list(obj_under_test.iter_feed_content())
+
+        # Then: the channel details and each item are yielded separately
+        self.assertEqual(3, len(fragments))
+        self.assertEqual("<h2>FierceWireless</h2><p>blah</p>", fragments[0])
+        self.assertIn("Some Entry Title", fragments[1])
+        self.assertIn("Another Entry Title", fragments[2])
+
+        # And: the fragments join to the formatted feed content
+        self.assertEqual(obj_under_test.format_feed_content(), "".join(fragments))
+
+    def test_iter_feed_content_with_no_items(self):
+        # Given: an RSS channel with no items
+        obj_under_test = RssChannel("FierceWireless", "some link", "blah", [])
+
+        # When: the feed content is formatted
+        feed_content = obj_under_test.format_feed_content()
+
+        # Then: the feed is reported as empty
+        self.assertEqual("<h2>FierceWireless</h2><p>blah</p>RSS feed is empty", feed_content)
+
+    def test_from_rss_items_renders_lazily(self):
+        # Given: an RSS channel created from a generator of items
+        rendered = []
+
+        def rss_items():
+            for index in range(3):
+                rendered.append(index)
+                yield RssItem("Entry {}".format(index), "some link", "blah", "123", "Joe Bloggs")
+
+        obj_under_test = RssChannel.from_rss_items("FierceWireless", "some link", "blah", rss_items())
+
+        # When: only the first item is rendered
+        fragments = obj_under_test.iter_feed_content()
+        next(fragments)
+        first_item = next(fragments)
+
+        # Then: later items have not been created yet
+        self.assertIn("Entry 0", first_item)
+        self.assertEqual([0], rendered)
+
+    def test_rss_item_is_compact(self):
+        # Given: an RSS item
+        obj_under_test = RssItem("Some Entry Title", "some link", "blah", "123", "Joe Bloggs")
+
+        # Then: the item has no per instance dict
+        self.assertFalse(hasattr(obj_under_test, "__dict__"))
+        self.assertEqual("some link", obj_under_test.guid)
+
+    def test_publish_time_normalised_to_epoch(self):
+        # Given: items with parsed and unparsed publish times
+        obj_under_test = RssChannel("FierceWireless", "some link", "blah", [
+            {"title": "Parsed", "link": "some link", "published_parsed": [2019, 6, 13, 16, 24, 27, 3, 164, 0]},
+            {"title": "Unparsed", "link": "some link", "published": "Thu, 13 Jun 2019 16:24:27 +0000"},
+            {"title": "Invalid", "link": "some link", "published": "123"}])
+
+        # Then: the publish times are stored as epoch seconds
+        self.assertEqual([1560443067, 1560443067, None],
+                         [rss_item.published_at for rss_item in obj_under_test.rss_items])
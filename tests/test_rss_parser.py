@@ -1,26 +1,43 @@
 #!/usr/bin/python3
 
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 
 from parameterized import parameterized
 
-from parser.rss_channel import RssItemError
-from parser.rss_parser import RssUrlParser, RssParserError
+from parser.rss_channel import RssChannel, RssItemError
+from parser.rss_parser import RssUrlParser, RssParserError, clear_feed_validators
 from utils.file_reader import JsonFileReader
 from utils.files import get_full_path
+from utils.http_client import HttpResponse, HttpFetchError
 
 TESTDATA_FILENAME_1 = get_full_path("tests", "test_data", "rss_sample.json")
 TESTDATA_FILENAME_2 = get_full_path("tests", "test_data", "rss_sample_2.json")
+RSS_XML_TESTDATA_FILENAME = get_full_path("tests", "test_data", "rss_sample.xml")
+
+
+def _http_client(document, headers=None):
+    http_client = MagicMock()
+    http_client.get.return_value = HttpResponse("https://www.fiercewireless.com/rss/xml", 200, headers or {},
+                                                document)
+    return http_client
+
+
+def _read_document(filename):
+    with open(filename, "rb") as document_file:
+        return document_file.read()
 
 
 class TestRssParsing(unittest.TestCase):
 
+    def tearDown(self):
+        clear_feed_validators()
+
     @patch("feedparser.parse")
     def test_parse_rss_dataset_1(self, mock_response):
         # Given: an RSS feed URL to be parsed
         url = "https://www.fiercewireless.com/rss/xml"
-        obj_under_test = RssUrlParser(url)
+        obj_under_test = RssUrlParser(url, "feedparser")
 
         file_reader = JsonFileReader(TESTDATA_FILENAME_1)
         mock_response.return_value = file_reader.read()
@@ -39,7 +56,7 @@ class TestRssParsing(unittest.TestCase):
     def test_parse_rss_dataset_2(self, mock_response):
         # Given: an RSS feed URL to be parsed
         url = "https://martinfowler.com/feed.atom"
-        obj_under_test = RssUrlParser(url)
+        obj_under_test = RssUrlParser(url, "feedparser")
 
         file_reader = JsonFileReader(TESTDATA_FILENAME_2)
         mock_response.return_value = file_reader.read()
@@ -58,7 +75,7 @@ class TestRssParsing(unittest.TestCase):
     def test_parse_rss_with_no_entries(self, mock_response):
         # Given: an RSS feed URL to be parsed
         url = "https://www.fiercewireless.com/rss/xml"
-        obj_under_test = RssUrlParser(url)
+        obj_under_test = RssUrlParser(url, "feedparser")
         mock_response.return_value = {
             "feed": {"title": "FierceWireless", "link": "some link", "description": "blah"}, "entries": []
         }
@@ -78,7 +95,7 @@ class TestRssParsing(unittest.TestCase):
     ])
     def test_parse_for_invalid_url(self, _, value):
         # Given: an empty RSS feed URL to be parsed
-        obj_under_test = RssUrlParser(value)
+        obj_under_test = RssUrlParser(value, "feedparser")
 
         # When: the URL is parsed
         with self.assertRaises(RssParserError) as error:
@@ -94,7 +111,7 @@ class TestRssParsing(unittest.TestCase):
     def test_parse_for_invalid_response(self, _, value, mock_response):
         # Given: an RSS feed URL to be parsed
         url = "https://www.fiercewireless.com/rss/xml"
-        obj_under_test = RssUrlParser(url)
+        obj_under_test = RssUrlParser(url, "feedparser")
         mock_response.return_value = value
 
         # When: the URL is parsed
@@ -113,7 +130,7 @@ class TestRssParsing(unittest.TestCase):
     def test_parse_for_invalid_rss_channel(self, _, value, mock_response):
         # Given: an RSS feed URL to be parsed
         url = "https://www.fiercewireless.com/rss/xml"
-        obj_under_test = RssUrlParser(url)
+        obj_under_test = RssUrlParser(url, "feedparser")
         mock_response.return_value = value
 
         # When: the URL is parsed
@@ -140,10 +157,200 @@ class TestRssParsing(unittest.TestCase):
     def test_parse_for_invalid_rss_channel_entries(self, _, value, mock_response):
         # Given: an RSS feed URL to be parsed
         url = "https://www.fiercewireless.com/rss/xml"
-        obj_under_test = RssUrlParser(url)
+        obj_under_test = RssUrlParser(url, "feedparser")
         mock_response.return_value = value
 
         # When: the URL is parsed
         with self.assertRaises(RssItemError) as error:
             obj_under_test.parse()
         self.assertIn("Invalid RSS channel entry data", error.exception.message)
+
+    @patch("feedparser.parse")
+    def test_parse_sends_validators_from_previous_fetch(self, mock_response):
+        # Given: an RSS feed URL which was previously fetched with validators, and its channel kept
+        url = "https://www.fiercewireless.com/rss/xml"
+        mock_response.return_value = {
+            "feed": {"title": "FierceWireless", "link": "some link", "description": "blah"}, "entries": [],
+            "etag": "\"abc123\"", "modified": "Thu, 13 Jun 2019 19:18:14 GMT"
+        }
+        kept_channels = {url: RssUrlParser(url, "feedparser").parse_channel()}
+
+        # When: the URL is parsed again
+        RssUrlParser(url, "feedparser", load_unmodified=kept_channels.get).parse()
+
+        # Then: the validators are sent with the fetch
+        mock_response.assert_called_with(url, etag="\"abc123\"", modified="Thu, 13 Jun 2019 19:18:14 GMT")
+
+    @patch("feedparser.parse")
+    def test_parse_reuses_kept_channel_when_not_modified(self, mock_response):
+        # Given: an RSS feed URL which was previously fetched with validators, and its channel kept
+        url = "https://www.fiercewireless.com/rss/xml"
+        mock_response.return_value = {
+            "feed": {"title": "FierceWireless", "link": "some link", "description": "blah", "ttl": "60"},
+            "entries": [{"title": "Some Entry Title", "link": "some link"}],
+            "etag": "\"abc123\""
+        }
+        first_channel = RssUrlParser(url, "feedparser").parse_channel()
+        first_content = first_channel.format_feed_content()
+        load_unmodified = MagicMock(return_value=RssChannel(first_channel.title, first_channel.url,
+                                                            first_channel.description, []))
+
+        # When: the URL is parsed again and the feed has not been modified
+        mock_response.return_value = {"feed": {}, "entries": [], "status": 304, "etag": "\"abc123\""}
+        rss_channel = RssUrlParser(url, "feedparser", load_unmodified=load_unmodified).parse_channel()
+
+        # Then: the kept channel is returned, with the ttl of the previous fetch
+        load_unmodified.assert_called_once_with(url)
+        self.assertIs(load_unmodified.return_value, rss_channel)
+        self.assertEqual(60 * 60, rss_channel.ttl)
+        self.assertIn("Some Entry Title", first_content)
+
+    @patch("feedparser.parse")
+    def test_parse_refetches_in_full_when_not_modified_channel_not_kept(self, mock_response):
+        # Given: an RSS feed URL which was previously fetched with validators, but whose channel was not kept
+        url = "https://www.fiercewireless.com/rss/xml"
+        full_response = {
+            "feed": {"title": "FierceWireless", "link": "some link", "description": "blah"},
+            "entries": [{"title": "Some Entry Title", "link": "some link"}],
+            "etag": "\"abc123\""
+        }
+        mock_response.return_value = full_response
+        RssUrlParser(url, "feedparser").parse()
+
+        # When: the URL is parsed again and the feed has not been modified
+        mock_response.side_effect = [{"feed": {}, "entries": [], "status": 304, "etag": "\"abc123\""}, full_response]
+        feed_content = RssUrlParser(url, "feedparser", load_unmodified=lambda url: None).parse()
+
+        # Then: the feed is fetched again without validators
+        mock_response.assert_called_with(url)
+        self.assertIn("Some Entry Title", feed_content)
+
+    @patch("feedparser.parse")
+    def test_parse_without_kept_channels_fetches_unconditionally(self, mock_response):
+        # Given: an RSS feed URL which was previously fetched with validators
+        url = "https://www.fiercewireless.com/rss/xml"
+        mock_response.return_value = {
+            "feed": {"title": "FierceWireless", "link": "some link", "description": "blah"}, "entries": [],
+            "etag": "\"abc123\""
+        }
+        RssUrlParser(url, "feedparser").parse()
+
+        # When: the URL is parsed again, with no kept channel to reuse
+        RssUrlParser(url, "feedparser").parse()
+
+        # Then: the feed is fetched without validators
+        mock_response.assert_called_with(url)
+
+    @patch("feedparser.parse")
+    def test_parse_without_validators_fetches_unconditionally(self, mock_response):
+        # Given: an RSS feed URL which returns no validators
+        url = "https://www.fiercewireless.com/rss/xml"
+        mock_response.return_value = {
+            "feed": {"title": "FierceWireless", "link": "some link", "description": "blah"}, "entries": []
+        }
+        RssUrlParser(url, "feedparser").parse()
+
+        # When: the URL is parsed again
+        RssUrlParser(url, "feedparser").parse()
+
+        # Then: the feed is fetched without validators
+        mock_response.assert_called_with(url)
+
+    @patch("feedparser.parse")
+    def test_parse_with_xml_backend(self, mock_feedparser):
+        # Given: an RSS feed URL serving a well-formed RSS 2.0 document
+        url = "https://www.fiercewireless.com/rss/xml"
+        http_client = _http_client(_read_document(RSS_XML_TESTDATA_FILENAME))
+
+        # When: the URL is parsed with the xml parser backend
+        feed_content = RssUrlParser(url, "xml", http_client).parse()
+
+        # Then: the fetched feed is parsed without feedparser
+        self.assertIn("FierceWireless", feed_content)
+        self.assertIn("Stefan Pongratz", feed_content)
+        http_client.get.assert_called_once_with(url, {})
+        mock_feedparser.assert_not_called()
+
+    @parameterized.expand([
+        ["http", b"<rss version=\"2.0\"><channel><title>FierceWireless</title></channel></rss>"],
+        ["xml", b"<rss version=\"2.0\"><channel><title>Caf&eacute;</title></channel></rss>"]
+    ])
+    @patch("feedparser.parse")
+    def test_parse_fetched_document_with_feedparser(self, backend, document, mock_feedparser):
+        # Given: an RSS feed URL serving a document to be parsed by feedparser
+        url = "https://www.fiercewireless.com/rss/xml"
+        http_client = _http_client(document, {"Content-Type": "application/rss+xml"})
+        mock_feedparser.return_value = {
+            "feed": {"title": "Caf\u00e9", "link": "some link", "description": "blah"}, "entries": []
+        }
+
+        # When: the URL is parsed with the backend
+        feed_content = RssUrlParser(url, backend, http_client).parse()
+
+        # Then: the fetched document is parsed by feedparser, rather than fetched again
+        self.assertIn("Caf\u00e9", feed_content)
+        mock_feedparser.assert_called_once_with(document, response_headers={"content-type": "application/rss+xml",
+                                                                            "content-location": url})
+
+    def test_parse_with_xml_backend_reuses_channel_when_not_modified(self):
+        # Given: an RSS feed URL which was previously fetched with validators, and its channel kept
+        url = "https://www.fiercewireless.com/rss/xml"
+        http_client = _http_client(_read_document(RSS_XML_TESTDATA_FILENAME), {"ETag": "\"abc123\""})
+        kept_channels = {url: RssUrlParser(url, "xml", http_client).parse_channel()}
+        first_content = kept_channels[url].format_feed_content()
+
+        # When: the URL is parsed again and the feed has not been modified
+        http_client.get.return_value = HttpResponse(url, 304, {}, b"")
+        feed_content = RssUrlParser(url, "xml", http_client, kept_channels.get).parse()
+
+        # Then: the validators are sent and the kept content is returned
+        http_client.get.assert_called_with(url, {"If-None-Match": "\"abc123\""})
+        self.assertEqual(first_content, feed_content)
+
+    def test_parse_with_xml_backend_fetch_error(self):
+        # Given: an RSS feed URL which cannot be fetched
+        url = "https://www.fiercewireless.com/rss/xml"
+        http_client = MagicMock()
+        http_client.get.side_effect = HttpFetchError("Response from URL {} exceeds 10 bytes".format(url))
+
+        # When: the URL is parsed with the xml parser backend
+        with self.assertRaises(RssParserError) as error:
+            RssUrlParser(url, "xml", http_client).parse()
+
+        # Then: the fetch error is reported
+        self.assertIn("exceeds 10 bytes", error.exception.message)
+
+    @parameterized.expand([
+        ["no hints", {}, {}, None],
+        ["ttl", {"ttl": "60"}, {}, 3600],
+        ["syndication period", {"sy_updateperiod": "hourly", "sy_updatefrequency": "2"}, {}, 1800],
+        ["syndication default period", {"sy_updatefrequency": "4"}, {}, 21600],
+        ["cache control", {}, {"cache-control": "public, max-age=900"}, 900],
+        ["no cache", {}, {"cache-control": "no-cache, max-age=900"}, None],
+        ["expires", {}, {"date": "Thu, 13 Jun 2019 18:00:00 GMT", "expires": "Thu, 13 Jun 2019 18:10:00 GMT"}, 600],
+        ["expired", {}, {"date": "Thu, 13 Jun 2019 18:00:00 GMT", "expires": "Thu, 13 Jun 2019 17:00:00 GMT"}, None],
+        ["longest hint", {"ttl": "5"}, {"cache-control": "max-age=60"}, 300],
+        ["invalid ttl", {"ttl": "soon"}, {}, None]
+    ])
+    @patch("feedparser.parse")
+    def test_parse_reads_ttl_hints(self, _, feed, headers, expected, mock_response):
+        # Given: an RSS feed URL whose feed and response hint how long it may be cached for
+        url = "https://www.fiercewireless.com/rss/xml"
+        feed.update({"title": "FierceWireless", "link": "some link", "description": "blah"})
+        mock_response.return_value = {"feed": feed, "entries": [], "headers": headers}
+
+        # When: the URL is parsed
+        rss_channel = RssUrlParser(url, "feedparser").parse_channel()
+
+        # Then: the channel's ttl is taken from the hints
+        self.assertEqual(expected, rss_channel.ttl)
+
+    def test_unknown_parser_backend(self):
+        # Given: an unknown parser backend
+
+        # When: a parser is created with it
+        with self.assertRaises(RssParserError) as error:
+            RssUrlParser("https://www.fiercewireless.com/rss/xml", "unknown")
+
+        # Then: the backend is reported as unknown
+        self.assertIn("Unknown parser backend", error.exception.message)
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+import asyncio
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+from parser.rss_parser import RssUrlParser, RssParserError, clear_feed_validators
+from utils.files import get_full_path
+from utils.http_client import HttpResponse, HttpFetchError
+
+try:
+    from unittest.mock import AsyncMock
+except ImportError:
+    AsyncMock = None
+
+RSS_FEED_URL = "https://www.fiercewireless.com/rss/xml"
+RSS_XML_TESTDATA_FILENAME = get_full_path("tests", "test_data", "rss_sample.xml")
+
+with open(RSS_XML_TESTDATA_FILENAME, "rb") as document_file:
+    RSS_DOCUMENT = document_file.read()
+
+
+@unittest.skipIf(sys.version_info < (3, 8), "AsyncMock needs Python 3.8")
+class TestRssParsingAsync(unittest.TestCase):
+
+    def tearDown(self):
+        clear_feed_validators()
+
+    @patch("feedparser.parse")
+    def test_parse_channel_async_with_xml_backend(self, mock_feedparser):
+        # Given: an RSS feed URL serving a well-formed RSS 2.0 document over an asynchronous client
+        http_client = AsyncMock()
+        http_client.get.return_value = HttpResponse(RSS_FEED_URL, 200, {}, RSS_DOCUMENT)
+
+        # When: the URL is parsed asynchronously with the xml parser backend
+        rss_channel = asyncio.run(RssUrlParser(RSS_FEED_URL, "xml").parse_channel_async(http_client))
+
+        # Then: the awaited feed is parsed as it would be synchronously
+        sync_http_client = MagicMock()
+        sync_http_client.get.return_value = HttpResponse(RSS_FEED_URL, 200, {}, RSS_DOCUMENT)
+        clear_feed_validators()
+        self.assertEqual(RssUrlParser(RSS_FEED_URL, "xml", sync_http_client).parse(),
+                         rss_channel.format_feed_content())
+        http_client.get.assert_awaited_once_with(RSS_FEED_URL, {})
+        mock_feedparser.assert_not_called()
+
+    def test_parse_channel_async_fetch_error(self):
+        # Given: an RSS feed URL which cannot be fetched
+        http_client = AsyncMock()
+        http_client.get.side_effect = HttpFetchError("Error fetching URL {}: timed out".format(RSS_FEED_URL))
+
+        # When: the URL is parsed asynchronously
+        with self.assertRaises(RssParserError) as error:
+            asyncio.run(RssUrlParser(RSS_FEED_URL, "http").parse_channel_async(http_client))
+
+        # Then: the fetch error is reported
+        self.assertIn("timed out", error.exception.message)
+
+    def test_parse_channel_async_with_feedparser_backend(self):
+        # Given: the feedparser backend, which fetches feeds itself
+        http_client = AsyncMock()
+
+        # When: a URL is parsed asynchronously with it
+        with self.assertRaises(RssParserError) as error:
+            asyncio.run(RssUrlParser(RSS_FEED_URL, "feedparser").parse_channel_async(http_client))
+
+        # Then: the backend is reported as unable to fetch asynchronously
+        self.assertIn("cannot fetch asynchronously", error.exception.message)
+        http_client.get.assert_not_called()
@@ -0,0 +1,66 @@
+#!/usr/bin/python3
+
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_share_a_single_call(self):
+        # Given: a slow call for a key
+        obj_under_test = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def function():
+            calls.append(1)
+            release.wait(5)
+            return "content"
+
+        # When: the key is requested concurrently
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(obj_under_test.do, "key", function)]
+            while not obj_under_test.in_flight("key"):
+                time.sleep(0.01)
+            futures += [executor.submit(obj_under_test.do, "key", function) for _ in range(4)]
+            time.sleep(0.2)
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        # Then: the call is made once and every caller shares its result
+        self.assertEqual(["content"] * 5, results)
+        self.assertEqual(1, len(calls))
+        self.assertFalse(obj_under_test.in_flight("key"))
+
+    def test_errors_are_raised_to_callers(self):
+        # Given: a call which fails
+        obj_under_test = SingleFlight()
+
+        def function():
+            raise RuntimeError("Connection refused")
+
+        # When: the key is requested
+        with self.assertRaises(RuntimeError):
+            obj_under_test.do("key", function)
+
+        # Then: the next request makes a new call
+        self.assertEqual("content", obj_under_test.do("key", lambda: "content"))
+
+    def test_background_call_is_submitted_once(self):
+        # Given: a slow background call for a key
+        obj_under_test = SingleFlight()
+        release = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # When: the background call is requested twice
+            first = obj_under_test.do_in_background("key", lambda: release.wait(5), executor)
+            second = obj_under_test.do_in_background("key", lambda: release.wait(5), executor)
+            release.set()
+
+        # Then: only the first request submits a call
+        self.assertTrue(first)
+        self.assertFalse(second)
@@ -0,0 +1,226 @@
+#!/usr/bin/python3
+
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from caching.sqlite_cache import SqliteCache
+
+PROCESS_COUNT = 4
+
+
+def _set_values(path, process_index):
+    cache = SqliteCache(path)
+    for index in range(20):
+        cache.set("key-{}-{}".format(process_index, index), index)
+
+
+def _refresh_once(path, refreshes_path):
+    # Mirrors a feed refresh: wait for the lease, then only refresh if no other process already has.
+    cache = SqliteCache(path)
+    token = cache.acquire_lock("feed", 30)
+    while token is None:
+        time.sleep(0.01)
+        token = cache.acquire_lock("feed", 30)
+    try:
+        if cache.get("feed") is None:
+            with open(refreshes_path, "a") as refreshes_file:
+                refreshes_file.write("{}\n".format(os.getpid()))
+            time.sleep(0.2)
+            cache.set("feed", "content")
+    finally:
+        cache.release_lock("feed", token)
+
+
+def _read_value(cache, key, results):
+    results.put(cache.get(key))
+
+
+def _run_processes(context, target, arguments):
+    processes = [context.Process(target=target, args=arguments(index)) for index in range(PROCESS_COUNT)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+    return [process.exitcode for process in processes]
+
+
+class TestSqliteCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "cache.db")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_get_cached_value(self):
+        # Given: a cache holding a value
+        obj_under_test = SqliteCache(self.path)
+        obj_under_test.set("https://www.fiercewireless.com/rss/xml", {"title": "FierceWireless"})
+
+        # When: the value is read
+        value = obj_under_test.get("https://www.fiercewireless.com/rss/xml")
+
+        # Then: the cached value is returned
+        self.assertEqual({"title": "FierceWireless"}, value)
+
+    def test_values_persist_across_instances(self):
+        # Given: a value cached by another instance
+        SqliteCache(self.path).set("https://www.fiercewireless.com/rss/xml", "<h2>FierceWireless</h2>")
+
+        # When: the value is read by a new instance
+        value = SqliteCache(self.path).get("https://www.fiercewireless.com/rss/xml")
+
+        # Then: the cached value is returned
+        self.assertEqual("<h2>FierceWireless</h2>", value)
+
+    def test_least_recently_used_values_are_evicted(self):
+        # Given: a cache with room for only a few values
+        obj_under_test = SqliteCache(self.path, max_bytes=1024)
+
+        # When: more values are cached than fit
+        for index in range(10):
+            obj_under_test.set("key-{}".format(index), "x" * 200)
+
+        # Then: the stored size stays within budget
+        stats = obj_under_test.stats()
+        self.assertLessEqual(stats["bytes"], 1024)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertIsNone(obj_under_test.get("key-0"))
+        self.assertIsNotNone(obj_under_test.get("key-9"))
+
+    def test_reads_only_touch_entries_once_per_interval(self):
+        # Given: a cached value which has just been read
+        obj_under_test = SqliteCache(self.path)
+        obj_under_test.set("https://www.fiercewireless.com/rss/xml", "<h2>FierceWireless</h2>")
+        execute = obj_under_test._execute
+        statements = []
+
+        def record(statement, parameters=()):
+            statements.append(statement)
+            return execute(statement, parameters)
+
+        # When: the value is read again, within and after the touch interval
+        with patch.object(obj_under_test, "_execute", side_effect=record):
+            obj_under_test.get("https://www.fiercewireless.com/rss/xml")
+            with patch("time.time", return_value=time.time() + 120):
+                obj_under_test.get("https://www.fiercewireless.com/rss/xml")
+
+        # Then: only the read after the interval marks the value as recently used
+        self.assertEqual(1, len([statement for statement in statements if statement.startswith("UPDATE")]))
+
+    def test_stored_size_summed_only_when_likely_over_budget(self):
+        # Given: a cache with room for many values
+        obj_under_test = SqliteCache(self.path, max_bytes=1024 * 1024)
+        execute = obj_under_test._execute
+        statements = []
+
+        def record(statement, parameters=()):
+            statements.append(statement)
+            return execute(statement, parameters)
+
+        # When: a few values are cached
+        with patch.object(obj_under_test, "_execute", side_effect=record):
+            for index in range(10):
+                obj_under_test.set("key-{}".format(index), "x" * 200)
+
+        # Then: the stored values are summed once, not on every write
+        self.assertEqual(1, len([statement for statement in statements if "SUM(size)" in statement]))
+
+    def test_prune_stops_when_cache_emptied_by_another_process(self):
+        # Given: a cache over budget, which another process empties while it is being pruned
+        obj_under_test = SqliteCache(self.path, max_bytes=1024)
+        for index in range(4):
+            obj_under_test.set("key-{}".format(index), "x" * 200)
+        execute = obj_under_test._execute
+
+        def empty_before_eviction(statement, parameters=()):
+            if statement.startswith("SELECT key, size"):
+                SqliteCache(self.path).clear()
+            return execute(statement, parameters)
+
+        # When: a value taking it over budget is cached
+        with patch.object(obj_under_test, "_execute", side_effect=empty_before_eviction):
+            obj_under_test.set("key-4", "x" * 200)
+
+        # Then: pruning finishes, with nothing left to evict
+        self.assertEqual(0, obj_under_test.stats()["entries"])
+
+    def test_lease_held_until_released(self):
+        # Given: a key leased by one holder
+        obj_under_test = SqliteCache(self.path)
+        token = obj_under_test.acquire_lock("feed", 30)
+
+        # When: another holder tries to lease it, before and after it is released
+        while_held = obj_under_test.acquire_lock("feed", 30)
+        released = obj_under_test.release_lock("feed", token)
+        after_release = obj_under_test.acquire_lock("feed", 30)
+
+        # Then: the lease is only granted once released
+        self.assertIsNotNone(token)
+        self.assertIsNone(while_held)
+        self.assertTrue(released)
+        self.assertIsNotNone(after_release)
+
+    def test_expired_lease_can_be_taken(self):
+        # Given: a lease which has expired without being released
+        obj_under_test = SqliteCache(self.path)
+        expired_token = obj_under_test.acquire_lock("feed", -1)
+
+        # When: another holder leases the key
+        token = obj_under_test.acquire_lock("feed", 30)
+
+        # Then: the lease is granted, and the expired holder can no longer release it
+        self.assertIsNotNone(token)
+        self.assertFalse(obj_under_test.release_lock("feed", expired_token))
+        self.assertIsNone(obj_under_test.acquire_lock("feed", 30))
+
+    def test_values_shared_between_processes(self):
+        # Given: several processes caching values at once
+        context = multiprocessing.get_context("spawn")
+
+        # When: they have all finished
+        exit_codes = _run_processes(context, _set_values, lambda index: (self.path, index))
+
+        # Then: every value is visible to this process
+        self.assertEqual([0] * PROCESS_COUNT, exit_codes)
+        obj_under_test = SqliteCache(self.path)
+        for process_index in range(PROCESS_COUNT):
+            for index in range(20):
+                self.assertEqual(index, obj_under_test.get("key-{}-{}".format(process_index, index)))
+
+    def test_lease_lets_one_process_refresh(self):
+        # Given: several processes refreshing the same value at once
+        context = multiprocessing.get_context("spawn")
+        refreshes_path = os.path.join(self.temp_dir.name, "refreshes")
+
+        # When: they have all finished
+        exit_codes = _run_processes(context, _refresh_once, lambda _: (self.path, refreshes_path))
+
+        # Then: only one process refreshed the value
+        self.assertEqual([0] * PROCESS_COUNT, exit_codes)
+        with open(refreshes_path) as refreshes_file:
+            self.assertEqual(1, len(refreshes_file.readlines()))
+        self.assertEqual("content", SqliteCache(self.path).get("feed"))
+
+    def test_forked_process_reconnects(self):
+        # Given: a cache already connected in this process
+        obj_under_test = SqliteCache(self.path)
+        obj_under_test.set("feed", "content")
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+
+        # When: a forked process reads from the inherited cache
+        process = context.Process(target=_read_value, args=(obj_under_test, "feed", results))
+        process.start()
+        value = results.get(timeout=10)
+        process.join(10)
+
+        # Then: the value is read over the forked process's own connection
+        self.assertEqual("content", value)
+        self.assertEqual(0, process.exitcode)
+        self.assertEqual("content", obj_under_test.get("feed"))
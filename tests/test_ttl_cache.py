@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+
+import unittest
+from unittest.mock import patch
+
+from utils.ttl_cache import TtlCache
+
+
+class TestTtlCache(unittest.TestCase):
+
+    def test_get_returns_stored_value(self):
+        # Given: a value stored in the cache
+        obj_under_test = TtlCache(ttl=60)
+        obj_under_test.set("key", "value")
+
+        # When: the value is read
+
+        # Then: the stored value is returned
+        self.assertEqual("value", obj_under_test.get("key"))
+        self.assertIsNone(obj_under_test.get("missing"))
+
+    @patch("utils.ttl_cache.time.monotonic")
+    def test_get_expires_value_after_ttl(self, mock_monotonic):
+        # Given: a value stored in the cache
+        mock_monotonic.return_value = 100
+        obj_under_test = TtlCache(ttl=60)
+        obj_under_test.set("key", "value")
+
+        # When: the time to live passes
+        mock_monotonic.return_value = 160
+
+        # Then: the value is no longer returned
+        self.assertIsNone(obj_under_test.get("key"))
+
+    def test_set_evicts_oldest_value_when_full(self):
+        # Given: a full cache
+        obj_under_test = TtlCache(ttl=60, max_entries=2)
+        obj_under_test.set("first", 1)
+        obj_under_test.set("second", 2)
+
+        # When: another value is stored
+        obj_under_test.set("third", 3)
+
+        # Then: the oldest value is evicted
+        self.assertIsNone(obj_under_test.get("first"))
+        self.assertEqual(2, obj_under_test.get("second"))
+        self.assertEqual(3, obj_under_test.get("third"))
+
+    def test_delete_removes_value(self):
+        # Given: a value stored in the cache
+        obj_under_test = TtlCache(ttl=60)
+        obj_under_test.set("key", "value")
+
+        # When: the value is deleted
+        obj_under_test.delete("key")
+
+        # Then: the value is no longer returned
+        self.assertIsNone(obj_under_test.get("key"))
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+
+import unittest
+from unittest.mock import patch
+
+import feedparser
+from parameterized import parameterized
+
+from parser.xml_feed_parser import parse_feed_document, XmlFeedError
+from utils.files import get_full_path
+
+RSS_TESTDATA_FILENAME = get_full_path("tests", "test_data", "rss_sample.xml")
+ATOM_TESTDATA_FILENAME = get_full_path("tests", "test_data", "atom_sample.xml")
+FEED_KEYS = ["title", "link", "description", "subtitle", "ttl", "sy_updateperiod", "sy_updatefrequency"]
+ENTRY_KEYS = ["title", "link", "summary", "author", "id", "published", "published_parsed", "updated",
+              "updated_parsed"]
+
+
+def _read(filename):
+    with open(filename, "rb") as document_file:
+        return document_file.read()
+
+
+def _select(values, keys):
+    return {key: values[key] for key in keys if key in values}
+
+
+class TestXmlFeedParser(unittest.TestCase):
+
+    @parameterized.expand([
+        ["rss", RSS_TESTDATA_FILENAME],
+        ["atom", ATOM_TESTDATA_FILENAME]
+    ])
+    def test_parse_matches_feedparser(self, _, filename):
+        # Given: a well-formed feed document
+        document = _read(filename)
+
+        # When: the document is parsed
+        rss_feed = parse_feed_document(document)
+
+        # Then: the feed and entries match those parsed by feedparser
+        expected = feedparser.parse(document)
+        self.assertEqual(_select(expected["feed"], FEED_KEYS), _select(rss_feed["feed"], FEED_KEYS))
+        self.assertEqual([_select(entry, ENTRY_KEYS) for entry in expected["entries"]],
+                         [_select(entry, ENTRY_KEYS) for entry in rss_feed["entries"]])
+
+    def test_parse_sanitizes_summaries(self):
+        # Given: an RSS feed with a script in an item description
+        document = _read(RSS_TESTDATA_FILENAME)
+
+        # When: the document is parsed
+        rss_feed = parse_feed_document(document)
+
+        # Then: the script is removed and the remaining markup kept
+        summary = rss_feed["entries"][0]["summary"]
+        self.assertNotIn("script", summary)
+        self.assertIn("<b>growing</b>", summary)
+
+    @patch("parser.xml_feed_parser._sanitize_html", None)
+    def test_parse_rejects_markup_without_sanitizer(self):
+        # Given: a feed with markup in its item descriptions, and no HTML sanitizer available
+        document = _read(RSS_TESTDATA_FILENAME)
+
+        # When: the document is parsed
+        with self.assertRaises(XmlFeedError) as error:
+            parse_feed_document(document)
+
+        # Then: it is rejected, to be parsed by feedparser instead
+        self.assertIn("sanitizer", error.exception.message)
+
+    @parameterized.expand([
+        ["empty", b""],
+        ["malformed", b"<rss version=\"2.0\"><channel><title>Feed</title>"],
+        ["html entity", b"<rss version=\"2.0\"><channel><title>Caf&eacute;</title></channel></rss>"],
+        ["rss 1.0", b"<rdf:RDF xmlns:rdf=\"http://www.w3.org/1999/02/22-rdf-syntax-ns#\"></rdf:RDF>"],
+        ["unknown rss version", b"<rss version=\"3.0\"><channel><title>Feed</title></channel></rss>"],
+        ["missing title", b"<rss version=\"2.0\"><channel><link>link</link></channel></rss>"],
+        ["atom xhtml", b"<feed xmlns=\"http://www.w3.org/2005/Atom\"><title>Feed</title><entry>"
+                       b"<content type=\"xhtml\"><div xmlns=\"http://www.w3.org/1999/xhtml\">x</div></content>"
+                       b"</entry></feed>"]
+    ])
+    def test_parse_rejects_documents_it_does_not_handle(self, _, document):
+        # Given: a document which is not well-formed RSS 2.0 or Atom
+
+        # When: the document is parsed
+        with self.assertRaises(XmlFeedError) as error:
+            parse_feed_document(document)
+
+        # Then: the error explains why it was rejected
+        self.assertTrue(error.exception.message)
+
+
+if __name__ == '__main__':
+    unittest.main()
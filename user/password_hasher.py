@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+"""
+Hashes and verifies passwords on a bounded pool of worker threads.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask_bcrypt import generate_password_hash, check_password_hash
+
+DEFAULT_ROUNDS = 12
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 16
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on at most workers threads, so a burst of logins cannot take every CPU from other requests.
+    Once max_pending passwords are being hashed or waiting to be, further work is refused rather than queued.
+    """
+
+    def __init__(self, rounds=DEFAULT_ROUNDS, workers=DEFAULT_WORKERS, max_pending=DEFAULT_MAX_PENDING):
+        """
+        :param rounds: the bcrypt work factor new hashes are made with.
+        :param workers: the number of passwords hashed at once.
+        :param max_pending: the number of passwords allowed to be hashing or waiting to be.
+        """
+        self.rounds = rounds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._pending = threading.BoundedSemaphore(max_pending)
+
+    def hash(self, password):
+        """
+        :param password: the plain text password.
+        :return: the bcrypt hash of the password.
+        :raises PasswordHasherBusy: if too many passwords are already being hashed.
+        """
+        return self._run(generate_password_hash, password, self.rounds)
+
+    def verify(self, password_hash, password):
+        """
+        :param password_hash: the stored bcrypt hash.
+        :param password: the plain text password to check.
+        :return: True if the password matches the hash.
+        :raises PasswordHasherBusy: if too many passwords are already being hashed.
+        """
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """
+        :param password_hash: the stored bcrypt hash.
+        :return: True if the hash was made with a different work factor than the current one.
+        """
+        if isinstance(password_hash, bytes):
+            password_hash = password_hash.decode("utf-8")
+        parts = password_hash.split("$")
+        return len(parts) < 4 or not parts[2].isdigit() or int(parts[2]) != self.rounds
+
+    def _run(self, function, *args):
+        if not self._pending.acquire(blocking=False):
+            raise PasswordHasherBusy("Too many passwords are being hashed")
+        try:
+            return self._executor.submit(function, *args).result()
+        finally:
+            self._pending.release()
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Exception is thrown when a password cannot be hashed as too many already are.
+    """
+
+    def __init__(self, message):
+        super(PasswordHasherBusy, self).__init__(message)
+        self.message = message
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""
+Serves a WSGI app to an ASGI server, so work which only waits on the network can be done on the event loop.
+"""
+import asyncio
+import io
+import sys
+
+
+class AsgiAdapter:
+    """
+    ASGI app running a WSGI app on a bounded executor. Before each request is handed to a worker thread,
+    the before_dispatch hook may await anything the request needs, such as an upstream fetch, so a slow
+    upstream holds open sockets rather than worker threads.
+    """
+
+    def __init__(self, wsgi_app, executor, before_dispatch=None):
+        """
+        :param wsgi_app: the WSGI app to serve.
+        :param executor: the executor running the WSGI app, whose workers bound the requests served at once.
+        :param before_dispatch: coroutine function awaited with each request's WSGI environ, before it is served.
+        """
+        self.wsgi_app = wsgi_app
+        self.executor = executor
+        self.before_dispatch = before_dispatch
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise ValueError("Unsupported ASGI scope type {}".format(scope["type"]))
+
+        environ = _environ(scope, await _read_body(receive))
+        if self.before_dispatch is not None:
+            await self.before_dispatch(environ)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._serve, environ, send, loop)
+
+    def _serve(self, environ, send, loop):
+        def emit(message):
+            # Waits for each message to be sent, so a slow client throttles a streamed response.
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info is not None and response.get("started"):
+                raise exc_info[1].with_traceback(exc_info[2])
+            response["status"] = int(status.split(" ", 1)[0])
+            response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1"))
+                                   for name, value in headers]
+            return write
+
+        def start():
+            if not response.get("started"):
+                response["started"] = True
+                emit({"type": "http.response.start", "status": response["status"], "headers": response["headers"]})
+
+        def write(chunk):
+            if chunk:
+                start()
+                emit({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in result:
+                write(chunk)
+            start()
+            emit({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+
+    @staticmethod
+    async def _lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body.extend(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    return bytes(body)
+
+
+def _environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        # WSGI carries paths as latin-1 strings of their UTF-8 bytes.
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": "HTTP/{}".format(scope.get("http_version", "1.1")),
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").lower()
+        value = value.decode("latin-1")
+        if name == "content-length":
+            continue
+        key = "CONTENT_TYPE" if name == "content-type" else "HTTP_" + name.upper().replace("-", "_")
+        if key in environ:
+            value = environ[key] + ("; " if key == "HTTP_COOKIE" else ",") + value
+        environ[key] = value
+    return environ
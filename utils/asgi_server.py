@@ -0,0 +1,236 @@
+#!/usr/bin/python3
+"""
+HTTP/1.1 server for an ASGI app, built on asyncio streams alone, so serving the app over ASGI needs no extra packages.
+"""
+import asyncio
+import http
+from urllib.parse import unquote_to_bytes
+
+DEFAULT_KEEP_ALIVE_TIMEOUT = 5
+DEFAULT_MAX_BODY_BYTES = 16 * 1024 * 1024
+MAX_HEAD_BYTES = 64 * 1024
+BODY_READ_BYTES = 64 * 1024
+HTTP_BAD_REQUEST = 400
+HTTP_REQUEST_TIMEOUT = 408
+HTTP_PAYLOAD_TOO_LARGE = 413
+HTTP_INTERNAL_SERVER_ERROR = 500
+
+
+class AsgiServer:
+    """
+    Serves an ASGI app's http scope over keep-alive connections. Request bodies are read in full before the app
+    is called, and responses are sent with a Content-Length when the app gives one, or chunked when it streams.
+    """
+
+    def __init__(self, application, host="127.0.0.1", port=8000, keep_alive_timeout=DEFAULT_KEEP_ALIVE_TIMEOUT,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        """
+        :param application: the ASGI app to serve.
+        :param host: the address to listen on.
+        :param port: the port to listen on.
+        :param keep_alive_timeout: seconds an idle connection is kept open, waiting for its next request,
+        and the longest wait for each read of a request body.
+        :param max_body_bytes: the largest request body accepted.
+        """
+        self.application = application
+        self.host = host
+        self.port = port
+        self.keep_alive_timeout = keep_alive_timeout
+        self.max_body_bytes = max_body_bytes
+
+    async def serve(self):
+        """
+        Serves requests until cancelled.
+        """
+        server = await self.start()
+        print("Serving on http://{}:{}".format(self.host, self.port))
+        async with server:
+            await server.serve_forever()
+
+    async def start(self):
+        """
+        Starts accepting connections on the running event loop.
+        :return: the asyncio server, whose sockets give the port listened on.
+        """
+        return await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEAD_BYTES)
+
+    async def _handle(self, reader, writer):
+        try:
+            while await self._serve_request(reader, writer):
+                pass
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_request(self, reader, writer):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.keep_alive_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            return False
+        except asyncio.LimitOverrunError:
+            await _reject(writer, HTTP_BAD_REQUEST)
+            return False
+        request = _parse_head(head)
+        if request is None:
+            await _reject(writer, HTTP_BAD_REQUEST)
+            return False
+        method, target, version, headers = request
+
+        try:
+            body = await self._read_body(reader, headers)
+        except asyncio.TimeoutError:
+            # A client stalling part way through its body would otherwise hold the connection open for good.
+            await _reject(writer, HTTP_REQUEST_TIMEOUT)
+            return False
+        except ValueError:
+            await _reject(writer, HTTP_BAD_REQUEST)
+            return False
+        if body is None:
+            await _reject(writer, HTTP_PAYLOAD_TOO_LARGE)
+            return False
+
+        connection = _header(headers, b"connection").lower()
+        keep_alive = b"close" not in connection if version == "1.1" else b"keep-alive" in connection
+        raw_path, _, query_string = target.partition(b"?")
+        sockname = writer.get_extra_info("sockname") or (self.host, self.port)
+        peername = writer.get_extra_info("peername") or ("", 0)
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": version, "method": method,
+                 "scheme": "http", "path": unquote_to_bytes(raw_path).decode("utf-8", "replace"),
+                 "raw_path": raw_path, "query_string": query_string, "root_path": "", "headers": headers,
+                 "server": tuple(sockname[:2]), "client": tuple(peername[:2])}
+        response = _Response(writer, method, keep_alive)
+        requests = [{"type": "http.request", "body": body, "more_body": False}]
+
+        async def receive():
+            return requests.pop(0) if requests else {"type": "http.disconnect"}
+
+        try:
+            await self.application(scope, receive, response.send)
+        except Exception as error:
+            print("Error serving {} {}: {}".format(method, scope["path"], error))
+            if not response.started:
+                await _reject(writer, HTTP_INTERNAL_SERVER_ERROR)
+            return False
+        return keep_alive and response.finished
+
+    async def _read_body(self, reader, headers):
+        if b"chunked" in _header(headers, b"transfer-encoding").lower():
+            body = bytearray()
+            while True:
+                size = int((await self._read(reader.readuntil(b"\r\n"))).split(b";")[0].strip(), 16)
+                if size == 0:
+                    while await self._read(reader.readuntil(b"\r\n")) != b"\r\n":
+                        pass
+                    return bytes(body)
+                if len(body) + size > self.max_body_bytes:
+                    return None
+                body.extend(await self._read_exactly(reader, size))
+                await self._read(reader.readexactly(2))
+        content_length = int(_header(headers, b"content-length") or b"0")
+        if content_length < 0:
+            raise ValueError("Negative Content-Length")
+        if content_length > self.max_body_bytes:
+            return None
+        return await self._read_exactly(reader, content_length)
+
+    async def _read_exactly(self, reader, size):
+        # Read in pieces, each given the timeout, so large bodies sent slowly but steadily are still accepted.
+        data = bytearray()
+        while len(data) < size:
+            piece = await self._read(reader.read(min(size - len(data), BODY_READ_BYTES)))
+            if not piece:
+                raise asyncio.IncompleteReadError(bytes(data), size)
+            data.extend(piece)
+        return bytes(data)
+
+    async def _read(self, read):
+        return await asyncio.wait_for(read, self.keep_alive_timeout)
+
+
+class _Response:
+    """
+    Writes the ASGI app's response messages to the connection.
+    """
+
+    def __init__(self, writer, method, keep_alive):
+        self.writer = writer
+        self.method = method
+        self.keep_alive = keep_alive
+        self.status = None
+        self.headers = []
+        self.started = False
+        self.finished = False
+        self.chunked = False
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+            self.headers = list(message.get("headers", []))
+            return
+        if message["type"] != "http.response.body" or self.finished:
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if not self.started:
+            self._start(body, more_body)
+        # Responses to HEAD requests carry their headers alone.
+        if self.method != "HEAD":
+            self._write(body, more_body)
+        self.finished = not more_body
+        await self.writer.drain()
+
+    def _start(self, body, more_body):
+        self.started = True
+        headers = self.headers
+        if not _header(headers, b"content-length"):
+            if more_body:
+                # The length is unknown until the app has finished streaming.
+                self.chunked = True
+                headers.append((b"transfer-encoding", b"chunked"))
+            else:
+                headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        if not self.keep_alive:
+            headers.append((b"connection", b"close"))
+        self.writer.write(_status_line(self.status) + b"".join(name + b": " + value + b"\r\n"
+                                                               for name, value in headers) + b"\r\n")
+
+    def _write(self, body, more_body):
+        if not self.chunked:
+            self.writer.write(body)
+            return
+        if body:
+            self.writer.write(b"%x\r\n%s\r\n" % (len(body), body))
+        if not more_body:
+            self.writer.write(b"0\r\n\r\n")
+
+
+def _parse_head(head):
+    request_line, _, header_lines = head[:-4].partition(b"\r\n")
+    parts = request_line.split()
+    if len(parts) != 3 or parts[2] not in (b"HTTP/1.0", b"HTTP/1.1") or not parts[1].startswith(b"/"):
+        return None
+    headers = []
+    for line in header_lines.split(b"\r\n") if header_lines else []:
+        name, separator, value = line.partition(b":")
+        if not separator or not name or name != name.strip():
+            return None
+        headers.append((name.lower(), value.strip()))
+    return parts[0].decode("latin-1"), parts[1], parts[2][5:].decode("latin-1"), headers
+
+
+def _header(headers, name):
+    return next((value for header, value in headers if header == name), b"")
+
+
+def _status_line(status):
+    try:
+        phrase = http.HTTPStatus(status).phrase
+    except ValueError:
+        phrase = ""
+    return "HTTP/1.1 {} {}\r\n".format(status, phrase).encode("latin-1")
+
+
+async def _reject(writer, status):
+    writer.write(_status_line(status) + b"content-length: 0\r\nconnection: close\r\n\r\n")
+    await writer.drain()
@@ -0,0 +1,216 @@
+#!/usr/bin/python3
+"""
+HTTP client for asyncio, so a fetch waiting on a slow server holds only its socket, never a thread.
+"""
+import asyncio
+import http.client
+import io
+import ssl
+import weakref
+import zlib
+from collections import defaultdict
+from urllib.parse import urlsplit, urljoin
+
+import feedparser
+
+from utils.http_client import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, DEFAULT_MAX_BYTES, MAX_REDIRECTS, \
+    CHUNK_SIZE, HTTP_NOT_MODIFIED, REDIRECT_STATUSES, STALE_CONNECTION_ERRORS, ResponseBody, HttpResponse, \
+    HttpFetchError
+
+DEFAULT_MAX_CONNECTIONS = 256
+DEFAULT_MAX_PER_HOST = 2
+BODILESS_STATUSES = [204, HTTP_NOT_MODIFIED]
+
+
+class AsyncHttpClient:
+    """
+    Fetches URLs on the running event loop, with the same compression, timeouts and size cap as HttpClient.
+    Concurrency is bounded by connections in use, at most max_connections in all and max_per_host to any one host,
+    with further fetches waiting their turn. Connections are kept alive between fetches, up to max_per_host idle
+    connections per host, and belong to the event loop which opened them.
+    """
+
+    def __init__(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_bytes=DEFAULT_MAX_BYTES, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 max_per_host=DEFAULT_MAX_PER_HOST):
+        """
+        :param connect_timeout: seconds to wait for a connection to be established.
+        :param read_timeout: seconds to wait for each read from an established connection.
+        :param max_bytes: the largest response body accepted, once decompressed.
+        :param max_connections: the number of connections open at once.
+        :param max_per_host: the number of connections open at once to any one host.
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self._ssl_context = ssl.create_default_context()
+        # Semaphores and streams belong to a single event loop, so each loop using the client gets its own.
+        self._pools = weakref.WeakKeyDictionary()
+
+    async def get(self, url, headers=None):
+        """
+        Fetches a URL, following redirects.
+        :param url: the http or https URL to fetch.
+        :param headers: dict of extra request headers, such as conditional request validators.
+        :return: the HttpResponse, whose status is either successful or not modified.
+        :raises HttpFetchError: if the URL could not be fetched, returned an error or was too large.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            status, response_headers, content = await self._request(url, headers or {})
+            location = response_headers.get("Location")
+            if status not in REDIRECT_STATUSES or not location:
+                break
+            url = urljoin(url, location)
+        else:
+            raise HttpFetchError("Too many redirects fetching URL {}".format(url))
+
+        if status != HTTP_NOT_MODIFIED and not 200 <= status < 300:
+            raise HttpFetchError("HTTP {} fetching URL {}".format(status, url), status)
+        return HttpResponse(url, status, response_headers, content)
+
+    async def close(self):
+        """
+        Closes every idle connection opened by the running event loop.
+        """
+        pool = self._pools.pop(asyncio.get_running_loop(), None)
+        if pool is not None:
+            for idle in pool[2].values():
+                for _, writer in idle:
+                    writer.close()
+
+    async def _request(self, url, headers):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise HttpFetchError("Unsupported URL {}".format(url))
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        request_headers = {"Host": parts.netloc.rpartition("@")[2], "User-Agent": feedparser.USER_AGENT,
+                           "Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"}
+        request_headers.update(headers)
+        request = "GET {} HTTP/1.1\r\n{}\r\n".format(
+            path, "".join("{}: {}\r\n".format(name, value) for name, value in request_headers.items()))
+
+        # Waits for the host's turn before taking one of the connections shared by every host.
+        connections, per_host, idle = self._pool_for(key)
+        async with per_host, connections:
+            connection, reused = self._checkout(idle), True
+            if connection is None:
+                connection, reused = await self._connect(key, url), False
+            try:
+                try:
+                    version, status, response_headers = await self._send(connection, request)
+                except STALE_CONNECTION_ERRORS + (asyncio.IncompleteReadError,):
+                    # The server may have closed an idle connection, so retry once on a fresh one.
+                    connection[1].close()
+                    if not reused:
+                        raise
+                    connection, reused = await self._connect(key, url), False
+                    version, status, response_headers = await self._send(connection, request)
+                content = await self._read_body(connection[0], status, response_headers, url)
+            except (HttpFetchError, asyncio.CancelledError):
+                connection[1].close()
+                raise
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    http.client.HTTPException, zlib.error, ValueError) as error:
+                connection[1].close()
+                raise HttpFetchError("Error fetching URL {}: {}".format(url, str(error) or "timed out"))
+
+            if _keeps_alive(version, status, response_headers) and len(idle) < self.max_per_host:
+                idle.append(connection)
+            else:
+                connection[1].close()
+        return status, response_headers, content
+
+    async def _connect(self, key, url):
+        scheme, host, port = key
+        secure = scheme == "https"
+        try:
+            return await asyncio.wait_for(
+                asyncio.open_connection(host, port or (443 if secure else 80),
+                                        ssl=self._ssl_context if secure else None),
+                self.connect_timeout)
+        except (OSError, asyncio.TimeoutError) as error:
+            raise HttpFetchError("Error connecting to URL {}: {}".format(url, str(error) or "timed out"))
+
+    async def _send(self, connection, request):
+        reader, writer = connection
+        writer.write(request.encode("latin-1"))
+        return await self._read_head(reader)
+
+    async def _read_head(self, reader):
+        head = await self._read(reader.readuntil(b"\r\n\r\n"))
+        status_line, _, header_lines = head.partition(b"\r\n")
+        version, status = (status_line.decode("latin-1").split(None, 2) + [""])[:2]
+        if not version.startswith("HTTP/") or not status.isdigit():
+            raise http.client.BadStatusLine(status_line)
+        return version, int(status), http.client.parse_headers(io.BytesIO(header_lines))
+
+    async def _read_body(self, reader, status, headers, url):
+        if status in BODILESS_STATUSES or 100 <= status < 200:
+            return b""
+        content_length = headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            raise HttpFetchError("Response from URL {} exceeds {} bytes".format(url, self.max_bytes))
+
+        body = ResponseBody(url, headers.get("Content-Encoding"), self.max_bytes)
+        if "chunked" in headers.get("Transfer-Encoding", "").lower():
+            while True:
+                size = int((await self._read(reader.readuntil(b"\r\n"))).split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Skips any trailers, leaving the connection at the start of the next response.
+                    while await self._read(reader.readuntil(b"\r\n")) != b"\r\n":
+                        pass
+                    break
+                await self._read_exactly(reader, size, body)
+                await self._read(reader.readexactly(2))
+        elif content_length and content_length.isdigit():
+            await self._read_exactly(reader, int(content_length), body)
+        else:
+            # Without a length, the body ends when the server closes the connection.
+            while True:
+                chunk = await self._read(reader.read(CHUNK_SIZE))
+                if not chunk:
+                    break
+                body.feed(chunk)
+        return body.finish()
+
+    async def _read_exactly(self, reader, size, body):
+        while size > 0:
+            chunk = await self._read(reader.read(min(size, CHUNK_SIZE)))
+            if not chunk:
+                raise http.client.IncompleteRead(b"", size)
+            body.feed(chunk)
+            size -= len(chunk)
+
+    async def _read(self, read):
+        return await asyncio.wait_for(read, self.read_timeout)
+
+    def _pool_for(self, key):
+        loop = asyncio.get_running_loop()
+        pool = self._pools.get(loop)
+        if pool is None:
+            per_host = defaultdict(lambda: asyncio.Semaphore(self.max_per_host))
+            pool = self._pools[loop] = (asyncio.Semaphore(self.max_connections), per_host, defaultdict(list))
+        connections, per_host, idle = pool
+        return connections, per_host[key[1]], idle[key]
+
+    @staticmethod
+    def _checkout(idle):
+        while idle:
+            reader, writer = idle.pop()
+            if not reader.at_eof():
+                return reader, writer
+            # Closed by the server while it sat idle.
+            writer.close()
+        return None
+
+
+def _keeps_alive(version, status, headers):
+    if version == "HTTP/1.0" or "close" in headers.get("Connection", "").lower():
+        return False
+    # Only a response whose end is marked leaves the connection ready for another.
+    content_length = headers.get("Content-Length")
+    return (status in BODILESS_STATUSES or 100 <= status < 200 or bool(content_length and content_length.isdigit())
+            or "chunked" in headers.get("Transfer-Encoding", "").lower())
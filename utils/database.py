@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Engine settings for the app's database, tuned for SQLite while allowing other engines.
+"""
+import sqlite3
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_SQLITE_PRAGMAS = {
+    # Readers carry on while a write is in progress, rather than waiting for it.
+    "journal_mode": "WAL",
+    # Writers wait for each other rather than failing with "database is locked".
+    "busy_timeout": 5000,
+    # Safe with WAL, only the last transactions may be lost on power loss, never corrupting the DB.
+    "synchronous": "NORMAL",
+    # Negative sizes are in KiB, so each connection caches 16 MiB of pages.
+    "cache_size": -16 * 1024,
+    "temp_store": "MEMORY"
+}
+
+
+def engine_options(database_url, pool_size, max_overflow, pool_timeout, pool_recycle):
+    """
+    :param database_url: the SQLAlchemy URL of the database.
+    :param pool_size: the number of connections kept open.
+    :param max_overflow: the number of connections opened beyond pool_size under load.
+    :param pool_timeout: seconds to wait for a connection before giving up.
+    :param pool_recycle: seconds after which a connection is replaced, so server side timeouts are never hit.
+    :return: dict of options to create the database engine with.
+    """
+    options = dict(pool_size=pool_size, max_overflow=max_overflow, pool_timeout=pool_timeout)
+    if make_url(database_url).get_backend_name() == "sqlite":
+        # Pools SQLite connections too, so their pragmas and page cache outlive each request.
+        # The pool hands each connection to one thread at a time, so it may move between threads.
+        options.update(poolclass=QueuePool, connect_args={"check_same_thread": False})
+    else:
+        options.update(pool_recycle=pool_recycle, pool_pre_ping=True)
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """
+    Applies pragmas to a new connection, if it is to a SQLite database.
+    :param dbapi_connection: the newly opened DB-API connection.
+    :param pragmas: dict of pragma names to values.
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    for name, value in pragmas.items():
+        cursor.execute("PRAGMA {} = {}".format(name, value))
+    cursor.close()
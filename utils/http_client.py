@@ -0,0 +1,251 @@
+#!/usr/bin/python3
+"""
+HTTP client reusing keep-alive connections per host, with compression, timeouts and a response size cap.
+"""
+import http.client
+import ssl
+import threading
+import zlib
+from collections import defaultdict
+from urllib.parse import urlsplit, urljoin
+
+import feedparser
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 30
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_IDLE_PER_HOST = 4
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+HTTP_NOT_MODIFIED = 304
+REDIRECT_STATUSES = [301, 302, 303, 307, 308]
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError,
+                           BrokenPipeError)
+
+
+class HttpClient:
+    """
+    Fetches URLs over a shared pool of keep-alive connections.
+    Responses are requested gzip or deflate compressed, and are read incrementally so a response
+    larger than max_bytes, before or after decompression, is abandoned as soon as the limit is hit.
+    """
+
+    def __init__(self, connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_bytes=DEFAULT_MAX_BYTES, max_idle_per_host=DEFAULT_MAX_IDLE_PER_HOST):
+        """
+        :param connect_timeout: seconds to wait for a connection to be established.
+        :param read_timeout: seconds to wait for each read from an established connection.
+        :param max_bytes: the largest response body accepted, once decompressed.
+        :param max_idle_per_host: the number of idle connections kept open per host.
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_bytes = max_bytes
+        self.max_idle_per_host = max_idle_per_host
+        self._idle = defaultdict(list)
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    def get(self, url, headers=None):
+        """
+        Fetches a URL, following redirects.
+        :param url: the http or https URL to fetch.
+        :param headers: dict of extra request headers, such as conditional request validators.
+        :return: the HttpResponse, whose status is either successful or not modified.
+        :raises HttpFetchError: if the URL could not be fetched, returned an error or was too large.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            status, response_headers, content = self._request(url, headers or {})
+            location = response_headers.get("Location")
+            if status not in REDIRECT_STATUSES or not location:
+                break
+            url = urljoin(url, location)
+        else:
+            raise HttpFetchError("Too many redirects fetching URL {}".format(url))
+
+        if status != HTTP_NOT_MODIFIED and not 200 <= status < 300:
+            raise HttpFetchError("HTTP {} fetching URL {}".format(status, url), status)
+        return HttpResponse(url, status, response_headers, content)
+
+    def close(self):
+        """
+        Closes every idle connection.
+        """
+        with self._lock:
+            connections = [connection for idle in self._idle.values() for connection in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def _request(self, url, headers):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise HttpFetchError("Unsupported URL {}".format(url))
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = (parts.path or "/") + ("?" + parts.query if parts.query else "")
+        request_headers = {"User-Agent": feedparser.USER_AGENT, "Accept-Encoding": "gzip, deflate",
+                           "Connection": "keep-alive"}
+        request_headers.update(headers)
+
+        connection, reused = self._checkout(key)
+        try:
+            try:
+                response = self._send(connection, path, request_headers)
+            except STALE_CONNECTION_ERRORS:
+                # The server may have closed an idle connection, so retry once on a fresh one.
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = self._connect(key), False
+                response = self._send(connection, path, request_headers)
+            content = self._read(response, url)
+        except HttpFetchError:
+            connection.close()
+            raise
+        except (OSError, http.client.HTTPException, zlib.error) as error:
+            connection.close()
+            raise HttpFetchError("Error fetching URL {}: {}".format(url, error))
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(key, connection)
+        return response.status, response.headers, content
+
+    def _send(self, connection, path, headers):
+        if connection.sock is None:
+            connection.connect()
+            connection.sock.settimeout(self.read_timeout)
+        connection.request("GET", path, headers=headers)
+        return connection.getresponse()
+
+    def _read(self, response, url):
+        content_length = response.getheader("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            raise HttpFetchError("Response from URL {} exceeds {} bytes".format(url, self.max_bytes))
+
+        body = ResponseBody(url, response.getheader("Content-Encoding"), self.max_bytes)
+        while True:
+            chunk = response.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            body.feed(chunk)
+        return body.finish()
+
+    def _checkout(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _checkin(self, key, connection):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _connect(self, key):
+        scheme, host, port = key
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.connect_timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.connect_timeout)
+
+
+class ResponseBody:
+    """
+    Response body read a chunk at a time, decompressing each chunk and enforcing the size limit as it arrives.
+    """
+
+    def __init__(self, url, content_encoding, max_bytes):
+        """
+        :param url: the URL the response is from.
+        :param content_encoding: the response's Content-Encoding header, if any.
+        :param max_bytes: the largest body accepted, once decompressed.
+        """
+        self.url = url
+        self.max_bytes = max_bytes
+        self._decoder = _decoder(content_encoding)
+        self._chunks = []
+        self._size = 0
+
+    def feed(self, chunk):
+        """
+        :param chunk: the next bytes of the body, as sent.
+        :raises HttpFetchError: if the body has grown larger than max_bytes.
+        """
+        decoder = self._decoder
+        # Bound the decompressed output too, so a small compressed response cannot expand without limit.
+        while chunk:
+            data = decoder.decompress(chunk, self.max_bytes - self._size + 1) if decoder else chunk
+            chunk = decoder.unconsumed_tail if decoder else b""
+            self._size += len(data)
+            if self._size > self.max_bytes:
+                raise HttpFetchError("Response from URL {} exceeds {} bytes".format(self.url, self.max_bytes))
+            self._chunks.append(data)
+
+    def finish(self):
+        """
+        :return: the whole body, decompressed.
+        """
+        if self._decoder:
+            self._chunks.append(self._decoder.flush())
+        return b"".join(self._chunks)
+
+
+def _decoder(content_encoding):
+    encoding = (content_encoding or "").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        # Accepts both zlib wrapped and raw deflate streams, as servers send either.
+        return _DeflateDecoder()
+    return None
+
+
+class _DeflateDecoder:
+
+    def __init__(self):
+        self._decoder = zlib.decompressobj()
+        self._first = True
+
+    @property
+    def unconsumed_tail(self):
+        return self._decoder.unconsumed_tail
+
+    def decompress(self, data, max_length):
+        if self._first:
+            self._first = False
+            try:
+                return self._decoder.decompress(data, max_length)
+            except zlib.error:
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decoder.decompress(data, max_length)
+
+    def flush(self):
+        return self._decoder.flush()
+
+
+class HttpResponse:
+    """
+    Response to an HTTP request, with its body decompressed.
+    """
+
+    def __init__(self, url, status, headers, content):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+
+class HttpFetchError(Exception):
+    """
+    Exception is thrown when a URL cannot be fetched.
+    """
+
+    def __init__(self, message, status=None):
+        super(HttpFetchError, self).__init__(message)
+        self.message = message
+        self.status = status
@@ -0,0 +1,180 @@
+#!/usr/bin/python3
+"""
+Lightweight in-process metrics, exposed in the Prometheus text format.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MAX_SERIES = 1000
+OVERFLOW_LABEL_VALUE = "other"
+# Labels whose values come from user input, such as feed URLs, so are folded together once a metric has too many series.
+UNBOUNDED_LABELNAMES = ("feed",)
+
+
+class Registry:
+    """
+    Holds the registered metrics and renders them for scraping.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """
+        :return: every registered metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            metrics = list(self._metrics)
+        return "".join(metric.render() for metric in metrics)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, description, labelnames=(), registry=None, max_series=MAX_SERIES):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._series = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _series_for(self, labels):
+        key = tuple(str(labels[labelname]) for labelname in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            # Bound the number of series, keeping the bounded labels so their breakdown is not lost.
+            if len(self._series) >= self.max_series:
+                key = tuple(OVERFLOW_LABEL_VALUE if labelname in UNBOUNDED_LABELNAMES else value
+                            for labelname, value in zip(self.labelnames, key))
+                series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = self._new_series()
+        return series
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = ["# HELP {} {}".format(self.name, self.description), "# TYPE {} {}".format(self.name, self.kind)]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                lines.extend(self._render_series(dict(zip(self.labelnames, key)), series))
+        return "\n".join(lines) + "\n"
+
+    def _render_series(self, labels, series):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count.
+    """
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        with self._lock:
+            self._series_for(labels)[0] += amount
+
+    def _new_series(self):
+        return [0]
+
+    def _render_series(self, labels, series):
+        return ["{}{} {}".format(self.name, _format_labels(labels), _format_value(series[0]))]
+
+
+class Gauge(_Metric):
+    """
+    Value which can go up and down.
+    """
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._series_for(labels)[0] = value
+
+    def _new_series(self):
+        return [0]
+
+    def _render_series(self, labels, series):
+        return ["{}{} {}".format(self.name, _format_labels(labels), _format_value(series[0]))]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over fixed buckets.
+    """
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS, registry=None,
+                 max_series=MAX_SERIES):
+        self.buckets = tuple(sorted(buckets))
+        super(Histogram, self).__init__(name, description, labelnames, registry, max_series)
+
+    def observe(self, value, **labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series_for(labels)
+            series["counts"][index] += 1
+            series["sum"] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observes the seconds taken by the enclosed block.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _new_series(self):
+        return {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0}
+
+    def _render_series(self, labels, series):
+        lines = []
+        cumulative = 0
+        for bucket, count in zip(self.buckets + (float("inf"),), series["counts"]):
+            cumulative += count
+            bucket_labels = dict(labels, le="+Inf" if bucket == float("inf") else _format_value(bucket))
+            lines.append("{}_bucket{} {}".format(self.name, _format_labels(bucket_labels), cumulative))
+        lines.append("{}_sum{} {}".format(self.name, _format_labels(labels), _format_value(series["sum"])))
+        lines.append("{}_count{} {}".format(self.name, _format_labels(labels), cumulative))
+        return lines
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join('{}="{}"'.format(name, _escape(value)) for name, value in labels.items()) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+REGISTRY = Registry()
+
+FEED_STAGE_SECONDS = Histogram("feedme_feed_stage_seconds",
+                               "Seconds spent in each stage of loading an RSS feed.", ["stage", "feed"])
+FEED_CACHE_REQUESTS = Counter("feedme_feed_cache_requests_total",
+                              "RSS feed content cache lookups by result.", ["result", "feed"])
+FEED_PAYLOAD_BYTES = Gauge("feedme_feed_payload_bytes", "Size of the last rendered content of an RSS feed.", ["feed"])
+REQUEST_SECONDS = Histogram("feedme_request_seconds", "Seconds taken to handle requests.",
+                            ["route", "method", "status"])
+CACHE_BACKEND_STATS = Gauge("feedme_cache_backend", "Statistics reported by the cache backend.", ["stat"])
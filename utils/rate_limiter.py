@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""
+Per-client rate limiting using a token bucket for each client.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_CLIENTS = 10000
+
+
+class RateLimiter:
+    """
+    Allows each client a burst of attempts, refilled at a steady rate.
+    Only the most recently seen max_clients are tracked, so the memory used stays bounded.
+    """
+
+    def __init__(self, rate, burst, max_clients=DEFAULT_MAX_CLIENTS):
+        """
+        :param rate: attempts regained per second.
+        :param burst: the most attempts a client can make at once.
+        :param max_clients: the number of clients tracked.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client):
+        """
+        Takes an attempt from the client's bucket.
+        :param client: identifies the client, such as its address.
+        :return: True if the client may make the attempt, False if it has made too many.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[client] = (tokens - 1 if allowed else tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return allowed
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Collapses concurrent calls for the same key into a single call.
+"""
+import threading
+
+
+class SingleFlight:
+    """
+    Ensures only one call per key is in flight, with concurrent callers sharing its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, function):
+        """
+        Calls function unless a call for key is already in flight, in which case waits for that call.
+        :param key: identifies the call.
+        :param function: callable producing the result.
+        :return: the result of the call in flight for key.
+        :raises Exception: whatever the call in flight raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if leader:
+            self._run(key, call, function)
+        else:
+            call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do_in_background(self, key, function, executor):
+        """
+        Submits function to executor unless a call for key is already in flight.
+        :param key: identifies the call.
+        :param function: callable producing the result.
+        :param executor: the executor running the call.
+        :return: True if a new call was submitted, False if one was already in flight.
+        """
+        with self._lock:
+            if key in self._calls:
+                return False
+            call = self._calls[key] = _Call()
+        executor.submit(self._run, key, call, function)
+        return True
+
+    def in_flight(self, key):
+        with self._lock:
+            return key in self._calls
+
+    def _run(self, key, call, function):
+        try:
+            call.result = function()
+        except Exception as error:
+            call.error = error
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
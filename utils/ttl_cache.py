@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""
+Small in-process cache whose entries expire after a fixed time to live.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TtlCache:
+    """
+    Thread safe cache holding at most max_entries values, each for ttl seconds,
+    evicting the least recently stored values first.
+    """
+
+    def __init__(self, ttl, max_entries=1024):
+        """
+        :param ttl: seconds each value is kept for.
+        :param max_entries: the maximum number of values kept.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :return: the value stored for key, or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,14 @@
+#!/usr/bin/python3
+
+import sys
+
+from app.feedme_app import warm_feed_cache
+
+
+def main():
+    refreshed = warm_feed_cache()
+    print("Feed cache warmed for {} RSS feed URLs".format(refreshed))
+
+
+if __name__ == '__main__':
+    sys.exit(main())